@@ -0,0 +1,41 @@
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import ExpiringToken, TOKEN_CACHE
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по ExpiringToken с проверкой срока действия.
+
+    Токен вместе с пользователем и профилем (ролью) кэшируется, поэтому
+    повторные запросы с тем же токеном не обращаются к базе. Время жизни
+    записи — не больше TOKEN_CACHE_TIMEOUT и не дольше срока действия токена;
+    запись удаляется при удалении токена (выход, повторный вход) и при
+    изменении пользователя или профиля. Другим воркерам удаление видно сразу,
+    только если кэш общий (TOKEN_CACHE_URL), иначе — через TOKEN_CACHE_TIMEOUT.
+    """
+    model = ExpiringToken
+
+    def authenticate_credentials(self, key):
+        cache = caches[TOKEN_CACHE]
+        token = cache.get(key)
+        if token is None:
+            try:
+                token = ExpiringToken.objects.select_related('user__profile').get(key=key)
+            except ExpiringToken.DoesNotExist:
+                raise AuthenticationFailed('Недействительный токен')
+
+            remaining = (token.expires_at - timezone.now()).total_seconds()
+            if remaining > 0 and token.user.is_active:
+                cache.set(key, token, min(cache.default_timeout, remaining))
+
+        if token.is_expired:
+            cache.delete(key)
+            raise AuthenticationFailed('Срок действия токена истек')
+        if not token.user.is_active:
+            raise AuthenticationFailed('Пользователь неактивен или удален')
+
+        return (token.user, token)
@@ -1,12 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
-from django.db.models.signals import post_save
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.conf import settings
 
 
+# Кэш токенов ExpiringTokenAuthentication
+TOKEN_CACHE = 'tokens'
+
+
 class Profile(models.Model):
     ROLE_CHOICES = [
         ('employee', 'Работник'),
@@ -49,3 +54,16 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
+
+@receiver(post_save, sender=ExpiringToken)
+@receiver(post_delete, sender=ExpiringToken)
+def invalidate_cached_token(sender, instance, **kwargs):
+    caches[TOKEN_CACHE].delete(instance.key)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+def invalidate_cached_user_tokens(sender, instance, **kwargs):
+    """Изменились данные пользователя или его роль: кэшированные токены устарели."""
+    user_id = instance.user_id if sender is Profile else instance.pk
+    keys = ExpiringToken.objects.filter(user_id=user_id).values_list('key', flat=True)
+    caches[TOKEN_CACHE].delete_many(list(keys))
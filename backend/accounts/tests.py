@@ -1,3 +1,118 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APITestCase
+
+from .authentication import ExpiringTokenAuthentication
+from .models import ExpiringToken, TOKEN_CACHE
+
+
+class ExpiringTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        caches[TOKEN_CACHE].clear()
+        self.user = User.objects.create_user(username='user', password='secret')
+        self.token = ExpiringToken.objects.get(user=self.user)
+        self.authentication = ExpiringTokenAuthentication()
+
+    def test_token_is_cached_with_profile(self):
+        with self.assertNumQueries(1):
+            user, _ = self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, _ = self.authentication.authenticate_credentials(self.token.key)
+            self.assertEqual(user.profile.role, 'employee')
+
+    def test_expired_token_is_rejected(self):
+        self.token.expires_at = timezone.now() - timedelta(seconds=1)
+        self.token.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = client.get('/api/accounts/users/me/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_token_is_rejected_immediately(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(client.get('/api/accounts/users/me/').status_code, 200)
+        self.assertEqual(client.post('/api/accounts/delete_token/').status_code, 200)
+        self.assertEqual(client.get('/api/accounts/users/me/').status_code, 401)
+
+    def test_token_deleted_by_another_worker_expires_from_local_cache(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        token = caches[TOKEN_CACHE].get(self.token.key)
+        ExpiringToken.objects.filter(pk=self.token.pk).delete()
+        # Запись в кэше этого процесса, которую удаление в другом воркере не затронуло
+        caches[TOKEN_CACHE].set(self.token.key, token)
+        self.authentication.authenticate_credentials(self.token.key)
+
+        expired = time.time() + settings.TOKEN_CACHE_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=expired):
+            with self.assertRaises(AuthenticationFailed):
+                self.authentication.authenticate_credentials(self.token.key)
+
+    def test_role_change_invalidates_cached_token(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.user.profile.role = 'admin'
+        self.user.profile.save()
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.profile.role, 'admin')
+
+    def test_login_replaces_cached_token(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        response = APIClient().post('/api/accounts/login/', {'username': 'user', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+
+class EndpointQueryCountTests(APITestCase):
+    """Число SQL-запросов эндпоинтов accounts не зависит от числа пользователей (SIZES)."""
+    SIZES = (1, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='secret', is_staff=True, is_superuser=True)
+
+    def seed(self, size):
+        User.objects.filter(username__startswith='user-').delete()
+        for n in range(size):
+            User.objects.create(username=f'user-{n}')
+        # Предыдущая проверка могла удалить или заменить токен
+        token, _ = ExpiringToken.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def assertQueryCount(self, expected, send):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                self.seed(size)
+                caches[TOKEN_CACHE].clear()
+                with self.assertNumQueries(expected):
+                    response = send()
+                self.assertLess(response.status_code, 400, response.data)
+
+    def test_users(self):
+        self.assertQueryCount(2, lambda: self.client.get('/api/accounts/users/'))
+        self.assertQueryCount(2, lambda: self.client.get(f'/api/accounts/users/{self.user.id}/'))
+        self.assertQueryCount(1, lambda: self.client.get('/api/accounts/users/me/'))
+        self.assertQueryCount(8, lambda: self.client.patch(
+            f'/api/accounts/users/{self.user.id}/', {'first_name': 'Иван'}, format='json'
+        ))
+
+    def test_profiles(self):
+        self.assertQueryCount(2, lambda: self.client.get('/api/accounts/profiles/'))
+        self.assertQueryCount(2, lambda: self.client.get(f'/api/accounts/profiles/{self.user.profile.id}/'))
+        self.assertQueryCount(1, lambda: self.client.get('/api/accounts/profiles/me/'))
+        self.assertQueryCount(4, lambda: self.client.patch(
+            f'/api/accounts/profiles/{self.user.profile.id}/', {'position': 'Инженер'}, format='json'
+        ))
 
-# Create your tests here.
+    def test_login_and_logout(self):
+        self.assertQueryCount(8, lambda: self.client.post(
+            '/api/accounts/login/', {'username': 'admin', 'password': 'secret'}
+        ))
+        self.assertQueryCount(4, lambda: self.client.post('/api/accounts/delete_token/'))
@@ -7,6 +7,7 @@ from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action, api_view
+from info_pcs.metrics import MetricsMixin
 from .serializers import (
     UserSerializer, ProfileSerializer, 
     UserRegisterSerializer, LoginSerializer
@@ -47,7 +48,7 @@ def delete_token(request):
     }, status=status.HTTP_200_OK)
     
     
-class LoginView(APIView):
+class LoginView(MetricsMixin, APIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = LoginSerializer
 
@@ -76,7 +77,7 @@ class LoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(MetricsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -98,15 +99,16 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = Profile.objects.all()
+class ProfileViewSet(MetricsMixin, viewsets.ModelViewSet):
+    # В профиль вложен пользователь: без select_related по запросу на профиль
+    queryset = Profile.objects.select_related('user')
     serializer_class = ProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         if self.request.user.is_superuser:
-            return Profile.objects.all()
-        return Profile.objects.filter(user=self.request.user)
+            return self.queryset.all()
+        return self.queryset.filter(user=self.request.user)
     
     def perform_update(self, serializer):
         if self.request.user.is_superuser or serializer.instance.user == self.request.user:
@@ -1,5 +1,7 @@
+import json
+
 from django.contrib import admin
-from .models import Computer, Changes
+from .models import Computer, Changes, ImportRun, Job, Notification
 
 
 @admin.register(Computer)
@@ -83,31 +85,108 @@ class ChangesAdmin(admin.ModelAdmin):
     list_display = (
         'computer',
         'user',
+        'action',
         'change_description_short',
         'change_date'
     )
     list_filter = (
         'change_date',
+        'action',
         'computer__computer_name'
     )
+    # Поиск по описанию целиком заменен фильтром по извлеченному действию
     search_fields = (
         'computer__computer_name',
-        'user__username',
-        'change_description'
+        'user__username'
     )
     readonly_fields = (
         'computer',
         'user',
+        'action',
+        'changed_fields',
         'change_date'
     )
     date_hierarchy = 'change_date'
     ordering = ('-change_date',)
 
     def change_description_short(self, obj):
-        return obj.change_description[:50] + '...' if len(obj.change_description) > 50 else obj.change_description
+        description = json.dumps(obj.change_description, ensure_ascii=False)
+        return description[:50] + '...' if len(description) > 50 else description
     change_description_short.short_description = 'Описание изменения'
 
     def save_model(self, request, obj, form, change):
         if not obj.user_id:
             obj.user = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'user',
+        'imported_count',
+        'total_rows',
+        'error_count',
+        'created_at'
+    )
+    readonly_fields = (
+        'user',
+        'total_rows',
+        'imported_count',
+        'error_count',
+        'created_at'
+    )
+    ordering = ('-created_at',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('details')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'kind',
+        'status',
+        'user',
+        'rows_processed',
+        'total_rows',
+        'created_at',
+        'finished_at'
+    )
+    list_filter = (
+        'kind',
+        'status'
+    )
+    readonly_fields = (
+        'rows_processed',
+        'total_rows',
+        'result',
+        'error',
+        'created_at',
+        'started_at',
+        'finished_at'
+    )
+    ordering = ('-created_at',)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at'
+    )
+    list_filter = (
+        'status',
+    )
+    readonly_fields = (
+        'created_at',
+        'sent_at',
+        'attempts',
+        'last_error'
+    )
+    ordering = ('-created_at',)
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ComputersConfig(AppConfig):
@@ -6,4 +7,13 @@ class ComputersConfig(AppConfig):
     name = 'computers'
 
     def ready(self):
-        import computers.signals
\ No newline at end of file
+        import computers.signals
+        from computers.search import create_search_index
+        from computers.subnets import fill_ip_numbers
+        from computers.stats import create_inventory_stats
+
+        # Виртуальная таблица FTS5 не описывается моделью и создается отдельно
+        post_migrate.connect(create_search_index, sender=self)
+        # Миграции не хранятся в репозитории: данные заполняются после migrate
+        post_migrate.connect(fill_ip_numbers, sender=self)
+        post_migrate.connect(create_inventory_stats, sender=self)
@@ -0,0 +1,848 @@
+"""
+Сценарии замеров производительности для команды ``manage.py benchmark``.
+
+Каждый сценарий получает размер набора данных и возвращает список
+результатов: словари с названием варианта, временем и пропускной способностью.
+"""
+import asyncio
+import csv
+import io
+import ipaddress
+import secrets
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.backends.utils import CursorWrapper
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Computer, Changes, DataVersion, Notification
+from .bulk import delete_rows
+from .importers import import_computers, open_csv
+from .exporters import EXPORT_FIELDS, iter_computers_csv, log_export
+from .filters import ComputerFilter
+from .events import broker
+from .serializers import ComputerSerializer, UserSerializer, ChangesSerializer, ChangesValuesSerializer
+from .search import SEARCH_FIELDS, rebuild_search_index, search_computers
+from .subnets import free_addresses, host_bounds
+from .stats import inventory_stats, rebuild_inventory_stats
+from .views import changes_stream
+from accounts.models import ExpiringToken, Profile
+
+
+User = get_user_model()
+
+
+@contextmanager
+def count_queries():
+    """Считает SQL-запросы всех соединений и потоков (в отличие от CaptureQueriesContext)."""
+    counter = {'count': 0}
+    original = CursorWrapper._execute_with_wrappers
+
+    def counting(self, *args, **kwargs):
+        counter['count'] += 1
+        return original(self, *args, **kwargs)
+
+    CursorWrapper._execute_with_wrappers = counting
+    try:
+        yield counter
+    finally:
+        CursorWrapper._execute_with_wrappers = original
+
+
+def get_benchmark_user():
+    user, _ = User.objects.get_or_create(username='benchmark')
+    return user
+
+
+def make_ip(n):
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def make_row(n):
+    return {
+        'computer_name': f"PC-{n:06d}",
+        'ip_address': make_ip(n),
+        'location_address': 'ул. Киевская, 111а',
+        'floor': n % 9 + 1,
+        'office': str(n % 400 + 100),
+        'domain': 'tnimc.local',
+        'pc_owner': f"Пользователь {n}",
+        'pc_owner_position_at_work': 'Инженер',
+        'has_kaspersky': 'true' if n % 3 else 'false',
+        'operating_system': 'Windows 10',
+        'comment': ''
+    }
+
+
+def make_csv(rows, start=0):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for n in range(start, start + rows):
+        writer.writerow(make_row(n))
+    return buffer.getvalue()
+
+
+def seed_computers(size, batch_size=1000):
+    clear_inventory()
+    batch = []
+    for n in range(size):
+        row = make_row(n)
+        row['has_kaspersky'] = row['has_kaspersky'] == 'true'
+        computer = Computer(**row)
+        computer.fill_ip_number()
+        batch.append(computer)
+        if len(batch) >= batch_size:
+            Computer.objects.bulk_create(batch)
+            batch = []
+    Computer.objects.bulk_create(batch)
+    # bulk_create не отправляет сигналы
+    DataVersion.rebuild(DataVersion.COMPUTERS)
+    rebuild_search_index()
+    rebuild_inventory_stats()
+
+
+def legacy_import(rows, user):
+    """Построчный импорт в том виде, в каком он был до массового импорта."""
+    imported_count = 0
+    errors = []
+    for row_num, row in enumerate(rows, 1):
+        try:
+            if Computer.objects.filter(computer_name=row['computer_name'], ip_address=row['ip_address']).exists():
+                raise ValueError(f"Компьютер с именем {row['computer_name']} и IP {row['ip_address']} уже существует")
+            Computer.objects.create(
+                computer_name=row['computer_name'],
+                ip_address=row['ip_address'],
+                location_address=row['location_address'],
+                floor=int(row['floor']),
+                office=row['office'],
+                domain=row.get('domain', ''),
+                pc_owner=row.get('pc_owner', ''),
+                pc_owner_position_at_work=row.get('pc_owner_position_at_work', ''),
+                has_kaspersky=row.get('has_kaspersky', 'false').lower() == 'true',
+                operating_system=row.get('operating_system', ''),
+                comment=row.get('comment', '')
+            )
+            imported_count += 1
+        except Exception as e:
+            errors.append(f"Строка {row_num}: {str(e)}")
+    return imported_count
+
+
+def clear_inventory():
+    # Без сигналов post_delete на каждую запись: удаление журнала не ставит
+    # в очередь письма и отметки об удалении, а версии, индекс поиска
+    # и статистика перестраиваются один раз
+    with transaction.atomic():
+        delete_rows(Changes)
+        delete_rows(Computer)
+        DataVersion.rebuild(DataVersion.CHANGES)
+        DataVersion.rebuild(DataVersion.COMPUTERS)
+        rebuild_search_index()
+        rebuild_inventory_stats()
+
+
+def bench_import(size):
+    user = get_benchmark_user()
+    content = make_csv(size)
+    variants = {
+        'legacy': lambda rows: legacy_import(rows, user),
+        'bulk': lambda rows: import_computers(rows, user=user)['imported_count'],
+    }
+    results = []
+    for name, run in variants.items():
+        clear_inventory()
+        reader = csv.DictReader(content.splitlines())
+        started = time.perf_counter()
+        imported = run(reader)
+        elapsed = time.perf_counter() - started
+        results.append({
+            'variant': name,
+            'rows': imported,
+            'seconds': elapsed,
+            'rows_per_second': imported / elapsed if elapsed else 0,
+        })
+    clear_inventory()
+    return results
+
+
+def streaming_parse(file):
+    text, delimiter = open_csv(file)
+    return csv.DictReader(text, delimiter=delimiter)
+
+
+def bench_csv_parse(size):
+    """Разбор загруженного CSV (без записи в базу): время и пиковая память."""
+    content = make_csv(size).encode('utf-8')
+    variants = {
+        'legacy': lambda file: csv.DictReader(file.read().decode('utf-8').splitlines()),
+        'streaming': streaming_parse,
+    }
+    results = []
+    for name, parse in variants.items():
+        # Крупные загрузки Django сохраняет во временный файл
+        with TemporaryUploadedFile('computers.csv', 'text/csv', len(content), 'utf-8') as upload:
+            upload.write(content)
+            upload.seek(0)
+            tracemalloc.start()
+            started = time.perf_counter()
+            rows = sum(1 for _ in parse(upload))
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results.append({
+            'variant': name,
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_second': rows / elapsed if elapsed else 0,
+            'file_mb': len(content) / 2 ** 20,
+            'peak_memory_mb': peak / 2 ** 20,
+        })
+    return results
+
+
+def legacy_export(queryset, user):
+    """Выгрузка в HttpResponse целиком, как до потоковой выгрузки."""
+    response = HttpResponse(content_type='text/csv')
+    writer = csv.DictWriter(response, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for computer in queryset:
+        row = {field: getattr(computer, field) for field in EXPORT_FIELDS}
+        row['has_kaspersky'] = 'Да' if computer.has_kaspersky else 'Нет'
+        writer.writerow(row)
+    Changes.objects.create(
+        user=user,
+        computer_name="CSV экспорт",
+        computer_ip="N/A",
+        change_description={'action': 'csv_export', 'exported_count': queryset.count()}
+    )
+    yield response.content
+
+
+def streaming_export(queryset, user):
+    return iter_computers_csv(queryset, on_complete=lambda exported_count: log_export(user, exported_count))
+
+
+def bench_export(size):
+    user = get_benchmark_user()
+    seed_computers(size)
+    variants = {
+        'legacy': legacy_export,
+        'streaming': streaming_export,
+    }
+    results = []
+    for name, export in variants.items():
+        tracemalloc.start()
+        started = time.perf_counter()
+        first_byte = None
+        for chunk in export(Computer.objects.all(), user):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            'variant': name,
+            'rows': size,
+            'seconds': elapsed,
+            'rows_per_second': size / elapsed if elapsed else 0,
+            'first_byte_seconds': first_byte,
+            'peak_memory_mb': peak / 2 ** 20,
+        })
+    clear_inventory()
+    return results
+
+
+def create_changes(count, user):
+    for n in range(count):
+        Changes.objects.create(user=user, computer_name=f"PC-{n:06d}", change_description='benchmark')
+
+
+async def consume_events(response, expected):
+    received = 0
+    async for chunk in response.streaming_content:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        received += chunk.count('event: change_created')
+        if received >= expected:
+            break
+    return received
+
+
+async def run_subscribers(subscribers, events, token_key):
+    factory = AsyncRequestFactory()
+    write = sync_to_async(create_changes)
+    user = await sync_to_async(get_benchmark_user)()
+    # Прогрев: первая запись создает строку версии журнала
+    await write(1, user)
+
+    with count_queries() as baseline:
+        await write(events, user)
+
+    with count_queries() as connect:
+        responses = [
+            await changes_stream(factory.get('/api/computers/events/', {'token': token_key}))
+            for _ in range(subscribers)
+        ]
+        tasks = [asyncio.create_task(consume_events(response, events)) for response in responses]
+        while broker.subscriber_count < subscribers:
+            await asyncio.sleep(0.01)
+
+    with count_queries() as streaming:
+        started = time.perf_counter()
+        await write(events, user)
+        delivered = sum(await asyncio.gather(*tasks))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'variant': 'sse',
+        'rows': delivered,
+        'seconds': elapsed,
+        'rows_per_second': delivered / elapsed if elapsed else 0,
+        'connect_queries': connect['count'],
+        'writer_queries': baseline['count'],
+        'fanout_queries': streaming['count'] - baseline['count'],
+    }
+
+
+def bench_events(size, events=20):
+    """
+    Нагрузочный тест потока событий: size одновременных подписчиков,
+    events новых записей журнала. fanout_queries — запросы сверх тех,
+    что делает сам писатель; при рассылке из сигналов они должны быть равны нулю.
+    """
+    # Токен создается сигналом при создании пользователя
+    subscriber = User.objects.create(username=f'events-{size}', is_staff=True)
+    token = ExpiringToken.objects.get(user=subscriber)
+    result = asyncio.run(run_subscribers(size, events, token.key))
+    clear_inventory()
+    return [result]
+
+
+class LegacyChangesSerializer(serializers.ModelSerializer):
+    """Запись журнала с вложенными компьютером и пользователем, как до компактного формата."""
+    user = UserSerializer(read_only=True)
+    computer = ComputerSerializer(read_only=True)
+
+    class Meta:
+        model = Changes
+        fields = '__all__'
+
+
+def seed_changes(size, user, batch_size=1000):
+    seed_computers(size)
+    seed_journal(size, [user], batch_size)
+
+
+def seed_journal(count, users, batch_size=1000):
+    """Записи журнала об изменении office, по кругу для всех компьютеров и пользователей (без сигналов)."""
+    computers = list(Computer.objects.values_list('id', 'computer_name', 'ip_address'))
+    batch = []
+    for n in range(count if computers else 0):
+        computer_id, name, ip = computers[n % len(computers)]
+        batch.append(Changes(
+            computer_id=computer_id, computer_name=name, computer_ip=ip,
+            user=users[n % len(users)] if users else None,
+            action='update', changed_fields=',office,',
+            change_description={'action': 'update', 'changes': {'office': {'old': '100', 'new': str(n % 400 + 100)}}}
+        ))
+        if len(batch) >= batch_size:
+            Changes.objects.bulk_create(batch)
+            batch = []
+    Changes.objects.bulk_create(batch)
+    DataVersion.rebuild(DataVersion.CHANGES)
+
+
+SEED_USER_PREFIX = 'bench-'
+SEED_ROLES = ('auditor', 'employee')
+
+
+def seed_roles(admins=False):
+    """Роли пользователей bench-NNNN по кругу; администраторы — только по запросу."""
+    return (*SEED_ROLES, 'admin') if admins else SEED_ROLES
+
+
+def seed_users(count, password, admins=False, batch_size=1000):
+    """
+    Пользователи bench-NNNN с паролем password, профилями (роли seed_roles по кругу)
+    и токенами. Ранее созданные пользователи bench-* удаляются.
+    """
+    User.objects.filter(username__startswith=SEED_USER_PREFIX).delete()
+    roles = seed_roles(admins)
+    password = make_password(password)
+    users = User.objects.bulk_create(
+        [User(username=f"{SEED_USER_PREFIX}{n:04d}", password=password) for n in range(count)],
+        batch_size=batch_size
+    )
+    # bulk_create не отправляет сигналы: профили и токены создаются явно
+    Profile.objects.bulk_create(
+        [Profile(user=user, role=roles[n % len(roles)]) for n, user in enumerate(users)],
+        batch_size=batch_size
+    )
+    # ExpiringToken наследует Token (две таблицы), bulk_create для него недоступен
+    with transaction.atomic():
+        for user in users:
+            ExpiringToken.objects.create(user=user)
+    DataVersion.rebuild(DataVersion.USERS)
+    return users
+
+
+def seed_dataset(computers, changes, users, password, admins=False, batch_size=1000):
+    """Наполняет базу: компьютеры, пользователи и журнал изменений от их имени."""
+    seed_computers(computers, batch_size)
+    seeded_users = seed_users(users, password, admins, batch_size)
+    seed_journal(changes, seeded_users, batch_size)
+    return seeded_users
+
+
+def bench_changes_list(size):
+    """Сериализация списка журнала в JSON: скорость и объем ответа на запись."""
+    user = get_benchmark_user()
+    seed_changes(size, user)
+    queryset = Changes.objects.select_related('user', 'computer').order_by('-change_date', '-id')
+    fast = ChangesValuesSerializer()
+    variants = {
+        'nested': lambda: LegacyChangesSerializer(queryset, many=True).data,
+        'compact': lambda: ChangesSerializer(queryset, many=True).data,
+        'values': lambda: fast.many(fast.values(queryset)),
+    }
+    results = []
+    for name, serialize in variants.items():
+        started = time.perf_counter()
+        content = JSONRenderer().render(serialize())
+        elapsed = time.perf_counter() - started
+        results.append({
+            'variant': name,
+            'rows': size,
+            'seconds': elapsed,
+            'rows_per_second': size / elapsed if elapsed else 0,
+            'bytes_per_row': len(content) / size if size else 0,
+        })
+    clear_inventory()
+    return results
+
+
+def per_object_update(client, ids):
+    """Как клиент до массовых операций: чтение, PATCH и отдельная запись в журнал на каждый компьютер."""
+    for computer_id in ids:
+        client.get(f'/api/computers/computers/{computer_id}/')
+        client.patch(f'/api/computers/computers/{computer_id}/', {'office': '305'}, format='json')
+        client.post(f'/api/computers/computers/{computer_id}/log_change/', {
+            'change_description': '{"action": "update", "changes": {"office": {"from": "100", "to": "305"}}}'
+        }, format='json')
+
+
+def per_object_delete(client, ids):
+    for computer_id in ids:
+        client.get(f'/api/computers/computers/{computer_id}/')
+        client.post(f'/api/computers/computers/{computer_id}/log_change/', {
+            'change_description': '{"action": "delete"}'
+        }, format='json')
+        client.delete(f'/api/computers/computers/{computer_id}/')
+
+
+def bench_bulk(size):
+    """
+    Изменение кабинета и удаление size компьютеров: по одному (три HTTP-запроса
+    на компьютер) и массовыми эндпоинтами; notifications — письма в очереди.
+    """
+    user = User.objects.create(username=f'bulk-{size}', is_staff=True, is_superuser=True)
+    client = APIClient()
+    client.force_authenticate(user)
+    variants = {
+        'update_each': per_object_update,
+        'update_bulk': lambda client, ids: client.post(
+            '/api/computers/computers/bulk_update/', {'ids': ids, 'values': {'office': '305'}}, format='json'
+        ),
+        'delete_each': per_object_delete,
+        'delete_bulk': lambda client, ids: client.post(
+            '/api/computers/computers/bulk_delete/', {'ids': ids}, format='json'
+        ),
+    }
+    results = []
+    for name, run in variants.items():
+        seed_computers(size)
+        Notification.objects.all().delete()
+        ids = list(Computer.objects.values_list('id', flat=True))
+        with count_queries() as queries:
+            started = time.perf_counter()
+            run(client, ids)
+            elapsed = time.perf_counter() - started
+        results.append({
+            'variant': name,
+            'rows': size,
+            'seconds': elapsed,
+            'rows_per_second': size / elapsed if elapsed else 0,
+            'queries': queries['count'],
+            'notifications': Notification.objects.count(),
+        })
+    clear_inventory()
+    user.delete()
+    return results
+
+
+# Настройки SQLite по умолчанию (без WAL и BEGIN IMMEDIATE) для сравнения с профилем из settings
+SQLITE_DEFAULT_OPTIONS = {'timeout': 5, 'init_command': 'PRAGMA journal_mode=DELETE'}
+
+LOAD_READERS = 8
+LOAD_WRITERS = 2
+LOAD_SECONDS = 5
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def load_worker(kind, user, computer_ids, deadline, stats):
+    """Поток нагрузочного теста: читатель запрашивает страницу списка, писатель меняет компьютер и пишет в журнал."""
+    client = APIClient()
+    client.force_authenticate(user)
+    n = 0
+    try:
+        while time.perf_counter() < deadline:
+            n += 1
+            started = time.perf_counter()
+            try:
+                if kind == 'read':
+                    response = client.get('/api/computers/computers/', {'page_size': 100})
+                else:
+                    computer_id = computer_ids[(threading.get_ident() + n) % len(computer_ids)]
+                    response = client.patch(
+                        f'/api/computers/computers/{computer_id}/', {'office': str(n % 400 + 100)}, format='json'
+                    )
+                    Changes.objects.create(user=user, computer_id=computer_id, change_description={'action': 'update'})
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            stats.append((kind, time.perf_counter() - started, ok))
+    finally:
+        connection.close()
+
+
+def run_load(user, computer_ids, seconds):
+    stats = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=load_worker, args=(kind, user, computer_ids, deadline, stats))
+        for kind in ['read'] * LOAD_READERS + ['write'] * LOAD_WRITERS
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def bench_concurrency(size, seconds=LOAD_SECONDS):
+    """
+    Нагрузочный тест: LOAD_READERS потоков читают список компьютеров,
+    LOAD_WRITERS потоков изменяют компьютеры и пишут в журнал. Для SQLite
+    сравниваются настройки по умолчанию и профиль из settings (WAL,
+    busy timeout, BEGIN IMMEDIATE); errors — запросы, завершившиеся ошибкой
+    (в том числе "database is locked").
+    """
+    seed_computers(size)
+    user = User.objects.create(username=f'load-{size}', is_staff=True, is_superuser=True)
+    computer_ids = list(Computer.objects.values_list('id', flat=True)[:1000])
+    configured_options = connection.settings_dict['OPTIONS']
+
+    variants = {'configured': configured_options}
+    if connection.vendor == 'sqlite':
+        variants = {'default': SQLITE_DEFAULT_OPTIONS, 'tuned': configured_options}
+
+    results = []
+    try:
+        for name, options in variants.items():
+            # Новые соединения потоков создаются с этими OPTIONS
+            connection.close()
+            connection.settings_dict['OPTIONS'] = options
+            connection.ensure_connection()
+            stats, elapsed = run_load(user, computer_ids, seconds)
+            reads = [duration for kind, duration, ok in stats if kind == 'read' and ok]
+            writes = [duration for kind, duration, ok in stats if kind == 'write' and ok]
+            results.append({
+                'variant': name,
+                'rows': len(stats),
+                'seconds': elapsed,
+                'rows_per_second': len(stats) / elapsed,
+                'reads_per_second': len(reads) / elapsed,
+                'writes_per_second': len(writes) / elapsed,
+                'read_p95_ms': percentile(reads, 0.95) * 1000,
+                'write_p95_ms': percentile(writes, 0.95) * 1000,
+                'errors': sum(1 for _, _, ok in stats if not ok),
+            })
+    finally:
+        connection.close()
+        connection.settings_dict['OPTIONS'] = configured_options
+    clear_inventory()
+    return results
+
+
+# Сценарий endpoints: журнал на каждый компьютер, число пользователей и повторов запросов
+ENDPOINT_CHANGES_PER_COMPUTER = 10
+ENDPOINT_USERS = 500
+ENDPOINT_REQUESTS = 50
+ENDPOINT_HEAVY_REQUESTS = 3
+ENDPOINT_IMPORT_ROWS = 1000
+
+
+def measure_requests(name, send, count):
+    """Выполняет запрос count раз; возвращает задержки, пропускную способность и число SQL-запросов."""
+    durations = []
+    with count_queries() as queries:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = send()
+            if response.streaming:
+                b''.join(response.streaming_content)
+            durations.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: ответ {response.status_code}")
+    elapsed = sum(durations)
+    return {
+        'variant': name,
+        'rows': count,
+        'seconds': elapsed,
+        'rows_per_second': count / elapsed if elapsed else 0,
+        'p50_ms': percentile(durations, 0.5) * 1000,
+        'p95_ms': percentile(durations, 0.95) * 1000,
+        'queries_per_request': queries['count'] / count,
+    }
+
+
+def bench_endpoints(size):
+    """
+    Горячие эндпоинты API через APIClient с аутентификацией по токену.
+    База: size компьютеров, ENDPOINT_CHANGES_PER_COMPUTER записей журнала
+    на компьютер и ENDPOINT_USERS пользователей; rows — число запросов,
+    rows_per_second — запросов в секунду.
+    """
+    password = secrets.token_urlsafe(12)
+    users = seed_dataset(size, size * ENDPOINT_CHANGES_PER_COMPUTER, ENDPOINT_USERS, password, admins=True)
+    roles = seed_roles(admins=True)
+    admin = next(user for n, user in enumerate(users) if roles[n % len(roles)] == 'admin')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {ExpiringToken.objects.get(user=admin).key}")
+    login = APIClient()
+    imported = {'start': size}
+
+    def import_csv():
+        # Каждый повтор загружает новые компьютеры, чтобы не упираться в дубликаты
+        content = make_csv(ENDPOINT_IMPORT_ROWS, start=imported['start']).encode('utf-8')
+        imported['start'] += ENDPOINT_IMPORT_ROWS
+        upload = io.BytesIO(content)
+        upload.name = 'computers.csv'
+        return client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+    requests = [
+        ('computers_page', lambda: client.get('/api/computers/computers/', {'page_size': 100}), ENDPOINT_REQUESTS),
+        ('computers_all', lambda: client.get('/api/computers/computers/'), ENDPOINT_HEAVY_REQUESTS),
+        ('changes_page', lambda: client.get('/api/computers/changes/', {'page_size': 100}), ENDPOINT_REQUESTS),
+        ('version', lambda: client.get('/api/computers/changes/version/'), ENDPOINT_REQUESTS),
+        ('head_version', lambda: client.head('/api/computers/changes/head_version/'), ENDPOINT_REQUESTS),
+        ('export_csv', lambda: client.get('/api/computers/computers/export_csv/'), ENDPOINT_HEAVY_REQUESTS),
+        ('import_csv', import_csv, ENDPOINT_HEAVY_REQUESTS),
+        ('login', lambda: login.post(
+            '/api/accounts/login/', {'username': users[0].username, 'password': password}, format='json'
+        ), ENDPOINT_HEAVY_REQUESTS),
+    ]
+    results = [measure_requests(name, send, count) for name, send, count in requests]
+    # Сначала журнал: иначе удаление пользователей обходит все их записи
+    clear_inventory()
+    User.objects.filter(username__startswith=SEED_USER_PREFIX).delete()
+    return results
+
+
+SEARCH_QUERIES = (
+    'PC-0001',
+    '10.0.3.',
+    'Пользователь 777',
+    'Киевская 305',
+    # Опечатки: находятся только через похожесть по триграммам
+    'Пользоватль 777',
+    'Киевкая 305',
+)
+
+SEARCH_REPEATS = 20
+
+
+def like_search(query, limit):
+    """Поиск через LIKE '%...%' по всем полям, как search_fields в админке."""
+    condition = Q()
+    for term in query.split():
+        term_condition = Q()
+        for field in SEARCH_FIELDS:
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return list(Computer.objects.filter(condition).order_by('computer_name', 'id')[:limit])
+
+
+def bench_search(size):
+    """
+    Поиск среди size компьютеров: LIKE по всем полям и индекс FTS5.
+    rows — число выполненных поисков, found — сколько найдено (до 20)
+    по каждому запросу из SEARCH_QUERIES.
+    """
+    seed_computers(size)
+    variants = {
+        'like': lambda query: like_search(query, 20),
+        'fts': lambda query: search_computers(query, 20),
+    }
+    results = []
+    for name, search in variants.items():
+        found = []
+        started = time.perf_counter()
+        for _ in range(SEARCH_REPEATS):
+            found = [len(search(query)) for query in SEARCH_QUERIES]
+        elapsed = time.perf_counter() - started
+        searches = SEARCH_REPEATS * len(SEARCH_QUERIES)
+        results.append({
+            'variant': name,
+            'rows': searches,
+            'seconds': elapsed,
+            'rows_per_second': searches / elapsed if elapsed else 0,
+            'ms_per_search': elapsed * 1000 / searches,
+            'found': '/'.join(str(count) for count in found),
+        })
+    clear_inventory()
+    return results
+
+
+SUBNET = ipaddress.IPv4Network('10.0.4.0/22')
+
+SUBNET_REPEATS = 20
+
+
+def legacy_subnet_report(network):
+    """Подсеть и свободные адреса разбором строк всех компьютеров, как на клиенте."""
+    used = set()
+    computers = []
+    for computer_id, ip_address in Computer.objects.values_list('id', 'ip_address'):
+        address = ipaddress.IPv4Address(ip_address)
+        if address in network:
+            used.add(int(address))
+            computers.append(computer_id)
+    first, last = host_bounds(network)
+    free = [number for number in range(first, last + 1) if number not in used]
+    return len(computers), len(free)
+
+
+def indexed_subnet_report(network):
+    computers = ComputerFilter().filter_params(Computer.objects.all(), {'cidr': str(network)})
+    return len(computers.values_list('id', flat=True)), free_addresses(network)['free']
+
+
+def bench_subnets(size):
+    """
+    Компьютеры подсети SUBNET и отчет о свободных адресах среди size компьютеров:
+    разбором всех адресов в Python и выборкой по индексу ip_number.
+    rows — число отчетов.
+    """
+    seed_computers(size)
+    variants = {
+        'legacy': legacy_subnet_report,
+        'indexed': indexed_subnet_report,
+    }
+    results = []
+    for name, report in variants.items():
+        with count_queries() as queries:
+            started = time.perf_counter()
+            for _ in range(SUBNET_REPEATS):
+                in_subnet, free = report(SUBNET)
+            elapsed = time.perf_counter() - started
+        results.append({
+            'variant': name,
+            'rows': SUBNET_REPEATS,
+            'seconds': elapsed,
+            'rows_per_second': SUBNET_REPEATS / elapsed if elapsed else 0,
+            'ms_per_report': elapsed * 1000 / SUBNET_REPEATS,
+            'in_subnet': in_subnet,
+            'free': free,
+            'queries': queries['count'] // SUBNET_REPEATS,
+        })
+    clear_inventory()
+    return results
+
+
+STATS_REPEATS = 5
+
+
+def client_side_stats():
+    """Статистика так, как ее считал браузер: весь список компьютеров через API."""
+    computers = ComputerSerializer(Computer.objects.all(), many=True).data
+    JSONRenderer().render(computers)
+    counters = {field: Counter() for field in Computer.STATS_FIELDS}
+    for computer in computers:
+        for field in Computer.STATS_FIELDS:
+            counters[field][computer[field]] += 1
+    return counters
+
+
+def group_by_stats():
+    """Статистика группировкой по таблице компьютеров при каждом запросе."""
+    return {
+        field: list(Computer.objects.order_by().values(field).annotate(count=Count('id')))
+        for field in Computer.STATS_FIELDS
+    }
+
+
+def bench_stats(size):
+    """
+    Статистика инвентаря среди size компьютеров: весь список через API
+    с подсчетом на клиенте, GROUP BY при каждом запросе и таблица InventoryStat.
+    rows — число запросов статистики.
+    """
+    seed_computers(size)
+    variants = {
+        'client_side': client_side_stats,
+        'group_by': group_by_stats,
+        'summary': inventory_stats,
+    }
+    results = []
+    for name, stats in variants.items():
+        with count_queries() as queries:
+            started = time.perf_counter()
+            for _ in range(STATS_REPEATS):
+                stats()
+            elapsed = time.perf_counter() - started
+        results.append({
+            'variant': name,
+            'rows': STATS_REPEATS,
+            'seconds': elapsed,
+            'rows_per_second': STATS_REPEATS / elapsed if elapsed else 0,
+            'ms_per_request': elapsed * 1000 / STATS_REPEATS,
+            'queries': queries['count'] // STATS_REPEATS,
+        })
+    clear_inventory()
+    return results
+
+
+SCENARIOS = {
+    'import': bench_import,
+    'csv_parse': bench_csv_parse,
+    'export': bench_export,
+    'events': bench_events,
+    'changes_list': bench_changes_list,
+    'concurrency': bench_concurrency,
+    'bulk': bench_bulk,
+    'endpoints': bench_endpoints,
+    'search': bench_search,
+    'subnets': bench_subnets,
+    'stats': bench_stats,
+}
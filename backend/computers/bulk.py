@@ -0,0 +1,162 @@
+from collections import Counter
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .events import broker
+from .models import Computer, Changes, DataVersion
+from .search import SEARCH_FIELDS, index_computers, unindex_computers
+from .stats import apply_stats_deltas, change_deltas, stats_deltas
+from .serializers import ComputerSerializer
+
+
+# Сколько компьютеров из затронутых попадает в запись журнала с полными данными
+BULK_SUMMARY_SIZE = 1000
+
+# Данные удаленного компьютера в записи журнала
+DELETED_SUMMARY_FIELDS = ('id', 'computer_name', 'ip_address', 'location_address', 'office')
+
+
+def publish_on_commit(event_type, items):
+    def publish():
+        for data in items:
+            broker.publish(event_type, data)
+    transaction.on_commit(publish)
+
+
+def delete_rows(model, ids=None):
+    """
+    Удаляет строки model с первичными ключами ids (все строки, если ids не задан)
+    запросами DELETE, без загрузки объектов и сигналов post_delete.
+    Связанные записи и производные данные обновляет вызывающий код.
+    """
+    qn = connection.ops.quote_name
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        if ids is None:
+            cursor.execute(f"DELETE FROM {table}")
+            return
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def delete_related(ids, modified_at):
+    """
+    Обрабатывает ссылки на удаляемые компьютеры по их on_delete, как QuerySet.delete().
+    """
+    for relation in Computer._meta.related_objects:
+        related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': ids})
+        if relation.on_delete is models.SET_NULL:
+            updated = related.update(**{relation.field.name: None})
+            # Записи журнала изменились: версия журнала тоже
+            if updated and relation.related_model is Changes:
+                DataVersion.bump(DataVersion.CHANGES, 0, modified_at)
+        elif relation.on_delete is models.CASCADE:
+            related.delete()
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise ValueError(f"Массовое удаление не поддерживает on_delete у {relation}")
+
+
+def bulk_update_computers(ids, values, user=None):
+    """
+    Записывает одинаковые значения values компьютерам ids одним UPDATE ... IN
+    в одной транзакции.
+
+    Сигналы post_save при этом не отправляются: версия списка и индекс
+    поиска, статистика обновляются один раз, а в журнал пишется одна запись со всеми отличиями
+    (одно уведомление вместо письма на каждый компьютер).
+    Возвращает количество измененных компьютеров и запись журнала (или None).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        computers = list(Computer.objects.select_for_update().filter(pk__in=ids).order_by('pk'))
+        changed = []
+        diffs = []
+        stats = Counter()
+        for computer in computers:
+            old_stats = computer.stats_values()
+            diff = {}
+            for field, value in values.items():
+                old = getattr(computer, field)
+                if old != value:
+                    diff[field] = {'from': old, 'to': value}
+                    setattr(computer, field, value)
+            if diff:
+                computer.updated_at = now
+                changed.append(computer)
+                stats.update(change_deltas(old_stats, computer.stats_values()))
+                diffs.append({
+                    'id': computer.pk,
+                    'computer_name': computer.computer_name,
+                    'ip_address': computer.ip_address,
+                    'changes': diff,
+                })
+        if not changed:
+            return 0, None
+
+        # Значения у всех одинаковые: достаточно UPDATE без CASE по каждой строке
+        Computer.objects.filter(pk__in=[computer.pk for computer in changed]).update(**values, updated_at=now)
+        DataVersion.bump(DataVersion.COMPUTERS, 0, now)
+        if any(field in SEARCH_FIELDS for field in values):
+            index_computers(changed)
+        apply_stats_deltas(stats)
+        change = Changes.objects.create(
+            user=user,
+            computer_name=f"Массовое изменение ({len(changed)} шт.)",
+            computer_ip="N/A",
+            change_description={
+                'action': 'bulk_update',
+                'count': len(changed),
+                # Ключи changes — измененные поля (по ним работает фильтр ?field=)
+                'changes': {
+                    field: {'to': value}
+                    for field, value in values.items()
+                    if any(field in diff['changes'] for diff in diffs)
+                },
+                'computers': diffs[:BULK_SUMMARY_SIZE],
+            }
+        )
+        if broker.subscriber_count:
+            publish_on_commit('computer_updated', ComputerSerializer(changed, many=True).data)
+    return len(changed), change
+
+
+def bulk_delete_computers(ids, user=None):
+    """
+    Удаляет компьютеры ids одним DELETE ... IN в одной транзакции
+    и записывает в журнал одну запись со списком удаленных.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            Computer.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+            .values_list(*DELETED_SUMMARY_FIELDS, *Computer.STATS_FIELDS)
+        )
+        if not rows:
+            return 0, None
+        summary_size = len(DELETED_SUMMARY_FIELDS)
+        deleted = [dict(zip(DELETED_SUMMARY_FIELDS, row[:summary_size])) for row in rows]
+        deleted_ids = [computer['id'] for computer in deleted]
+
+        delete_related(deleted_ids, now)
+        # Без обхода объектов и сигналов post_delete: ниже вызываются те же функции,
+        # что и в обработчиках сигналов (версия, индекс, статистика, события)
+        delete_rows(Computer, deleted_ids)
+        DataVersion.bump(DataVersion.COMPUTERS, -len(deleted), now)
+        unindex_computers(deleted_ids)
+        apply_stats_deltas(stats_deltas((row[summary_size:] for row in rows), -1))
+        change = Changes.objects.create(
+            user=user,
+            computer_name=f"Массовое удаление ({len(deleted)} шт.)",
+            computer_ip="N/A",
+            change_description={
+                'action': 'bulk_delete',
+                'count': len(deleted),
+                'computers': deleted[:BULK_SUMMARY_SIZE],
+            }
+        )
+        if broker.subscriber_count:
+            publish_on_commit('computer_deleted', [{'id': computer_id} for computer_id in deleted_ids])
+    return len(deleted), change
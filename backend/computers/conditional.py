@@ -0,0 +1,60 @@
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import DataVersion
+
+
+class ConditionalResponseMixin:
+    """
+    ETag и Last-Modified для list/retrieve на основе версий данных (DataVersion).
+
+    Валидаторы вычисляются до выполнения запроса к таблице и сериализации:
+    если клиент прислал совпадающий If-None-Match или If-Modified-Since,
+    ответ 304 отдается сразу, после одного запроса к DataVersion.
+    """
+    version_names = ()
+
+    def get_validators(self, request):
+        found = DataVersion.objects.in_bulk(self.version_names)
+        versions = [found.get(name) or DataVersion.rebuild(name) for name in self.version_names]
+        marker = ':'.join(f"{version.name}={version.sequence}" for version in versions)
+        # Представление зависит от параметров запроса и формата ответа
+        digest = hashlib.md5(
+            f"{marker}|{request.get_full_path()}|{request.accepted_media_type}".encode()
+        ).hexdigest()
+        last_modified = max(
+            (version.last_modified for version in versions if version.last_modified),
+            default=None
+        )
+        return f'"{digest}"', last_modified
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        # Last-Modified точен до секунды: пока секунда изменения не закончилась,
+        # в ней возможны еще изменения, и If-Modified-Since дал бы устаревший 304.
+        # В этом случае заголовок не отдается, проверка идет только по ETag
+        if timestamp is not None and timestamp >= int(timezone.now().timestamp()):
+            timestamp = None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Браузер хранит ответ, но перепроверяет его при каждом запросе
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
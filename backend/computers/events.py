@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import DataVersion
+
+
+class EventBroker:
+    """
+    Внутрипроцессная рассылка событий подписчикам потока SSE.
+
+    Событие сериализуется один раз при публикации и раскладывается по очередям
+    подписчиков в их цикле событий, поэтому рассылка не обращается к базе
+    и стоит одинаково для любого числа подписчиков. Если подписчиков
+    в процессе нет (subscriber_count), сигналы событие не собирают вовсе.
+
+    Сигналы видят только записи своего процесса. Изменения из других
+    воркеров gunicorn и из run_jobs замечает наблюдатель версий: пока
+    есть подписчики, он раз в EVENTS_VERSION_POLL_INTERVAL секунд читает
+    DataVersion (один запрос на процесс) и рассылает version_changed.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._watchers = {}
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Регистрирует подписчика; вызывается из работающего цикла событий."""
+        loop = asyncio.get_running_loop()
+        subscriber = (loop, asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if loop not in self._watchers:
+                self._watchers[loop] = loop.create_task(self._watch_versions(loop))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type, data, loop=None):
+        """Рассылает событие (только подписчикам цикла loop, если он задан); безопасно вызывать из любого потока."""
+        message = format_event(next(self._ids), event_type, data)
+        with self._lock:
+            subscribers = [
+                subscriber for subscriber in self._subscribers
+                if loop is None or subscriber[0] is loop
+            ]
+        for subscriber in subscribers:
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self.unsubscribe(subscriber)
+
+    def _has_subscribers(self, loop):
+        with self._lock:
+            if any(subscriber[0] is loop for subscriber in self._subscribers):
+                return True
+            # Наблюдатель завершается вместе с последним подписчиком цикла
+            self._watchers.pop(loop, None)
+            return False
+
+    async def _watch_versions(self, loop):
+        versions = await sync_to_async(load_versions)()
+        while True:
+            await asyncio.sleep(settings.EVENTS_VERSION_POLL_INTERVAL)
+            if not self._has_subscribers(loop):
+                return
+            current = await sync_to_async(load_versions)()
+            if current != versions:
+                versions = current
+                self.publish('version_changed', current, loop=loop)
+
+    @staticmethod
+    def _deliver(queue, message):
+        if queue.full():
+            # Медленный подписчик теряет самое старое событие, а не блокирует рассылку
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+def load_versions():
+    return dict(DataVersion.objects.values_list('name', 'sequence'))
+
+
+def format_event(event_id, event_type, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+def change_event_data(change):
+    return {
+        'id': change.id,
+        'computer': change.computer_id,
+        'computer_name': change.computer_name,
+        'computer_ip': change.computer_ip,
+        'user': change.user_id,
+        'action': change.action,
+        'change_description': change.change_description,
+        'change_date': change.change_date,
+    }
+
+
+broker = EventBroker()
@@ -0,0 +1,105 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+from .models import Changes
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    'computer_name',
+    'ip_address',
+    'location_address',
+    'floor',
+    'office',
+    'domain',
+    'pc_owner',
+    'pc_owner_position_at_work',
+    'has_kaspersky',
+    'operating_system',
+    'comment'
+]
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи в файл."""
+
+    def write(self, value):
+        return value
+
+
+def log_export(user, exported_count):
+    """Запись о выгрузке в журнал изменений."""
+    Changes.objects.create(
+        user=user,
+        computer_name="CSV экспорт",
+        computer_ip="N/A",
+        change_description={
+            'action': 'csv_export',
+            'exported_count': exported_count
+        }
+    )
+
+
+def iter_computers_csv(queryset, on_complete=None, chunk_size=EXPORT_CHUNK_SIZE, on_progress=None):
+    """
+    Генератор CSV-выгрузки компьютеров для StreamingHttpResponse.
+
+    Строки читаются через values_list().iterator() без создания экземпляров
+    модели и отдаются клиенту пачками по chunk_size. После каждой пачки
+    вызывается on_progress(exported_count), после выгрузки последней
+    строки — on_complete(exported_count).
+    """
+    writer = csv.writer(Echo())
+    kaspersky_index = EXPORT_FIELDS.index('has_kaspersky')
+
+    yield writer.writerow(EXPORT_FIELDS)
+
+    exported_count = 0
+    lines = []
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for values in rows:
+        values = list(values)
+        values[kaspersky_index] = 'Да' if values[kaspersky_index] else 'Нет'
+        lines.append(writer.writerow(values))
+        exported_count += 1
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+            if on_progress is not None:
+                on_progress(exported_count)
+
+    if lines:
+        yield ''.join(lines)
+    if on_progress is not None:
+        on_progress(exported_count)
+
+    if on_complete is not None:
+        on_complete(exported_count)
+
+
+async def iter_in_thread(iterator):
+    """
+    Асинхронная обертка синхронного итератора ответа.
+
+    Синхронный итератор StreamingHttpResponse под ASGI Django читает целиком
+    (sync_to_async(list)) и держит весь ответ в памяти; здесь каждая часть
+    читается отдельным вызовом в потоке запроса и сразу уходит клиенту.
+    """
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while (part := await sync_to_async(next)(iterator, done)) is not done:
+            yield part
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_content(request, iterator):
+    """Содержимое потокового ответа: под ASGI — асинхронный итератор, под WSGI — как есть."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return iter_in_thread(iterator)
+    return iterator
@@ -0,0 +1,155 @@
+import ipaddress
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def parse_int_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: f"Ожидается целое число, получено '{value}'"})
+
+
+def parse_bool_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise ValidationError({name: f"Ожидается true или false, получено '{value}'"})
+
+
+def parse_date_param(params, name):
+    """Возвращает начало указанного дня в текущем часовом поясе."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise ValidationError({name: f"Ожидается дата в формате ГГГГ-ММ-ДД, получено '{value}'"})
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def parse_cidr_param(params, name):
+    """Подсеть IPv4 вида 192.168.4.0/22; биты адреса хоста отбрасываются."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return ipaddress.IPv4Network(value.strip(), strict=False)
+    except ValueError:
+        raise ValidationError({name: f"Ожидается подсеть IPv4 вида 192.168.4.0/22, получено '{value}'"})
+
+
+def parse_ip_range_param(params, name):
+    """Диапазон "начальный-конечный" IPv4-адрес включительно; возвращает пару чисел."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        start, end = (int(ipaddress.IPv4Address(part.strip())) for part in value.split('-'))
+    except ValueError:
+        raise ValidationError({name: f"Ожидается диапазон вида 10.0.0.1-10.0.0.254, получено '{value}'"})
+    if start > end:
+        raise ValidationError({name: 'Начальный адрес диапазона больше конечного'})
+    return start, end
+
+
+class ComputerFilter(BaseFilterBackend):
+    """Серверная фильтрация компьютеров по параметрам, совпадающим с полями фильтра на клиенте."""
+
+    text_fields = (
+        'computer_name',
+        'ip_address',
+        'pc_owner',
+        'location_address',
+        'office',
+        'domain',
+        'operating_system',
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        return self.filter_params(queryset, request.query_params)
+
+    def filter_params(self, queryset, params):
+        """Фильтрует по словарю параметров (используется и фоновым экспортом)."""
+        for field in self.text_fields:
+            value = params.get(field)
+            if value:
+                queryset = queryset.filter(**{f'{field}__icontains': value})
+
+        floor = parse_int_param(params, 'floor')
+        if floor is not None:
+            queryset = queryset.filter(floor=floor)
+
+        has_kaspersky = parse_bool_param(params, 'has_kaspersky')
+        if has_kaspersky is not None:
+            queryset = queryset.filter(has_kaspersky=has_kaspersky)
+
+        # Подсеть и диапазон адресов — выборка по индексу ip_number
+        network = parse_cidr_param(params, 'cidr')
+        if network is not None:
+            queryset = queryset.filter(
+                ip_number__range=(int(network.network_address), int(network.broadcast_address))
+            )
+
+        ip_range = parse_ip_range_param(params, 'ip_range')
+        if ip_range is not None:
+            queryset = queryset.filter(ip_number__range=ip_range)
+
+        return queryset
+
+
+class ChangesFilter(BaseFilterBackend):
+    """
+    Серверная фильтрация журнала изменений.
+
+    Диапазон дат превращается в сравнения по change_date (без __date),
+    чтобы запрос мог использовать индекс по дате. Действие и измененное поле
+    ищутся по колонкам, извлеченным из описания, а не по самому описанию.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        computer_name = params.get('computer_name')
+        if computer_name:
+            queryset = queryset.filter(computer_name__icontains=computer_name)
+
+        user = parse_int_param(params, 'user')
+        if user is not None:
+            queryset = queryset.filter(user_id=user)
+
+        username = params.get('username')
+        if username:
+            queryset = queryset.filter(user__username__icontains=username)
+
+        action = params.get('action')
+        if action:
+            queryset = queryset.filter(action=action)
+
+        field = params.get('field')
+        if field:
+            queryset = queryset.filter(changed_fields__contains=f',{field},')
+
+        date_from = parse_date_param(params, 'date_from')
+        if date_from is not None:
+            queryset = queryset.filter(change_date__gte=date_from)
+
+        date_to = parse_date_param(params, 'date_to')
+        if date_to is not None:
+            queryset = queryset.filter(change_date__lt=date_to + timedelta(days=1))
+
+        return queryset
@@ -0,0 +1,259 @@
+import codecs
+import io
+from contextlib import nullcontext
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Computer, Changes, DataVersion, ImportRun
+from .search import index_computers
+from .stats import apply_stats_deltas, stats_deltas
+
+
+IMPORT_BATCH_SIZE = 500
+
+# Поля, которые при импорте допускается оставлять пустыми,
+# хотя в модели они обязательны (так было и в построчном импорте)
+IMPORT_BLANK_FIELDS = ('domain', 'operating_system')
+
+# Сколько компьютеров и ошибок попадает в сводку импорта в журнале;
+# полный список хранится в ImportRun
+IMPORT_SUMMARY_SIZE = 5
+
+# Кодировка файла без BOM, который не читается как UTF-8 (CSV из Excel в русской Windows)
+CSV_FALLBACK_ENCODING = 'cp1251'
+CSV_DELIMITERS = (',', ';', '\t')
+# Начало файла, по которому определяются кодировка и разделитель
+CSV_SAMPLE_SIZE = 64 * 1024
+
+
+def detect_csv_encoding(sample):
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # Образец может обрываться посреди многобайтового символа
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return CSV_FALLBACK_ENCODING
+
+
+def open_csv(file):
+    """
+    Открывает двоичный файл CSV (загруженный или из хранилища) как текстовый
+    поток, не читая его целиком. Кодировка определяется по BOM или по началу
+    файла, разделитель — по строке заголовка (Excel сохраняет CSV через ';').
+
+    Возвращает поток и разделитель для csv.DictReader.
+    """
+    while isinstance(file, File):
+        # Без прокси File поток читает файл напрямую, через read1
+        file = file.file
+    sample = file.read(CSV_SAMPLE_SIZE)
+    file.seek(0)
+    encoding = detect_csv_encoding(sample)
+    header = next(iter(sample.decode(encoding, errors='ignore').splitlines()), '')
+    # При равенстве (в том числе без разделителей) выбирается запятая
+    delimiter = max(CSV_DELIMITERS, key=header.count)
+    return io.TextIOWrapper(file, encoding=encoding, newline=''), delimiter
+
+
+def _format_error(error):
+    if isinstance(error, ValidationError):
+        if hasattr(error, 'error_dict'):
+            return '; '.join(
+                f"{field}: {' '.join(messages)}"
+                for field, messages in error.message_dict.items()
+            )
+        return ' '.join(error.messages)
+    return str(error)
+
+
+def build_computer(row):
+    """Создает (не сохраняя) компьютер из строки CSV и проверяет значения полей."""
+    computer = Computer(
+        computer_name=row['computer_name'],
+        ip_address=row['ip_address'],
+        location_address=row['location_address'],
+        floor=int(row['floor']),
+        office=row['office'],
+        domain=row.get('domain', ''),
+        pc_owner=row.get('pc_owner', ''),
+        pc_owner_position_at_work=row.get('pc_owner_position_at_work', ''),
+        has_kaspersky=row.get('has_kaspersky', 'false').lower() == 'true',
+        operating_system=row.get('operating_system', ''),
+        comment=row.get('comment', '')
+    )
+    computer.clean_fields(exclude=IMPORT_BLANK_FIELDS)
+    # bulk_create не вызывает save()
+    computer.fill_ip_number()
+    return computer
+
+
+def import_computers(rows, user=None, batch_size=IMPORT_BATCH_SIZE, on_progress=None, atomic=True):
+    """
+    Массовый импорт компьютеров из строк CSV (словарей csv.DictReader).
+
+    Дубликаты (имя + IP) проверяются по множеству, загруженному одним запросом,
+    строки сохраняются пачками через bulk_create в одной транзакции.
+    Ошибки валидации отдельных строк не прерывают импорт и возвращаются в errors.
+    После каждой пачки вызывается on_progress(total_rows).
+
+    С atomic=False каждая пачка фиксируется отдельной транзакцией, чтобы
+    прогресс фоновой задачи был виден другим соединениям; вместе с пачкой
+    обновляется ImportRun. Запись в журнале создается один раз по окончании
+    импорта, в том числе прерванного ошибкой, и больше не меняется: клиенты
+    получают журнал инкрементально (changes/?since=) только по новым записям.
+    """
+    imported_count = 0
+    errors = []
+    total_rows = 0
+    imported_computers = []
+    pending = []
+    import_run = None
+
+    def write_run(details=True):
+        """
+        Сводка импорта в ImportRun. Полный список (details) перезаписывается
+        только в конце: сжатие всего списка на каждой пачке сделало бы импорт квадратичным.
+        """
+        nonlocal import_run
+        if import_run is None:
+            import_run = ImportRun(user=user)
+            details = True
+        import_run.total_rows = total_rows
+        import_run.imported_count = imported_count
+        import_run.error_count = len(errors)
+        if details:
+            import_run.set_details(imported_computers, errors)
+        import_run.save()
+
+    def write_log():
+        write_run()
+        Changes.objects.create(
+            user=user,
+            computer_name=f"CSV импорт ({imported_count} шт.)",
+            computer_ip="N/A",
+            change_description={
+                'action': 'csv_import',
+                'import_run': import_run.id,
+                'imported_count': imported_count,
+                'total_rows': total_rows,
+                'error_count': len(errors),
+                'errors': errors[:IMPORT_SUMMARY_SIZE],
+                'imported_preview': [
+                    {'computer_name': computer['computer_name'], 'ip_address': computer['ip_address']}
+                    for computer in imported_computers[:IMPORT_SUMMARY_SIZE]
+                ]
+            }
+        )
+
+    def insert_pending():
+        """
+        Сохраняет пачку одним bulk_create. Если пачка нарушает уникальность
+        (компьютер добавлен параллельно), строки сохраняются по одной,
+        а конфликтующие пропускаются с ошибкой. Возвращает сохраненные компьютеры.
+        """
+        nonlocal imported_count
+        computers = [computer for _, computer in pending]
+        try:
+            with transaction.atomic():
+                Computer.objects.bulk_create(computers, batch_size=batch_size)
+            return computers
+        except IntegrityError:
+            pass
+        saved = []
+        for row_num, computer in pending:
+            computer.pk = None
+            try:
+                with transaction.atomic():
+                    Computer.objects.bulk_create([computer])
+            except IntegrityError:
+                imported_count -= 1
+                errors.append(
+                    f"Строка {row_num}: Компьютер с именем {computer.computer_name} "
+                    f"и IP {computer.ip_address} уже существует"
+                )
+            else:
+                saved.append(computer)
+        return saved
+
+    def flush():
+        with transaction.atomic():
+            saved = insert_pending()
+            # bulk_create не отправляет сигналы: версию списка, индекс поиска
+            # и статистику обновляем вручную
+            DataVersion.bump(DataVersion.COMPUTERS, len(saved), timezone.now())
+            index_computers(saved)
+            apply_stats_deltas(stats_deltas((computer.stats_values() for computer in saved), 1))
+            for computer in saved:
+                imported_computers.append({
+                    'computer_name': computer.computer_name,
+                    'ip_address': computer.ip_address,
+                    'location': f"{computer.location_address}, каб. {computer.office}",
+                    'os': computer.operating_system,
+                    'kaspersky': 'Да' if computer.has_kaspersky else 'Нет',
+                    'pc_owner': computer.pc_owner,
+                    'position': computer.pc_owner_position_at_work
+                })
+            if not atomic:
+                # Без общей транзакции ImportRun обновляется вместе с каждой пачкой:
+                # сохраненные строки видны в нем, даже если обработчик остановят
+                write_run(details=False)
+        pending.clear()
+
+    with transaction.atomic() if atomic else nullcontext():
+        existing = set(Computer.objects.values_list('computer_name', 'ip_address'))
+
+        try:
+            for row_num, row in enumerate(rows, 1):
+                total_rows += 1
+                try:
+                    computer = build_computer(row)
+                    # Ключ по очищенным значениям: clean_fields убирает, например, пробелы вокруг IP
+                    key = (computer.computer_name, computer.ip_address)
+                    if key in existing:
+                        raise ValueError(f"Компьютер с именем {key[0]} и IP {key[1]} уже существует")
+
+                    pending.append((row_num, computer))
+                    existing.add(key)
+                    imported_count += 1
+                except Exception as e:
+                    errors.append(f"Строка {row_num}: {_format_error(e)}")
+
+                if len(pending) >= batch_size:
+                    flush()
+                    if on_progress is not None:
+                        on_progress(total_rows)
+
+            if pending:
+                flush()
+            if on_progress is not None:
+                on_progress(total_rows)
+        except Exception as e:
+            if atomic:
+                raise
+            # Сохраненные пачки остаются, несохраненная — нет
+            imported_count -= len(pending)
+            pending.clear()
+            errors.append(f"Импорт прерван: {e}")
+            if imported_count > 0:
+                with transaction.atomic():
+                    write_log()
+            raise
+
+        if imported_count > 0:
+            with transaction.atomic():
+                write_log()
+
+    return {
+        'imported_count': imported_count,
+        'total_rows': total_rows,
+        'errors': errors,
+        'imported_computers': imported_computers,
+        'import_run': import_run,
+    }
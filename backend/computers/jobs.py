@@ -0,0 +1,148 @@
+import csv
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .exporters import iter_computers_csv, log_export
+from .filters import ComputerFilter
+from .importers import import_computers, open_csv
+from .models import Computer, Job
+
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_job():
+    """
+    Забирает самую старую задачу из очереди.
+
+    Статус меняется условным UPDATE, поэтому несколько обработчиков
+    не возьмут одну задачу дважды.
+    """
+    for job in Job.objects.filter(status='pending').order_by('created_at', 'id')[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status='pending').update(
+            status='running', started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def report_progress(job, rows_processed):
+    # Отчет о прогрессе продлевает аренду задачи
+    Job.objects.filter(pk=job.pk).update(rows_processed=rows_processed, heartbeat_at=timezone.now())
+
+
+def fail_abandoned_jobs():
+    """
+    Завершает с ошибкой задачи, обработчик которых остановился, не закончив их
+    (статус running без отклика дольше JOB_LEASE_TIMEOUT). Повторно они
+    не запускаются: импорт мог успеть сохранить часть строк.
+    Возвращает количество таких задач.
+    """
+    now = timezone.now()
+    abandoned = Job.objects.filter(
+        status='running', heartbeat_at__lt=now - timedelta(seconds=settings.JOB_LEASE_TIMEOUT)
+    )
+    count = abandoned.update(
+        status='failed', finished_at=now,
+        error='Обработчик задачи остановился, не завершив ее. Запустите задачу заново'
+    )
+    if count:
+        logger.warning("Брошенных фоновых задач: %s", count)
+    return count
+
+
+def run_import(job):
+    with job.input_file.open('rb') as file:
+        text, delimiter = open_csv(file)
+        # Первый проход только считает строки, чтобы показывать процент выполнения
+        total_rows = sum(1 for _ in csv.DictReader(text, delimiter=delimiter))
+        Job.objects.filter(pk=job.pk).update(total_rows=total_rows)
+
+        text.seek(0)
+        result = import_computers(
+            csv.DictReader(text, delimiter=delimiter),
+            user=job.user,
+            on_progress=lambda rows: report_progress(job, rows),
+            atomic=False
+        )
+
+    # Загруженный файл больше не нужен: результат импорта хранится в ImportRun
+    job.input_file.delete(save=False)
+
+    imported_count = result['imported_count']
+    job.total_rows = result['total_rows']
+    job.rows_processed = result['total_rows']
+    job.result = {
+        'imported_count': imported_count,
+        'total_rows': result['total_rows'],
+        'errors': result['errors'],
+        'import_run': result['import_run'].id if result['import_run'] else None,
+        'message': f"Импортировано {imported_count} из {result['total_rows']} строк"
+    }
+
+
+def run_export(job):
+    queryset = ComputerFilter().filter_params(Computer.objects.all(), job.params)
+    job.total_rows = queryset.count()
+    Job.objects.filter(pk=job.pk).update(total_rows=job.total_rows)
+
+    exported = {'count': 0}
+
+    def on_complete(exported_count):
+        exported['count'] = exported_count
+        log_export(job.user, exported_count)
+
+    with tempfile.TemporaryFile() as output:
+        for chunk in iter_computers_csv(
+            queryset,
+            on_complete=on_complete,
+            on_progress=lambda rows: report_progress(job, rows)
+        ):
+            output.write(chunk.encode('utf-8'))
+        output.seek(0)
+        job.result_file.save(f"computers_export_{job.id}.csv", File(output), save=False)
+
+    job.rows_processed = exported['count']
+    job.result = {'exported_count': exported['count']}
+
+
+JOB_RUNNERS = {
+    Job.IMPORT: run_import,
+    Job.EXPORT: run_export,
+}
+
+
+def run_job(job):
+    """Выполняет задачу; ошибка сохраняется в задаче и не прерывает обработчик."""
+    try:
+        JOB_RUNNERS[job.kind](job)
+        job.status = 'done'
+    except Exception as e:
+        logger.exception("Ошибка фоновой задачи %s", job.id)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'result', 'input_file', 'result_file', 'rows_processed', 'total_rows', 'finished_at'
+    ])
+    return job
+
+
+def run_pending_jobs():
+    """Выполняет задачи из очереди, пока она не опустеет. Возвращает их количество."""
+    fail_abandoned_jobs()
+    count = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return count
+        run_job(job)
+        count += 1
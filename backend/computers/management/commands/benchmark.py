@@ -0,0 +1,92 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+import django
+from django.utils import timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from computers.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Замеры производительности на временной тестовой базе данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*',
+            help=f"Сценарии: {', '.join(SCENARIOS)} (по умолчанию все)"
+        )
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+            help='Размеры наборов данных'
+        )
+        parser.add_argument(
+            '--report',
+            help='Сохранить результаты в JSON-файл для сравнения между коммитами'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or list(SCENARIOS)
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # Файловая база, как в production: в памяти нет WAL и блокировок файла
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                tempfile.gettempdir(), 'info_pcs_benchmark.sqlite3'
+            )
+        vendor = connection.vendor
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        results = []
+        try:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+                for scenario in scenarios:
+                    for size in options['sizes']:
+                        for result in SCENARIOS[scenario](size):
+                            self.stdout.write(self.format_result(scenario, size, result))
+                            results.append({'scenario': scenario, 'size': size, **result})
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as report:
+                json.dump(self.make_report(vendor, results), report, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Отчет сохранен: {options['report']}")
+
+    def make_report(self, vendor, results):
+        return {
+            'created_at': timezone.now().isoformat(),
+            'commit': self.get_commit(),
+            'database': vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'results': results,
+        }
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def format_result(self, scenario, size, result):
+        line = (
+            f"{scenario:<12} {result['variant']:<14} {size:>8} "
+            f"{result['seconds']:>9.3f}s "
+            f"{result['rows_per_second']:>12.0f} rows/s"
+        )
+        for key, value in result.items():
+            if key in ('variant', 'rows', 'seconds', 'rows_per_second'):
+                continue
+            line += f"  {key}={value:.3f}" if isinstance(value, float) else f"  {key}={value}"
+        return line
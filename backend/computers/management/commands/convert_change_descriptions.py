@@ -0,0 +1,88 @@
+import ast
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from computers.models import Changes, DataVersion
+
+
+BATCH_SIZE = 1000
+
+
+def parse_legacy_description(text):
+    """
+    Разбирает описание, сохраненное в TextField: JSON, repr словаря Python
+    (str(dict) из старых записей) или произвольный текст.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return text
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводит описания изменений в JSON и заполняет извлеченные из них поля. '
+        'Запускается до migrate (текстовые описания переводятся в JSON, иначе '
+        'миграция на JSONField не пройдет проверку) и после него (заполнение '
+        'action и changed_fields у существующих записей).'
+    )
+
+    def handle(self, *args, **options):
+        table = Changes._meta.db_table
+        with connection.cursor() as cursor:
+            columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+
+        converted = self.convert_text(table)
+        self.stdout.write(f"Описаний переведено в JSON: {converted}")
+
+        if 'action' not in columns:
+            self.stdout.write('Колонки action еще нет: выполните migrate и запустите команду повторно')
+            return
+
+        filled = self.fill_fields()
+        self.stdout.write(f"Записей с заполненными полями: {filled}")
+
+    def convert_text(self, table):
+        updates = []
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id, change_description FROM {connection.ops.quote_name(table)}')
+            for change_id, text in cursor.fetchall():
+                # После миграции PostgreSQL отдает уже разобранный jsonb
+                if not isinstance(text, str):
+                    continue
+                try:
+                    json.loads(text)
+                    continue
+                except ValueError:
+                    pass
+                description = parse_legacy_description(text)
+                updates.append((json.dumps(description, ensure_ascii=False, default=str), change_id))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(updates), BATCH_SIZE):
+                cursor.executemany(
+                    f'UPDATE {connection.ops.quote_name(table)} SET change_description = %s WHERE id = %s',
+                    updates[start:start + BATCH_SIZE]
+                )
+        return len(updates)
+
+    def fill_fields(self):
+        filled = 0
+        batch = []
+        with transaction.atomic():
+            for change in Changes.objects.only('id', 'change_description').iterator(chunk_size=BATCH_SIZE):
+                change.fill_description_fields()
+                batch.append(change)
+                if len(batch) >= BATCH_SIZE:
+                    filled += Changes.objects.bulk_update(batch, ['action', 'changed_fields'])
+                    batch = []
+            filled += Changes.objects.bulk_update(batch, ['action', 'changed_fields'])
+            # Представление записей изменилось: клиенты должны перезапросить журнал
+            DataVersion.rebuild(DataVersion.CHANGES)
+        return filled
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from computers.stats import rebuild_inventory_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику инвентаря по таблице компьютеров (восстановление счетчиков)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, сверяя статистику раз в INVENTORY_STATS_REBUILD_INTERVAL секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            corrected = rebuild_inventory_stats()
+            if corrected or not options['loop']:
+                self.stdout.write(f"Исправлено счетчиков: {corrected} за {time.perf_counter() - started:.1f} с")
+            if not options['loop']:
+                break
+            time.sleep(settings.INVENTORY_STATS_REBUILD_INTERVAL)
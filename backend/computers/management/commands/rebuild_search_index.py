@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from computers.search import create_search_index, rebuild_search_index, search_index_supported
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает индекс поиска компьютеров (FTS5) по таблице компьютеров'
+
+    def handle(self, *args, **options):
+        if not search_index_supported():
+            raise CommandError('Индекс поиска поддерживается только в SQLite 3.34 и новее')
+        started = time.perf_counter()
+        create_search_index()
+        indexed = rebuild_search_index()
+        self.stdout.write(f"Проиндексировано компьютеров: {indexed} за {time.perf_counter() - started:.1f} с")
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from computers.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи импорта и экспорта CSV из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь раз в JOB_POLL_INTERVAL секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done_count = run_pending_jobs()
+            if done_count:
+                self.stdout.write(f"Выполнено задач: {done_count}")
+            if not options['loop']:
+                break
+            time.sleep(settings.JOB_POLL_INTERVAL)
@@ -0,0 +1,62 @@
+import secrets
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from computers.benchmarks import SEED_USER_PREFIX, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу данных синтетическими компьютерами, журналом изменений '
+        f'и пользователями {SEED_USER_PREFIX}NNNN для замеров производительности. '
+        'Существующие компьютеры и журнал удаляются, поэтому команда выполняется '
+        'только с --i-know и только на базе для разработки или замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--computers', type=int, default=100000, help='Количество компьютеров')
+        parser.add_argument('--changes', type=int, default=1000000, help='Количество записей журнала')
+        parser.add_argument('--users', type=int, default=500, help='Количество пользователей')
+        parser.add_argument(
+            '--password',
+            help='Пароль пользователей (по умолчанию случайный, выводится по окончании)'
+        )
+        parser.add_argument(
+            '--admins', action='store_true',
+            help='Создать среди пользователей администраторов (по умолчанию только аудиторы и работники)'
+        )
+        parser.add_argument(
+            '--i-know', action='store_true', dest='i_know',
+            help='Подтверждает, что база не production: компьютеры и журнал будут удалены'
+        )
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Не запрашивать подтверждение удаления данных'
+        )
+
+    def handle(self, *args, **options):
+        database = connection.settings_dict['NAME']
+        if not options['i_know']:
+            raise CommandError(
+                f"Команда удаляет все компьютеры и журнал изменений в базе {database}. "
+                "Если это база для разработки или замеров, запустите ее с --i-know"
+            )
+        if options['interactive']:
+            answer = input(
+                f"Компьютеры и журнал изменений в базе {database} будут удалены. "
+                "Продолжить? Введите 'yes': "
+            )
+            if answer != 'yes':
+                raise CommandError('Отменено')
+
+        password = options['password'] or secrets.token_urlsafe(12)
+        started = time.perf_counter()
+        seed_dataset(options['computers'], options['changes'], options['users'], password, options['admins'])
+        self.stdout.write(
+            f"Создано компьютеров: {options['computers']}, записей журнала: {options['changes']}, "
+            f"пользователей: {options['users']} за {time.perf_counter() - started:.1f} с"
+        )
+        if not options['password']:
+            self.stdout.write(f"Пароль пользователей {SEED_USER_PREFIX}NNNN: {password}")
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from computers.notifications import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет накопившиеся уведомления об изменениях дайджестами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, отправляя дайджест раз в NOTIFICATION_DIGEST_WINDOW секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent_count = deliver_pending()
+            if sent_count:
+                self.stdout.write(f"Отправлено уведомлений: {sent_count}")
+            if not options['loop']:
+                break
+            time.sleep(settings.NOTIFICATION_DIGEST_WINDOW)
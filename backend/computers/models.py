@@ -1,9 +1,14 @@
-from django.db import models
+import hashlib
+import ipaddress
+import json
+import zlib
+
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -15,6 +20,9 @@ class Computer(models.Model):
     pc_owner = models.CharField('Пользователь компьютера', max_length=100, null=True, blank=True)
     pc_owner_position_at_work = models.CharField('Должность пользователя', max_length=100, null=True, blank=True)
     ip_address = models.GenericIPAddressField('IP-адрес', protocol='IPv4')
+    # IP-адрес числом заполняется при сохранении: по нему выборки по подсетям
+    # и диапазонам идут по индексу, а не разбором строк
+    ip_number = models.PositiveBigIntegerField('IP-адрес числом', null=True, editable=False)
     domain = models.CharField('Домен', max_length=100)
     has_kaspersky = models.BooleanField('Установлен Касперский', default=False)
     operating_system = models.CharField('Операционная система', max_length=60)
@@ -22,6 +30,24 @@ class Computer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     comment = models.CharField('Комментарий', max_length=255, null=True, blank=True)
     
+    # Поля, по которым ведется статистика инвентаря (InventoryStat)
+    STATS_FIELDS = ('operating_system', 'floor', 'domain', 'location_address', 'has_kaspersky')
+
+    def stats_values(self):
+        return tuple(getattr(self, field) for field in self.STATS_FIELDS)
+
+    def fill_ip_number(self):
+        try:
+            self.ip_number = int(ipaddress.IPv4Address(self.ip_address))
+        except ValueError:
+            self.ip_number = None
+
+    def save(self, *args, **kwargs):
+        self.fill_ip_number()
+        # Версия списка компьютеров (DataVersion) обновляется сигналом в той же транзакции
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.computer_name} ({self.ip_address})"
     
@@ -29,6 +55,17 @@ class Computer(models.Model):
         verbose_name = 'Компьютер'
         verbose_name_plural = 'Компьютеры'
         ordering = ['computer_name']
+        constraints = [
+            # Уникальный индекс по (имя, IP) обслуживает проверку дубликатов
+            # при импорте и сортировку по computer_name
+            models.UniqueConstraint(
+                fields=['computer_name', 'ip_address'],
+                name='unique_computer_name_ip'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['ip_number'], name='computer_ip_number_idx'),
+        ]
 
 class Changes(models.Model):
     computer = models.ForeignKey(
@@ -50,15 +87,40 @@ class Changes(models.Model):
         related_name='changes_made',
         verbose_name='Пользователь'
     )
-    change_description = models.TextField('Описание изменения')
+    change_description = models.JSONField('Описание изменения')
+    # Извлекаются из change_description при сохранении, чтобы фильтровать
+    # журнал по индексу, не разбирая описание
+    action = models.CharField('Действие', max_length=30, blank=True, editable=False)
+    changed_fields = models.CharField('Измененные поля', max_length=255, blank=True, editable=False)
     change_date = models.DateTimeField('Дата изменения', auto_now_add=True)
-    
+
+    def fill_description_fields(self):
+        description = self.change_description
+        if not isinstance(description, dict):
+            self.action = ''
+            self.changed_fields = ''
+            return
+        self.action = str(description.get('action') or '')[:30]
+        changes = description.get('changes')
+        # Имена в запятых с обеих сторон: поиск поля — changed_fields__contains=',имя,'
+        self.changed_fields = (
+            f",{','.join(sorted(changes))}," if isinstance(changes, dict) and changes else ''
+        )[:255]
+
     def save(self, *args, **kwargs):
         # Автоматически заполняем имя и IP компьютера при сохранении
         if self.computer:
             self.computer_name = self.computer.computer_name
             self.computer_ip = self.computer.ip_address
-        super().save(*args, **kwargs)
+        self.fill_description_fields()
+        # Версия журнала (DataVersion) обновляется сигналом в той же транзакции
+        with transaction.atomic():
+            if self._state.adding and connection.features.has_select_for_update:
+                # id выдается под блокировкой версии журнала, которую транзакция держит
+                # до фиксации: записи фиксируются в порядке id, и курсор changes/?since=
+                # не пропускает запись с меньшим id (в SQLite записи и так идут по одной)
+                list(DataVersion.objects.select_for_update().filter(pk=DataVersion.CHANGES).values_list('pk'))
+            super().save(*args, **kwargs)
     
     def __str__(self):
         return f"Изменение {self.id} для {self.computer_name or 'Удаленного компьютера'}"
@@ -67,6 +129,284 @@ class Changes(models.Model):
         verbose_name = 'Изменение'
         verbose_name_plural = 'Изменения'
         ordering = ['-change_date']
+        indexes = [
+            models.Index(fields=['-change_date', '-id'], name='changes_date_id_idx'),
+            models.Index(fields=['computer', '-change_date'], name='changes_computer_date_idx'),
+            models.Index(fields=['action', '-change_date', '-id'], name='changes_action_date_idx'),
+        ]
+
+class ImportRun(models.Model):
+    """
+    Запуск импорта CSV.
+
+    Список импортированных компьютеров и ошибки хранятся сжатым JSON
+    и загружаются только по запросу деталей импорта; в журнал изменений
+    попадает лишь короткая сводка со ссылкой на запуск.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='import_runs',
+        verbose_name='Пользователь'
+    )
+    created_at = models.DateTimeField('Дата импорта', auto_now_add=True)
+    total_rows = models.PositiveIntegerField('Строк в файле', default=0)
+    imported_count = models.PositiveIntegerField('Импортировано', default=0)
+    error_count = models.PositiveIntegerField('Ошибок', default=0)
+    details = models.BinaryField('Подробности (JSON, zlib)', editable=False)
+
+    def set_details(self, imported_computers, errors):
+        payload = json.dumps(
+            {'imported_computers': imported_computers, 'errors': errors},
+            ensure_ascii=False
+        )
+        self.details = zlib.compress(payload.encode('utf-8'))
+
+    def get_details(self):
+        if not self.details:
+            return {'imported_computers': [], 'errors': []}
+        return json.loads(zlib.decompress(self.details).decode('utf-8'))
+
+    def __str__(self):
+        return f"Импорт {self.id}: {self.imported_count} из {self.total_rows}"
+
+    class Meta:
+        verbose_name = 'Импорт CSV'
+        verbose_name_plural = 'Импорты CSV'
+        ordering = ['-created_at']
+
+class ChangesTombstone(models.Model):
+    """
+    Отметка об удаленной записи журнала изменений.
+
+    Нужна для инкрементального API (changes/?since=): клиент получает
+    идентификаторы удаленных записей и убирает их из своего кэша.
+    """
+    change_id = models.BigIntegerField('ID удаленной записи')
+    deleted_at = models.DateTimeField('Дата удаления', auto_now_add=True)
+
+    def __str__(self):
+        return f"Удаление записи {self.change_id}"
+
+    class Meta:
+        verbose_name = 'Удаленная запись журнала'
+        verbose_name_plural = 'Удаленные записи журнала'
+        ordering = ['id']
+
+class DataVersion(models.Model):
+    """
+    Версия набора данных: журнала изменений, списка компьютеров или пользователей.
+
+    Номер версии, количество записей и время последнего изменения
+    поддерживаются сигналами при добавлении, изменении и удалении записей,
+    поэтому проверка версии клиентом — один запрос по первичному ключу.
+    """
+    CHANGES = 'changes'
+    COMPUTERS = 'computers'
+    USERS = 'users'
+    NAME_CHOICES = [
+        (CHANGES, 'Журнал изменений'),
+        (COMPUTERS, 'Компьютеры'),
+        (USERS, 'Пользователи')
+    ]
+
+    name = models.CharField('Набор данных', max_length=20, choices=NAME_CHOICES, primary_key=True)
+    sequence = models.PositiveBigIntegerField('Номер версии', default=0)
+    total_count = models.PositiveIntegerField('Количество записей', default=0)
+    last_modified = models.DateTimeField('Последнее изменение', null=True, blank=True)
+
+    @property
+    def etag(self):
+        return hashlib.md5(f"{self.sequence}:{self.total_count}".encode()).hexdigest()
+
+    @classmethod
+    def current(cls, name):
+        try:
+            return cls.objects.get(pk=name)
+        except cls.DoesNotExist:
+            return cls.rebuild(name)
+
+    @classmethod
+    def rebuild(cls, name):
+        """Пересчитывает версию по таблице (первый запуск или восстановление)."""
+        model, date_field = {
+            cls.CHANGES: (Changes, 'change_date'),
+            cls.COMPUTERS: (Computer, 'updated_at'),
+            cls.USERS: (User, 'date_joined'),
+        }[name]
+        stats = model.objects.aggregate(
+            last_modified=Max(date_field),
+            total_count=Count('id')
+        )
+        with transaction.atomic():
+            version, created = cls.objects.get_or_create(
+                pk=name, defaults={**stats, 'sequence': 1}
+            )
+            if not created:
+                version.sequence += 1
+                version.total_count = stats['total_count']
+                version.last_modified = stats['last_modified']
+                version.save()
+        return version
+
+    @classmethod
+    def bump(cls, name, count_delta, modified_at):
+        updated = cls.objects.filter(pk=name).update(
+            sequence=F('sequence') + 1,
+            total_count=F('total_count') + count_delta,
+            last_modified=modified_at
+        )
+        if not updated:
+            cls.rebuild(name)
+
+    def __str__(self):
+        return f"{self.get_name_display()}: версия {self.sequence} ({self.total_count} записей)"
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+class InventoryStat(models.Model):
+    """
+    Количество компьютеров с данным значением поля из Computer.STATS_FIELDS.
+
+    Счетчики изменяются на разницу сигналами Computer и массовыми операциями
+    в той же транзакции, поэтому статистика читается одним запросом
+    к небольшой таблице независимо от числа компьютеров.
+    Расхождения после изменений без сигналов исправляет команда
+    rebuild_inventory_stats (сервис stats запускает ее периодически).
+    """
+    field_name = models.CharField('Поле', max_length=30)
+    value = models.CharField('Значение', max_length=255)
+    computer_count = models.IntegerField('Количество компьютеров', default=0)
+
+    def __str__(self):
+        return f"{self.field_name}={self.value}: {self.computer_count}"
+
+    class Meta:
+        verbose_name = 'Статистика инвентаря'
+        verbose_name_plural = 'Статистика инвентаря'
+        constraints = [
+            models.UniqueConstraint(fields=['field_name', 'value'], name='unique_inventory_stat'),
+        ]
+
+class Notification(models.Model):
+    """
+    Исходящее уведомление по e-mail (outbox).
+
+    Сигналы Changes только ставят письмо в очередь, отправляет их
+    команда send_notifications, объединяя накопившиеся письма в дайджест.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает отправки'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Ошибка отправки')
+    ]
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField('Следующая попытка', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+class Job(models.Model):
+    """
+    Фоновая задача импорта или экспорта CSV.
+
+    Веб-запрос только создает задачу и сразу возвращает ее id; выполняет
+    задачи команда run_jobs, обновляя счетчик обработанных строк.
+    Задачи, обработчик которых перестал откликаться дольше JOB_LEASE_TIMEOUT,
+    завершаются с ошибкой.
+    Результат экспорта сохраняется файлом и скачивается отдельно.
+    """
+    IMPORT = 'csv_import'
+    EXPORT = 'csv_export'
+    KIND_CHOICES = [
+        (IMPORT, 'Импорт CSV'),
+        (EXPORT, 'Экспорт CSV')
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Завершена'),
+        ('failed', 'Ошибка')
+    ]
+
+    kind = models.CharField('Тип', max_length=20, choices=KIND_CHOICES)
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default='pending')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='jobs',
+        verbose_name='Пользователь'
+    )
+    params = models.JSONField('Параметры', default=dict, blank=True)
+    input_file = models.FileField('Исходный файл', upload_to='jobs/input/', blank=True)
+    result_file = models.FileField('Файл результата', upload_to='jobs/results/', blank=True)
+    result = models.JSONField('Результат', null=True, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+    rows_processed = models.PositiveIntegerField('Обработано строк', default=0)
+    total_rows = models.PositiveIntegerField('Всего строк', null=True, blank=True)
+    created_at = models.DateTimeField('Создана', auto_now_add=True)
+    started_at = models.DateTimeField('Начата', null=True, blank=True)
+    # Обработчик продлевает аренду задачи при каждом отчете о прогрессе;
+    # задача с просроченной арендой считается брошенной (обработчик остановлен)
+    heartbeat_at = models.DateTimeField('Последний отклик обработчика', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_queue_idx'),
+        ]
+
+class StreamTicket(models.Model):
+    """
+    Одноразовый билет на подключение к потоку событий.
+
+    EventSource не умеет передавать заголовки, а токен API в адресе запроса
+    попадает в журналы прокси и историю браузера. Поэтому в адресе передается
+    билет: он действует несколько секунд и удаляется при подключении.
+    """
+    key = models.CharField('Ключ', max_length=64, primary_key=True)
+    # Билеты не удаляются вместе с токеном (лишний запрос при каждом выходе):
+    # билет удаленного токена не пройдет проверку токена и истечет сам
+    token = models.ForeignKey(
+        'accounts.ExpiringToken',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='stream_tickets',
+        verbose_name='Токен'
+    )
+    expires_at = models.DateTimeField('Действует до')
+
+    def __str__(self):
+        return f"Билет потока событий до {self.expires_at}"
+
+    class Meta:
+        verbose_name = 'Билет потока событий'
+        verbose_name_plural = 'Билеты потока событий'
 
 @receiver(post_save, sender=Changes)
 def send_change_notification(sender, instance, created, **kwargs):
@@ -81,14 +421,8 @@ def send_change_notification(sender, instance, created, **kwargs):
         f"Описание: {instance.change_description}\n"
         f"Дата изменения: {instance.change_date}\n"
     )
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [settings.NOTIFICATION_EMAIL],
-        fail_silently=False,
-    )
+
+    Notification.objects.create(subject=subject, message=message)
 
 @receiver(post_delete, sender=Changes)
 def send_delete_notification(sender, instance, **kwargs):
@@ -101,11 +435,5 @@ def send_delete_notification(sender, instance, **kwargs):
         f"Пользователь: {instance.user.username if instance.user else 'Не указан'}\n"
         f"Дата первоначального изменения: {instance.change_date}\n"
     )
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [settings.NOTIFICATION_EMAIL],
-        fail_silently=False,
-    )
\ No newline at end of file
+
+    Notification.objects.create(subject=subject, message=message)
\ No newline at end of file
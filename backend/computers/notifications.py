@@ -0,0 +1,105 @@
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification
+
+
+DIGEST_SEPARATOR = '\n' + '-' * 40 + '\n\n'
+
+
+def build_digest(notifications):
+    """Собирает одно письмо из нескольких уведомлений."""
+    if len(notifications) == 1:
+        return notifications[0].subject, notifications[0].message
+    subject = f"Учет компьютеров ТНИМЦ. Изменений записей: {len(notifications)}"
+    message = DIGEST_SEPARATOR.join(notification.message for notification in notifications)
+    return subject, message
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повторной отправкой."""
+    return timedelta(seconds=min(
+        settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_DELAY
+    ))
+
+
+def due_batches(now):
+    """
+    Уведомления к отправке порциями по NOTIFICATION_DIGEST_SIZE, по запросу
+    на порцию: после сбоя почты очередь может быть большой. Каждую порцию
+    нужно отправить или отложить до выборки следующей.
+    """
+    due = (
+        Notification.objects
+        .filter(status='pending', next_attempt_at__lte=now)
+        .order_by('created_at', 'id')
+    )
+    while batch := list(due[:settings.NOTIFICATION_DIGEST_SIZE]):
+        yield batch
+
+
+def deliver_pending(now=None):
+    """
+    Отправляет накопившиеся уведомления дайджестами через одно SMTP-соединение.
+
+    В один дайджест попадает не больше NOTIFICATION_DIGEST_SIZE уведомлений.
+    При ошибке отправки уведомления дайджеста откладываются с растущей задержкой,
+    после NOTIFICATION_MAX_ATTEMPTS попыток помечаются как failed.
+    Возвращает количество отправленных уведомлений.
+    """
+    now = now or timezone.now()
+    batches = due_batches(now)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    batches = chain([first], batches)
+    sent_count = 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for batch in batches:
+            postpone(batch, e, now)
+        return 0
+
+    try:
+        for batch in batches:
+            subject, message = build_digest(batch)
+            email = EmailMessage(
+                subject,
+                message,
+                settings.DEFAULT_FROM_EMAIL,
+                [settings.NOTIFICATION_EMAIL],
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as e:
+                postpone(batch, e, now)
+                continue
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(
+                status='sent', sent_at=now, attempts=F('attempts') + 1
+            )
+            sent_count += len(batch)
+    finally:
+        connection.close()
+
+    return sent_count
+
+
+def postpone(batch, error, now):
+    for notification in batch:
+        notification.attempts += 1
+        notification.last_error = str(error)
+        if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = 'failed'
+        else:
+            notification.next_attempt_at = now + retry_delay(notification.attempts)
+    Notification.objects.bulk_update(batch, ['attempts', 'last_error', 'status', 'next_attempt_at'])
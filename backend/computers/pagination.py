@@ -0,0 +1,30 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация, включаемая параметром запроса.
+
+    Без ?page_size= и ?cursor= список отдается целиком, как раньше,
+    чтобы не ломать клиентов, которые ждут массив. Позиция курсора
+    не сдвигается при вставке новых записей между запросами страниц.
+    Порядок задается атрибутом ordering представления (через OrderingFilter);
+    к нему всегда добавляется id, чтобы порядок записей с одинаковым
+    значением поля (этаж, кабинет) был однозначным и страницы не пересекались.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        if (self.page_size_query_param not in request.query_params
+                and self.cursor_query_param not in request.query_params):
+            return None
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            # Направление id совпадает с направлением первого поля
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
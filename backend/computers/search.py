@@ -0,0 +1,256 @@
+"""
+Поиск компьютеров по имени, пользователю, кабинету, адресу и IP.
+
+В SQLite используется полнотекстовый индекс FTS5 с токенизатором trigram:
+он находит подстроки (в том числе начало слова) без учета регистра.
+Если точных совпадений нет, ищутся похожие значения по общим триграммам
+(опечатки вида "Ивонов" вместо "Иванов").
+
+Индекс — отдельная виртуальная таблица, которая создается после migrate
+и обновляется сигналами Computer; массовые операции без сигналов
+обновляют его явно. В других СУБД поиск выполняется через icontains.
+"""
+import sqlite3
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Computer
+
+
+SEARCH_FIELDS = ('computer_name', 'pc_owner', 'office', 'location_address', 'ip_address')
+
+SEARCH_TABLE = 'computers_computer_search'
+
+# Множители score для совпадения в каждом из SEARCH_FIELDS
+SEARCH_WEIGHTS = (1.0, 1.0, 0.95, 0.9, 1.0)
+
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Сколько совпадений из индекса ранжируется в Python. bm25 не используется:
+# для частых подстрок (адрес, "Пользователь") он считается по всем записям
+# и занимает сотни миллисекунд, тогда как выборка с LIMIT — единицы
+SEARCH_CANDIDATES = 2000
+
+# Минимальный score неточных совпадений (похожесть по триграммам, как в pg_trgm)
+FUZZY_MIN_SCORE = 0.3
+
+# Токенизатор trigram появился в SQLite 3.34
+TRIGRAM_MIN_VERSION = (3, 34, 0)
+
+
+def search_index_supported(using=None):
+    db = connection if using is None else using
+    return db.vendor == 'sqlite' and sqlite3.sqlite_version_info >= TRIGRAM_MIN_VERSION
+
+
+def create_search_index(sender=None, using='default', **kwargs):
+    """Создает и заполняет индекс, если его нет (обработчик post_migrate)."""
+    from django.db import connections
+
+    db = connections[using]
+    if not search_index_supported(db):
+        return
+    tables = db.introspection.table_names()
+    if SEARCH_TABLE in tables or Computer._meta.db_table not in tables:
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            f"{', '.join(SEARCH_FIELDS)}, tokenize='trigram')"
+        )
+    rebuild_search_index(db)
+
+
+def rebuild_search_index(using=None):
+    """Перестраивает индекс по таблице компьютеров. Возвращает число записей."""
+    db = connection if using is None else using
+    if not search_index_supported(db):
+        return 0
+    fields = ', '.join(SEARCH_FIELDS)
+    with db.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {fields}) "
+            f"SELECT id, {fields} FROM {Computer._meta.db_table}"
+        )
+        return cursor.rowcount
+
+
+def index_computers(computers):
+    """Добавляет или обновляет записи индекса одним запросом на пачку."""
+    if not computers or not search_index_supported():
+        return
+    placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"VALUES ({placeholders})",
+            [
+                (computer.pk, *(getattr(computer, field) or '' for field in SEARCH_FIELDS))
+                for computer in computers
+            ]
+        )
+
+
+def unindex_computers(ids):
+    if not ids or not search_index_supported():
+        return
+    ids = list(ids)
+    with connection.cursor() as cursor:
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk
+            )
+
+
+def split_terms(query):
+    return [term for term in query.casefold().split() if term]
+
+
+def quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+@lru_cache(maxsize=10000)
+def trigrams(value):
+    """Триграммы слова с дополнением пробелами, как в pg_trgm."""
+    padded = f"  {value} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(term, words):
+    """Наибольшая похожесть term на одно из слов (доля общих триграмм)."""
+    term_trigrams = trigrams(term)
+    best = 0.0
+    for word in words:
+        word_trigrams = trigrams(word)
+        best = max(best, len(term_trigrams & word_trigrams) / len(term_trigrams | word_trigrams))
+    return best
+
+
+def term_score(term, values):
+    """
+    Лучшее совпадение слова запроса с одним из полей (value, weight):
+    1 — слово или поле целиком, 0.9 — начало слова, 0.8 — подстрока,
+    меньше — похожее слово (опечатка).
+    """
+    best = 0.0
+    for value, weight in values:
+        if term not in value:
+            continue
+        words = value.split()
+        if term == value or term in words:
+            level = 1.0
+        elif any(word.startswith(term) for word in words):
+            level = 0.9
+        else:
+            level = 0.8
+        best = max(best, level * weight)
+    if best:
+        return best
+    return 0.8 * max(similarity(term, value.split()) * weight for value, weight in values)
+
+
+def score(terms, row):
+    """Среднее по словам запроса."""
+    values = [(value.casefold(), weight) for value, weight in zip(row, SEARCH_WEIGHTS) if value]
+    if not values:
+        return 0.0
+    return sum(term_score(term, values) for term in terms) / len(terms)
+
+
+def fuzzy_match(term):
+    """
+    Условие MATCH для слова с возможной опечаткой.
+
+    При одной опечатке одна из половин слова остается без изменений,
+    поэтому длинное слово ищется по любой из половин; короткое — по любой триграмме.
+    """
+    if len(term) >= 6:
+        parts = [term[:len(term) // 2], term[len(term) // 2:]]
+    else:
+        parts = sorted({term[i:i + 3] for i in range(len(term) - 2)})
+    return '(' + ' OR '.join(quote(part) for part in parts) + ')'
+
+
+def fetch_candidates(cursor, match, condition='', params=()):
+    cursor.execute(
+        f"SELECT rowid, {', '.join(SEARCH_FIELDS)} FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s{condition} LIMIT %s",
+        [match, *params, SEARCH_CANDIDATES]
+    )
+    return cursor.fetchall()
+
+
+def exact_candidates(cursor, phrase):
+    """
+    Записи, где одно из полей совпадает с запросом целиком или начинается с него.
+
+    Общая выборка кандидатов с LIMIT не упорядочена, и лучшие совпадения
+    (точное имя или IP) могут в нее не попасть, поэтому они выбираются первыми.
+    """
+    if len(phrase) < 3:
+        return []
+    # ^ — фраза в начале поля; при равной длине поле совпадает с запросом целиком
+    starts = '^' + quote(phrase)
+    lengths = ' OR '.join(f'length({field}) = %s' for field in SEARCH_FIELDS)
+    return (
+        fetch_candidates(cursor, starts, f' AND ({lengths})', [len(phrase)] * len(SEARCH_FIELDS))
+        + fetch_candidates(cursor, starts)
+    )
+
+
+def search_index(query, limit):
+    """Список (id, score) из индекса FTS5 по убыванию score."""
+    terms = split_terms(query)
+    # Триграммный индекс находит только подстроки от трех символов
+    long_terms = [term for term in terms if len(term) >= 3]
+    if not long_terms:
+        return None
+
+    scored = {}
+    with connection.cursor() as cursor:
+        candidates = exact_candidates(cursor, ' '.join(terms))
+        candidates += fetch_candidates(cursor, ' AND '.join(quote(term) for term in long_terms))
+        for row in candidates:
+            if row[0] in scored:
+                continue
+            text = ' '.join(value.casefold() for value in row[1:] if value)
+            # Короткие слова запроса (например, этаж "2") проверяются подстрокой
+            if all(term in text for term in terms):
+                scored[row[0]] = score(terms, row[1:])
+
+        # Похожие значения ищутся, только если точных совпадений нет
+        if not scored:
+            fuzzy = ' AND '.join(fuzzy_match(term) for term in long_terms)
+            for row in fetch_candidates(cursor, fuzzy):
+                row_score = score(terms, row[1:])
+                if row_score >= FUZZY_MIN_SCORE:
+                    scored[row[0]] = row_score
+
+    ranked = sorted(scored.items(), key=lambda item: (-item[1], item[0]))
+    return [(pk, round(row_score, 3)) for pk, row_score in ranked[:limit]]
+
+
+def search_computers(query, limit=SEARCH_LIMIT):
+    """Возвращает список (Computer, score), лучшие совпадения первыми."""
+    ranked = search_index(query, limit) if search_index_supported() else None
+    if ranked is None:
+        condition = Q()
+        for term in split_terms(query):
+            term_condition = Q()
+            for field in SEARCH_FIELDS:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        if not condition:
+            return []
+        queryset = Computer.objects.filter(condition).order_by('computer_name', 'id')[:limit]
+        return [(computer, 1.0) for computer in queryset]
+
+    computers = Computer.objects.in_bulk([pk for pk, _ in ranked])
+    return [(computers[pk], row_score) for pk, row_score in ranked if pk in computers]
@@ -1,8 +1,12 @@
 from rest_framework import serializers
-from .models import Computer, Changes
+from .models import Computer, Changes, ImportRun, Job
 from accounts.models import User
 
 
+# Связанные объекты, которые можно развернуть в журнале через ?expand=
+CHANGES_EXPANDABLE = ('computer', 'user')
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -12,21 +16,166 @@ class UserSerializer(serializers.ModelSerializer):
 class ComputerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Computer
-        fields = '__all__'
+        # Служебное числовое представление IP-адреса клиентам не отдается
+        exclude = ('ip_number',)
+
+
+# Ограничение числа компьютеров в одном массовом запросе
+BULK_MAX_IDS = 5000
+
+# Имя и IP определяют компьютер и вместе уникальны: массово их не меняют
+BULK_READ_ONLY_FIELDS = ('id', 'computer_name', 'ip_address', 'created_at', 'updated_at')
+
+
+class ComputerBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BULK_MAX_IDS
+    )
+
+
+class ComputerBulkUpdateSerializer(ComputerBulkDeleteSerializer):
+    values = serializers.DictField()
+
+    def validate_values(self, values):
+        fields = ComputerSerializer().fields
+        unknown = set(values) - set(fields)
+        if unknown:
+            raise serializers.ValidationError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+        read_only = set(values) & set(BULK_READ_ONLY_FIELDS)
+        if read_only:
+            raise serializers.ValidationError(
+                f"Поля нельзя менять массово: {', '.join(sorted(read_only))}"
+            )
+        if not values:
+            raise serializers.ValidationError('Не указаны поля для изменения')
+        # Значения проверяются и приводятся к типам полей так же, как при PATCH
+        validated, errors = {}, {}
+        for name, value in values.items():
+            try:
+                validated[name] = fields[name].run_validation(value)
+            except serializers.ValidationError as e:
+                errors[name] = e.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return validated
 
 
 class ChangesSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
-    computer = ComputerSerializer(read_only=True)
-    
+    """
+    Запись журнала в компактном виде: компьютер и пользователь передаются
+    идентификаторами, имя пользователя — отдельным полем. Вложенные объекты
+    подставляются только для перечисленных в expand.
+    """
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+
     class Meta:
         model = Changes
-        fields = '__all__'
-        read_only_fields = ('user', 'computer', 'change_date')
-
-# class ComputerWithChangesSerializer(serializers.ModelSerializer):
-#     changes = ChangesSerializer(many=True, read_only=True)
-    
-#     class Meta:
-#         model = Computer
-#         fields = '__all__'
\ No newline at end of file
+        fields = (
+            'id', 'computer', 'computer_name', 'computer_ip',
+            'user', 'username', 'action', 'change_description', 'change_date'
+        )
+        read_only_fields = ('user', 'computer', 'action', 'change_date')
+
+    def __init__(self, *args, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'computer' in expand:
+            self.fields['computer'] = ComputerSerializer(read_only=True)
+        if 'user' in expand:
+            self.fields['user'] = UserSerializer(read_only=True)
+
+
+class ImportRunSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+
+    class Meta:
+        model = ImportRun
+        fields = (
+            'id', 'user', 'username', 'created_at',
+            'total_rows', 'imported_count', 'error_count'
+        )
+
+
+class ImportRunDetailsSerializer(ImportRunSerializer):
+    """Запуск импорта вместе с распакованным списком компьютеров и ошибками."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(instance.get_details())
+        return data
+
+
+class JobSerializer(serializers.ModelSerializer):
+    has_result_file = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'kind', 'status', 'rows_processed', 'total_rows', 'result',
+            'has_result_file', 'error', 'created_at', 'started_at', 'finished_at'
+        )
+        read_only_fields = fields
+
+    def get_has_result_file(self, obj):
+        return bool(obj.result_file)
+
+
+class ChangesValuesSerializer:
+    """
+    Быстрая сериализация списка журнала для чтения: строки берутся через
+    .values() одним запросом, без создания моделей и без полей ModelSerializer.
+    Результат совпадает с ChangesSerializer с тем же expand.
+    """
+    date_field = serializers.DateTimeField()
+
+    def __init__(self, expand=()):
+        self.expand = expand
+        concrete_fields = [
+            field for field in Computer._meta.concrete_fields
+            if field.name not in ComputerSerializer.Meta.exclude
+        ]
+        self.computer_fields = [field.attname for field in concrete_fields]
+        self.computer_date_fields = [
+            field.attname for field in concrete_fields if field.get_internal_type() == 'DateTimeField'
+        ]
+
+    def values(self, queryset):
+        fields = [
+            'id', 'computer_id', 'computer_name', 'computer_ip',
+            'user_id', 'user__username', 'action', 'change_description', 'change_date'
+        ]
+        if 'computer' in self.expand:
+            fields += [f'computer__{name}' for name in self.computer_fields]
+        if 'user' in self.expand:
+            fields += ['user__first_name', 'user__last_name']
+        return queryset.values(*fields)
+
+    def to_representation(self, row):
+        computer = row['computer_id']
+        if 'computer' in self.expand and computer is not None:
+            computer = {name: row[f'computer__{name}'] for name in self.computer_fields}
+            for name in self.computer_date_fields:
+                computer[name] = self.date_field.to_representation(computer[name])
+
+        user = row['user_id']
+        if 'user' in self.expand and user is not None:
+            user = {
+                'id': user,
+                'username': row['user__username'],
+                'first_name': row['user__first_name'],
+                'last_name': row['user__last_name'],
+            }
+
+        return {
+            'id': row['id'],
+            'computer': computer,
+            'computer_name': row['computer_name'],
+            'computer_ip': row['computer_ip'],
+            'user': user,
+            'username': row['user__username'],
+            'action': row['action'],
+            'change_description': row['change_description'],
+            'change_date': self.date_field.to_representation(row['change_date']),
+        }
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
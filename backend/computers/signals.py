@@ -1,10 +1,109 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
-from .models import Changes
-
-@receiver([post_save, post_delete], sender=Changes)
-def invalidate_changes_cache(sender, instance, **kwargs):
-    """Инвалидируем кэш версии при любом изменении в таблице Changes"""
-    cache.delete('changes_etag')
-    cache.delete('changes_version')
\ No newline at end of file
+from django.utils import timezone
+from .models import Computer, Changes, ChangesTombstone, DataVersion
+from .events import broker, change_event_data
+from .serializers import ComputerSerializer
+from .search import index_computers, unindex_computers
+from .stats import apply_stats_deltas, change_deltas, stats_deltas
+
+@receiver(post_save, sender=Changes)
+def bump_changes_version_on_save(sender, instance, created, **kwargs):
+    """Обновляем версию журнала в той же транзакции, что и запись Changes"""
+    DataVersion.bump(DataVersion.CHANGES, 1 if created else 0, instance.change_date if created else timezone.now())
+
+@receiver(post_delete, sender=Changes)
+def bump_changes_version_on_delete(sender, instance, **kwargs):
+    ChangesTombstone.objects.create(change_id=instance.id)
+    DataVersion.bump(DataVersion.CHANGES, -1, timezone.now())
+
+@receiver(post_save, sender=Computer)
+def bump_computers_version_on_save(sender, instance, created, **kwargs):
+    DataVersion.bump(DataVersion.COMPUTERS, 1 if created else 0, instance.updated_at)
+
+@receiver(post_delete, sender=Computer)
+def bump_computers_version_on_delete(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.COMPUTERS, -1, timezone.now())
+
+@receiver(post_save, sender=get_user_model())
+def bump_users_version_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Имя и ФИО пользователя вложены в записи журнала: от версии пользователей зависит их ETag"""
+    # Вход обновляет только last_login, которого в журнале нет
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    DataVersion.bump(DataVersion.USERS, 1 if created else 0, timezone.now())
+
+@receiver(post_delete, sender=get_user_model())
+def bump_users_version_on_delete(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.USERS, -1, timezone.now())
+
+@receiver(post_save, sender=Changes)
+def publish_change_saved(sender, instance, created, **kwargs):
+    """Публикуем событие для потока SSE только после фиксации транзакции"""
+    # Без подписчиков в этом процессе (run_jobs, воркер без потоков) событие не собирается
+    if not broker.subscriber_count:
+        return
+    event_type = 'change_created' if created else 'change_updated'
+    data = change_event_data(instance)
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+@receiver(post_delete, sender=Changes)
+def publish_change_deleted(sender, instance, **kwargs):
+    if not broker.subscriber_count:
+        return
+    data = {'id': instance.id}
+    transaction.on_commit(lambda: broker.publish('change_deleted', data))
+
+@receiver(post_save, sender=Computer)
+def update_search_index_on_save(sender, instance, **kwargs):
+    """Индекс поиска обновляется в той же транзакции, что и компьютер"""
+    index_computers([instance])
+
+@receiver(post_delete, sender=Computer)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    unindex_computers([instance.pk])
+
+@receiver(pre_save, sender=Computer)
+@receiver(pre_delete, sender=Computer)
+def remember_stats_values(sender, instance, **kwargs):
+    """
+    Прежние значения для статистики читаются из базы с блокировкой строки
+    в транзакции сохранения (удаления): загруженный раньше экземпляр может быть устаревшим
+    """
+    if instance.pk is None or instance._state.adding:
+        instance.stats_snapshot = None
+        return
+    instance.stats_snapshot = Computer.objects.select_for_update().filter(pk=instance.pk).order_by().values_list(
+        *Computer.STATS_FIELDS
+    ).first()
+
+@receiver(post_save, sender=Computer)
+def update_inventory_stats_on_save(sender, instance, created, **kwargs):
+    values = instance.stats_values()
+    old = None if created else instance.stats_snapshot
+    if old is None:
+        apply_stats_deltas(stats_deltas([values], 1))
+    else:
+        apply_stats_deltas(change_deltas(old, values))
+
+@receiver(post_delete, sender=Computer)
+def update_inventory_stats_on_delete(sender, instance, **kwargs):
+    if instance.stats_snapshot is not None:
+        apply_stats_deltas(stats_deltas([instance.stats_snapshot], -1))
+
+@receiver(post_save, sender=Computer)
+def publish_computer_saved(sender, instance, created, **kwargs):
+    if not broker.subscriber_count:
+        return
+    event_type = 'computer_created' if created else 'computer_updated'
+    data = ComputerSerializer(instance).data
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+@receiver(post_delete, sender=Computer)
+def publish_computer_deleted(sender, instance, **kwargs):
+    if not broker.subscriber_count:
+        return
+    data = {'id': instance.id}
+    transaction.on_commit(lambda: broker.publish('computer_deleted', data))
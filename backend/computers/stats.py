@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db import connection, connections, transaction
+from django.db.models import Count
+
+from .models import Computer, InventoryStat
+
+
+# Строк статистики в одном запросе: три параметра на строку, в пределах лимита SQLite
+STATS_BATCH_SIZE = 300
+
+
+def stats_deltas(values, delta):
+    """Изменения счетчиков для набора значений Computer.stats_values()."""
+    deltas = Counter()
+    for row in values:
+        for field, value in zip(Computer.STATS_FIELDS, row):
+            deltas[(field, str(value))] += delta
+    return deltas
+
+
+def change_deltas(old, new):
+    """Изменения счетчиков при изменении одного компьютера со значений old на new."""
+    deltas = Counter()
+    for field, old_value, new_value in zip(Computer.STATS_FIELDS, old, new):
+        if old_value != new_value:
+            deltas[(field, str(old_value))] -= 1
+            deltas[(field, str(new_value))] += 1
+    return deltas
+
+
+def apply_stats_deltas(deltas):
+    """
+    Применяет изменения счетчиков запросом INSERT ... ON CONFLICT DO UPDATE
+    (поддерживается SQLite 3.24+ и PostgreSQL).
+    """
+    rows = [(field, value, delta) for (field, value), delta in deltas.items() if delta]
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(InventoryStat._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), STATS_BATCH_SIZE):
+            batch = rows[start:start + STATS_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({qn('field_name')}, {qn('value')}, {qn('computer_count')}) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({qn('field_name')}, {qn('value')}) DO UPDATE "
+                f"SET {qn('computer_count')} = {table}.{qn('computer_count')} + excluded.{qn('computer_count')}",
+                [param for row in batch for param in row]
+            )
+
+
+def rebuild_inventory_stats():
+    """
+    Пересчитывает статистику по таблице компьютеров. Исправляет расхождения
+    после изменений без сигналов (queryset.update(), правки в базе),
+    поэтому запускается периодически. Возвращает число исправленных счетчиков.
+    """
+    with transaction.atomic():
+        actual = {
+            (field, str(row[field])): row['computer_count']
+            for field in Computer.STATS_FIELDS
+            for row in Computer.objects.order_by().values(field).annotate(computer_count=Count('id'))
+        }
+        stored = {
+            (field, value): count
+            for field, value, count in InventoryStat.objects.select_for_update().filter(computer_count__gt=0)
+            .values_list('field_name', 'value', 'computer_count')
+        }
+        corrected = sum(actual.get(key, 0) != stored.get(key, 0) for key in actual.keys() | stored.keys())
+        InventoryStat.objects.all().delete()
+        InventoryStat.objects.bulk_create(
+            InventoryStat(field_name=field, value=value, computer_count=count)
+            for (field, value), count in actual.items()
+        )
+    return corrected
+
+
+def create_inventory_stats(sender=None, using='default', **kwargs):
+    """Заполняет статистику, если она еще пуста (обработчик post_migrate)."""
+    tables = connections[using].introspection.table_names()
+    if InventoryStat._meta.db_table not in tables or Computer._meta.db_table not in tables:
+        return
+    if not InventoryStat.objects.exists() and Computer.objects.exists():
+        rebuild_inventory_stats()
+
+
+def inventory_stats():
+    """
+    Статистика для панели: количество компьютеров по значениям каждого поля
+    (по убыванию количества) и доля компьютеров с Касперским.
+    """
+    by_field = {field: [] for field in Computer.STATS_FIELDS}
+    stats = InventoryStat.objects.filter(computer_count__gt=0).order_by('-computer_count', 'value')
+    for field, value, count in stats.values_list('field_name', 'value', 'computer_count'):
+        by_field[field].append({
+            'value': Computer._meta.get_field(field).to_python(value),
+            'count': count,
+        })
+
+    # У каждого компьютера ровно одно значение has_kaspersky
+    kaspersky = {item['value']: item['count'] for item in by_field['has_kaspersky']}
+    total = sum(kaspersky.values())
+    return {
+        'total': total,
+        'kaspersky_coverage': round(kaspersky.get(True, 0) / total, 4) if total else None,
+        'by_field': by_field,
+    }
@@ -0,0 +1,94 @@
+import ipaddress
+
+from django.db import connections, transaction
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import Lead
+
+from .models import Computer
+
+
+FILL_BATCH_SIZE = 1000
+
+
+def fill_ip_numbers(sender=None, using='default', **kwargs):
+    """
+    Заполняет ip_number у компьютеров, сохраненных до его появления
+    (обработчик post_migrate). Возвращает число обновленных компьютеров.
+    """
+    db = connections[using]
+    table = Computer._meta.db_table
+    if table not in db.introspection.table_names():
+        return 0
+    with db.cursor() as cursor:
+        columns = {column.name for column in db.introspection.get_table_description(cursor, table)}
+    if 'ip_number' not in columns:
+        return 0
+
+    filled = 0
+    pending = Computer.objects.using(using).filter(ip_number__isnull=True).only('id', 'ip_address').order_by('pk')
+    with transaction.atomic(using=using):
+        last_pk = 0
+        # Пачки по первичному ключу: записи с некорректным адресом остаются без номера
+        while batch := list(pending.filter(pk__gt=last_pk)[:FILL_BATCH_SIZE]):
+            for computer in batch:
+                computer.fill_ip_number()
+            filled += Computer.objects.using(using).bulk_update(batch, ['ip_number'])
+            last_pk = batch[-1].pk
+    return filled
+
+
+def host_bounds(network):
+    """Первый и последний адрес хоста подсети числами (без адреса сети и широковещательного)."""
+    first, last = int(network.network_address), int(network.broadcast_address)
+    # В /31 и /32 адресов сети и широковещательного нет (RFC 3021)
+    if network.prefixlen <= 30:
+        first, last = first + 1, last - 1
+    return first, last
+
+
+def address_range(start, end):
+    return {
+        'start': str(ipaddress.IPv4Address(start)),
+        'end': str(ipaddress.IPv4Address(end)),
+        'count': end - start + 1,
+    }
+
+
+def free_addresses(network, queryset=None):
+    """
+    Занятые и свободные адреса подсети.
+
+    Промежутки между занятыми адресами находятся в базе оконной функцией
+    LEAD по индексу ip_number: в Python попадают только границы промежутков,
+    а не все компьютеры подсети.
+    """
+    first, last = host_bounds(network)
+    used = (Computer.objects.all() if queryset is None else queryset).filter(ip_number__range=(first, last))
+
+    summary = used.aggregate(
+        used=Count('ip_number', distinct=True), low=Min('ip_number'), high=Max('ip_number')
+    )
+    ranges = []
+    if summary['low'] is None:
+        ranges.append(address_range(first, last))
+    else:
+        if summary['low'] > first:
+            ranges.append(address_range(first, summary['low'] - 1))
+        gaps = (
+            used.annotate(next_number=Window(Lead('ip_number'), order_by=F('ip_number').asc()))
+            .filter(next_number__gt=F('ip_number') + 1)
+            .order_by('ip_number')
+            .values_list('ip_number', 'next_number')
+        )
+        ranges.extend(address_range(number + 1, next_number - 1) for number, next_number in gaps)
+        if summary['high'] < last:
+            ranges.append(address_range(summary['high'] + 1, last))
+
+    total = last - first + 1
+    return {
+        'network': str(network),
+        'total': total,
+        'used': summary['used'],
+        'free': total - summary['used'],
+        'free_ranges': ranges,
+    }
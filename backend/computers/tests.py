@@ -1,3 +1,1547 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Max
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+
+from .models import (
+    Computer, Changes, ChangesTombstone, DataVersion, ImportRun, InventoryStat, Job, Notification, StreamTicket
+)
+from accounts.models import ExpiringToken, Profile, TOKEN_CACHE
+from info_pcs.metrics import registry
+from .events import EventBroker
+from .views import get_stream_token
+from .benchmarks import make_csv, seed_computers, seed_journal
+from .exporters import EXPORT_FIELDS
+from .importers import import_computers
+from .jobs import report_progress, run_pending_jobs
+from .notifications import deliver_pending
+from .search import search_computers, search_index_supported
+from .serializers import ChangesSerializer, ChangesValuesSerializer
+from .filters import ComputerFilter
+from .subnets import fill_ip_numbers
+from .stats import inventory_stats, rebuild_inventory_stats
+
+
+def query_plan(func):
+    """Выполняет func и возвращает EXPLAIN QUERY PLAN последнего SQL-запроса."""
+    with CaptureQueriesContext(connection) as context:
+        func()
+    sql = context.captured_queries[-1]['sql']
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть только в SQLite')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.computer = Computer.objects.create(
+            computer_name='PC-001',
+            ip_address='10.0.0.1',
+            location_address='ул. Киевская, 111а',
+            floor=1,
+            office='101',
+            domain='tnimc.local',
+            operating_system='Windows 10'
+        )
+        Changes.objects.create(computer=cls.computer, change_description='create')
+
+    def assertUsesIndex(self, plan):
+        self.assertIn('INDEX', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        for line in plan.splitlines():
+            if line.startswith('SCAN') and 'INDEX' not in line:
+                self.fail(f'Полный просмотр таблицы: {line}')
+
+    def test_duplicate_lookup_uses_name_ip_index(self):
+        plan = query_plan(lambda: Computer.objects.filter(
+            computer_name='PC-001', ip_address='10.0.0.1'
+        ).exists())
+        self.assertIn('SEARCH', plan)
+        self.assertUsesIndex(plan)
+
+    def test_computer_list_ordering_uses_index(self):
+        plan = query_plan(lambda: list(Computer.objects.order_by('computer_name')[:100]))
+        self.assertUsesIndex(plan)
+
+    def test_last_change_date_uses_index(self):
+        plan = query_plan(lambda: Changes.objects.aggregate(last_modified=Max('change_date')))
+        self.assertUsesIndex(plan)
+
+    def test_changes_list_ordering_uses_index(self):
+        plan = query_plan(lambda: list(Changes.objects.order_by('-change_date', '-id')[:100]))
+        self.assertUsesIndex(plan)
+
+    def test_action_filter_uses_index(self):
+        plan = query_plan(lambda: list(Changes.objects.filter(action='update').order_by('-change_date', '-id')[:100]))
+        self.assertIn('changes_action_date_idx', plan)
+        self.assertUsesIndex(plan)
+
+    def test_subnet_filter_uses_ip_number_index(self):
+        plan = query_plan(lambda: list(
+            ComputerFilter().filter_params(Computer.objects.order_by('ip_number'), {'cidr': '10.0.0.0/22'})
+        ))
+        self.assertIn('computer_ip_number_idx', plan)
+        self.assertUsesIndex(plan)
+
+    def test_computer_history_uses_index(self):
+        plan = query_plan(lambda: list(self.computer.changes.all()))
+        self.assertIn('SEARCH', plan)
+        self.assertUsesIndex(plan)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    NOTIFICATION_EMAIL='admin@example.com',
+    NOTIFICATION_DIGEST_SIZE=2,
+    NOTIFICATION_MAX_ATTEMPTS=2,
+)
+class NotificationTests(TestCase):
+    def test_changes_are_queued_not_sent(self):
+        change = Changes.objects.create(computer_name='PC-001', change_description='create')
+        change.delete()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.filter(status='pending').count(), 2)
+
+    def test_pending_notifications_are_sent_as_digests(self):
+        for n in range(3):
+            Changes.objects.create(computer_name=f'PC-00{n}', change_description='create')
+
+        with mock.patch('computers.notifications.get_connection', wraps=mail.get_connection) as get_connection:
+            self.assertEqual(deliver_pending(), 3)
+        get_connection.assert_called_once()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('PC-000', mail.outbox[0].body)
+        self.assertIn('PC-001', mail.outbox[0].body)
+        self.assertIn('PC-002', mail.outbox[1].body)
+        self.assertEqual(Notification.objects.filter(status='sent').count(), 3)
+        self.assertEqual(deliver_pending(), 0)
+
+    def test_pending_notifications_are_loaded_in_digest_sized_batches(self):
+        for n in range(5):
+            Changes.objects.create(computer_name=f'PC-00{n}', change_description='create')
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(deliver_pending(), 5)
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'computers_notification' in query['sql']
+        ]
+        # Три порции по два уведомления и пустая выборка в конце
+        self.assertEqual(len(selects), 4)
+        self.assertTrue(all(sql.endswith('LIMIT 2') for sql in selects))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        Changes.objects.create(computer_name='PC-001', change_description='create')
+        now = timezone.now()
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP недоступен')):
+            self.assertEqual(deliver_pending(now), 0)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, now)
+        self.assertEqual(deliver_pending(now), 0)
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP недоступен')):
+            deliver_pending(notification.next_attempt_at)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'failed')
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class DataVersionTests(TestCase):
+    def test_version_follows_inserts_and_deletes(self):
+        initial = DataVersion.current(DataVersion.CHANGES)
+        first = Changes.objects.create(computer_name='PC-001', change_description='create')
+        Changes.objects.create(computer_name='PC-002', change_description='create')
+
+        version = DataVersion.current(DataVersion.CHANGES)
+        self.assertEqual(version.total_count, 2)
+        self.assertEqual(version.sequence, initial.sequence + 2)
+        self.assertEqual(version.last_modified, Changes.objects.latest('change_date').change_date)
+
+        first.delete()
+        version = DataVersion.current(DataVersion.CHANGES)
+        self.assertEqual(version.total_count, 1)
+        self.assertEqual(version.sequence, initial.sequence + 3)
+
+    @skipUnless(connection.features.has_select_for_update, 'SQLite выполняет записи по одной')
+    def test_change_id_is_assigned_under_version_lock(self):
+        DataVersion.current(DataVersion.CHANGES)
+        with CaptureQueriesContext(connection) as context:
+            Changes.objects.create(computer_name='PC-001', change_description='create')
+        queries = [query['sql'] for query in context.captured_queries]
+        lock = next(n for n, sql in enumerate(queries) if 'FOR UPDATE' in sql)
+        insert = next(n for n, sql in enumerate(queries) if sql.startswith('INSERT') and 'computers_changes' in sql)
+        # Пока транзакция не зафиксирована, другие записи журнала не получают id
+        self.assertLess(lock, insert)
+
+    def test_rebuild_recounts_table(self):
+        Changes.objects.create(computer_name='PC-001', change_description='create')
+        DataVersion.objects.all().delete()
+        version = DataVersion.current(DataVersion.CHANGES)
+        self.assertEqual(version.total_count, 1)
+        self.assertGreater(version.sequence, 0)
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+        self.computer = Computer.objects.create(
+            computer_name='PC-001',
+            ip_address='10.0.0.1',
+            location_address='ул. Киевская, 111а',
+            floor=1,
+            office='101',
+            domain='tnimc.local',
+            operating_system='Windows 10'
+        )
+
+    def test_matching_etag_returns_304_without_querying_table(self):
+        response = self.client.get('/api/computers/computers/')
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/computers/computers/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('computers_computer' in query['sql'] for query in context.captured_queries))
+
+    def test_if_modified_since_within_same_second(self):
+        modified_at = timezone.now().replace(microsecond=200000) - timedelta(seconds=10)
+        DataVersion.bump(DataVersion.COMPUTERS, 0, modified_at)
+
+        with mock.patch('computers.conditional.timezone.now', return_value=modified_at + timedelta(milliseconds=300)):
+            response = self.client.get('/api/computers/computers/')
+        # Секунда изменения еще идет: Last-Modified не отдается
+        self.assertNotIn('Last-Modified', response)
+
+        # Изменение в ту же секунду, что и If-Modified-Since клиента
+        if_modified_since = http_date(int(modified_at.timestamp()))
+        DataVersion.bump(DataVersion.COMPUTERS, 0, modified_at + timedelta(milliseconds=500))
+        with mock.patch('computers.conditional.timezone.now', return_value=modified_at + timedelta(milliseconds=600)):
+            response = self.client.get('/api/computers/computers/', HTTP_IF_MODIFIED_SINCE=if_modified_since)
+        self.assertEqual(response.status_code, 200)
+
+        # Секунда закончилась: Last-Modified отдается и проверяется
+        response = self.client.get('/api/computers/computers/')
+        self.assertEqual(response['Last-Modified'], if_modified_since)
+        response = self.client.get('/api/computers/computers/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_update(self):
+        etag = self.client.get('/api/computers/computers/')['ETag']
+        self.computer.office = '102'
+        self.computer.save()
+        response = self.client.get('/api/computers/computers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_changes_etag_changes_after_user_rename(self):
+        user = User.objects.create(username='ivanov', first_name='Иван')
+        Changes.objects.create(user=user, computer_name='PC-001', change_description='create')
+        etag = self.client.get('/api/computers/changes/', {'expand': 'user'})['ETag']
+
+        # Вход меняет только last_login, которого в ответе нет
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        response = self.client.get('/api/computers/changes/', {'expand': 'user'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        user.first_name = 'Петр'
+        user.save()
+        response = self.client.get('/api/computers/changes/', {'expand': 'user'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['user']['first_name'], 'Петр')
+
+    def test_etag_depends_on_query_parameters(self):
+        etag = self.client.get('/api/computers/changes/')['ETag']
+        response = self.client.get('/api/computers/changes/?username=admin', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_list_revalidates_on_computer_change(self):
+        Changes.objects.create(computer=self.computer, change_description='create')
+        etag = self.client.get('/api/computers/changes/')['ETag']
+        self.computer.delete()
+        response = self.client.get('/api/computers/changes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ListFilterPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.computers = [
+            Computer.objects.create(
+                computer_name=f'PC-{n:03d}', ip_address=f'10.0.{n // 4}.{n + 1}', location_address='ул. Киевская',
+                floor=n % 2 + 1, office=f'{n % 3}01', domain='corp.local' if n == 6 else 'tnimc.local',
+                operating_system='Linux' if n < 2 else 'Windows 10', has_kaspersky=n % 2 == 0
+            )
+            for n in range(7)
+        ]
+
+    def names(self, params):
+        response = self.client.get('/api/computers/computers/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [computer['computer_name'] for computer in response.data]
+
+    def pages(self, url, params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [item['id'] for item in response.data['results']]
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_computer_filters(self):
+        self.assertEqual(self.names({'floor': 2}), ['PC-001', 'PC-003', 'PC-005'])
+        self.assertEqual(self.names({'has_kaspersky': 'true', 'office': '101'}), ['PC-004'])
+        self.assertEqual(self.names({'operating_system': 'linux'}), ['PC-000', 'PC-001'])
+        self.assertEqual(self.names({'domain': 'corp'}), ['PC-006'])
+        self.assertEqual(self.names({'cidr': '10.0.1.0/24'}), ['PC-004', 'PC-005', 'PC-006'])
+        self.assertEqual(self.names({'floor': 1, 'computer_name': 'pc-00', 'has_kaspersky': 'false'}), [])
+        for params in ({'floor': 'два'}, {'has_kaspersky': 'да'}, {'cidr': '10.0.0.0/33'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/computers/computers/', params).status_code, 400)
+
+    def test_ordering(self):
+        self.assertEqual(self.names({'ordering': '-computer_name'})[:2], ['PC-006', 'PC-005'])
+        self.assertEqual(self.names({'ordering': '-floor,computer_name'})[:3], ['PC-001', 'PC-003', 'PC-005'])
+        # Поле не из ordering_fields игнорируется
+        self.assertEqual(self.names({'ordering': 'comment'})[0], 'PC-000')
+
+    def test_cursor_pages_follow_ties_by_id(self):
+        for ordering in ('floor', '-floor', 'office', 'operating_system'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self.pages('/api/computers/computers/', {'ordering': ordering, 'page_size': 2})
+                field = ordering.lstrip('-')
+                # Внутри одинаковых значений — по id в том же направлении, что и поле
+                expected = sorted(
+                    self.computers, key=lambda computer: (getattr(computer, field), computer.id),
+                    reverse=ordering.startswith('-')
+                )
+                self.assertEqual(ids, [computer.id for computer in expected])
+                self.assertEqual(pages, 4)
+
+    def test_cursor_is_stable_under_inserts(self):
+        response = self.client.get('/api/computers/computers/', {'ordering': 'floor', 'page_size': 3})
+        first_page = [item['id'] for item in response.data['results']]
+        Computer.objects.create(
+            computer_name='PC-NEW', ip_address='10.0.9.1', location_address='ул. Киевская', floor=1,
+            office='101', domain='tnimc.local', operating_system='Windows 10'
+        )
+        ids, _ = self.pages(response.data['next'], {})
+        self.assertFalse(set(first_page) & set(ids))
+        self.assertEqual(len(first_page + ids), 8)
+
+    def test_list_without_page_size_is_plain_array(self):
+        response = self.client.get('/api/computers/computers/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_changes_filters_and_pages(self):
+        other = User.objects.create(username='ivanov')
+        for n, computer in enumerate(self.computers):
+            Changes.objects.create(
+                computer=computer, user=other if n < 3 else self.user,
+                change_description={'action': 'update', 'changes': {'office': {'from': '1', 'to': '2'}}}
+            )
+        Changes.objects.filter(computer__in=self.computers[:2]).update(change_date=timezone.now() - timedelta(days=10))
+        day = (timezone.localtime() - timedelta(days=10)).date().isoformat()
+
+        def change_names(params):
+            response = self.client.get('/api/computers/changes/', params)
+            self.assertEqual(response.status_code, 200, response.data)
+            return sorted(change['computer_name'] for change in response.data)
+
+        self.assertEqual(change_names({'user': other.id}), ['PC-000', 'PC-001', 'PC-002'])
+        self.assertEqual(change_names({'username': 'ivan', 'date_from': day, 'date_to': day}), ['PC-000', 'PC-001'])
+        self.assertEqual(len(change_names({'action': 'update', 'field': 'office'})), 7)
+        self.assertEqual(change_names({'action': 'delete'}), [])
+        self.assertEqual(self.client.get('/api/computers/changes/', {'date_from': '18.10.2026'}).status_code, 400)
+
+        ids, pages = self.pages('/api/computers/changes/', {'page_size': 3})
+        self.assertEqual(ids, list(Changes.objects.order_by('-change_date', '-id').values_list('id', flat=True)))
+        self.assertEqual(pages, 3)
+
+
+class ChangesDeltaTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+        self.changes = [
+            Changes.objects.create(computer_name=f'PC-00{n}', change_description='create')
+            for n in range(3)
+        ]
+
+    def test_delta_returns_new_rows_and_tombstones(self):
+        response = self.client.get(f'/api/computers/changes/?since={self.changes[0].id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['changes']], [c.id for c in self.changes[1:]])
+        self.assertEqual(response.data['deleted'], [])
+        cursor = response.data['cursor']
+
+        deleted_id = self.changes[0].id
+        self.changes[0].delete()
+        new = Changes.objects.create(computer_name='PC-009', change_description='create')
+
+        response = self.client.get(f'/api/computers/changes/?since={cursor}')
+        self.assertEqual([row['id'] for row in response.data['changes']], [new.id])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+        self.assertFalse(response.data['has_more'])
+
+        response = self.client.get(f"/api/computers/changes/?since={response.data['cursor']}")
+        self.assertEqual(response.data['changes'], [])
+        self.assertEqual(response.data['deleted'], [])
+
+    @mock.patch('computers.views.DELTA_LIMIT', 2)
+    def test_tombstones_are_paged(self):
+        known = [Changes.objects.create(computer_name=f'PC-1{n}', change_description='create') for n in range(3)]
+        deleted_ids = [change.id for change in self.changes + known]
+        last_id = deleted_ids[-1]
+        for change in self.changes + known:
+            change.delete()
+
+        for since in (str(last_id), f'{last_id}:0'):
+            with self.subTest(since=since):
+                received = []
+                cursor = since
+                while True:
+                    response = self.client.get('/api/computers/changes/', {'since': cursor})
+                    self.assertLessEqual(len(response.data['deleted']), 2)
+                    received += response.data['deleted']
+                    cursor = response.data['cursor']
+                    if not response.data['has_more']:
+                        break
+                self.assertEqual(received, deleted_ids)
+
+                response = self.client.get('/api/computers/changes/', {'since': cursor})
+                self.assertEqual(response.data['deleted'], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/computers/changes/?since=abc')
+        self.assertEqual(response.status_code, 400)
+
+
+class ChangesSerializationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', first_name='Иван', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        computer = Computer.objects.create(
+            computer_name='PC-001',
+            ip_address='10.0.0.1',
+            location_address='ул. Киевская, 111а',
+            floor=1,
+            office='101',
+            domain='tnimc.local',
+            operating_system='Windows 10'
+        )
+        Changes.objects.create(computer=computer, user=self.user, change_description='create')
+        Changes.objects.create(computer_name='CSV импорт', computer_ip=None, change_description='import')
+
+    def test_values_path_matches_model_serializer(self):
+        queryset = Changes.objects.select_related('user', 'computer').order_by('id')
+        for expand in [set(), {'user'}, {'computer'}, {'computer', 'user'}]:
+            with self.subTest(expand=expand):
+                fast = ChangesValuesSerializer(expand=expand)
+                self.assertEqual(
+                    fast.many(fast.values(queryset)),
+                    ChangesSerializer(queryset, many=True, expand=expand).data
+                )
+
+    def test_list_is_compact_unless_expanded(self):
+        # Версии для ETag одним запросом и запрос списка
+        with self.assertNumQueries(2):
+            row = self.client.get('/api/computers/changes/').data[-1]
+        self.assertIsInstance(row['computer'], int)
+        self.assertEqual(row['username'], 'admin')
+
+        row = self.client.get('/api/computers/changes/?expand=computer,user').data[-1]
+        self.assertEqual(row['computer']['ip_address'], '10.0.0.1')
+        self.assertEqual(row['user']['first_name'], 'Иван')
+
+        response = self.client.get('/api/computers/changes/?expand=profile')
+        self.assertEqual(response.status_code, 400)
+
+
+class ChangesDescriptionTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+
+    def test_description_is_stored_as_json_with_extracted_fields(self):
+        change = Changes.objects.create(computer_name='PC-001', change_description={
+            'action': 'update',
+            'changes': {'office': {'from': '101', 'to': '102'}, 'floor': {'from': 1, 'to': 2}},
+        })
+        change.refresh_from_db()
+        self.assertEqual(change.change_description['changes']['floor']['to'], 2)
+        self.assertEqual(change.action, 'update')
+        self.assertEqual(change.changed_fields, ',floor,office,')
+
+        Changes.objects.create(computer_name='PC-002', change_description={'action': 'delete'})
+        response = self.client.get('/api/computers/changes/?action=update&field=office')
+        self.assertEqual([row['id'] for row in response.data], [change.id])
+        self.assertEqual(response.data[0]['change_description']['action'], 'update')
+        response = self.client.get('/api/computers/changes/?field=off')
+        self.assertEqual(response.data, [])
+
+
+class ImportRunTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+
+    def import_csv(self, rows):
+        lines = ['computer_name,ip_address,location_address,floor,office,domain,operating_system']
+        lines += [f'PC-{n:03d},10.0.0.{n},ул. Киевская,1,101,tnimc.local,Windows 10' for n in range(rows)]
+        lines.append('PC-bad,not-an-ip,ул. Киевская,1,101,tnimc.local,Windows 10')
+        upload = SimpleUploadedFile('computers.csv', '\n'.join(lines).encode('utf-8'), content_type='text/csv')
+        return self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+    def test_changes_row_holds_summary_and_details_are_fetched_on_demand(self):
+        response = self.import_csv(20)
+        self.assertEqual(response.data['imported_count'], 20)
+        run = ImportRun.objects.get(pk=response.data['import_run'])
+
+        description = Changes.objects.get(action='csv_import').change_description
+        self.assertEqual(description['import_run'], run.id)
+        self.assertEqual(description['error_count'], 1)
+        self.assertEqual(len(description['imported_preview']), 5)
+        self.assertNotIn('imported_computers', description)
+
+        response = self.client.get('/api/computers/imports/')
+        self.assertNotIn('imported_computers', response.data[0])
+
+        response = self.client.get(f'/api/computers/imports/{run.id}/')
+        self.assertEqual(len(response.data['imported_computers']), 20)
+        self.assertEqual(response.data['imported_computers'][0]['computer_name'], 'PC-000')
+        self.assertEqual(len(response.data['errors']), 1)
+
+
+class ComputerImportTests(APITestCase):
+    HEADER = 'computer_name,ip_address,location_address,floor,office,domain,operating_system'
+
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        Computer.objects.create(
+            computer_name='PC-000', ip_address='10.0.0.10', location_address='ул. Киевская', floor=1,
+            office='101', domain='tnimc.local', operating_system='Windows 10'
+        )
+
+    def import_csv(self, lines):
+        content = '\n'.join([self.HEADER, *lines]).encode('utf-8')
+        upload = SimpleUploadedFile('computers.csv', content, content_type='text/csv')
+        return self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+    def test_rows_are_imported_and_errors_reported_per_row(self):
+        response = self.import_csv([
+            'PC-000,10.0.0.10,ул. Киевская,1,101,tnimc.local,Windows 10',
+            'PC-001,10.0.0.11,ул. Киевская,2,201,tnimc.local,Windows 10',
+            'PC-001,10.0.0.11,ул. Киевская,2,201,tnimc.local,Windows 10',
+            'PC-002,not-an-ip,ул. Киевская,2,201,tnimc.local,Windows 10',
+            'PC-003,10.0.0.13,ул. Киевская,второй,201,tnimc.local,Windows 10',
+            'PC-004,10.0.0.14,ул. Киевская,3,301,,',
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('imported_count', 'total_rows', 'message')},
+            {'imported_count': 2, 'total_rows': 6, 'message': 'Импортировано 2 из 6 строк'}
+        )
+        self.assertEqual([error.split(':')[0] for error in response.data['errors']], [
+            'Строка 1', 'Строка 3', 'Строка 4', 'Строка 5'
+        ])
+        self.assertIn('PC-000 и IP 10.0.0.10 уже существует', response.data['errors'][0])
+        self.assertIn('ip_address', response.data['errors'][2])
+
+        self.assertEqual(
+            list(Computer.objects.order_by('computer_name').values_list('computer_name', 'ip_number')),
+            [('PC-000', 167772170), ('PC-001', 167772171), ('PC-004', 167772174)]
+        )
+        # Массовое сохранение без сигналов: версия, индекс поиска и статистика обновлены импортом
+        self.assertEqual(DataVersion.current(DataVersion.COMPUTERS).total_count, 3)
+        if search_index_supported():
+            self.assertEqual([computer.computer_name for computer, _ in search_computers('PC-004')], ['PC-004'])
+        self.assertEqual(inventory_stats()['total'], 3)
+
+        run = ImportRun.objects.get(pk=response.data['import_run'])
+        self.assertEqual((run.user, run.imported_count, run.error_count), (self.user, 2, 4))
+
+    def test_duplicates_with_padded_ip_are_skipped(self):
+        response = self.import_csv([
+            'PC-001,10.0.0.11,ул. Киевская,2,201,tnimc.local,Windows 10',
+            'PC-001, 10.0.0.11 ,ул. Киевская,2,201,tnimc.local,Windows 10',
+            'PC-000, 10.0.0.10,ул. Киевская,1,101,tnimc.local,Windows 10',
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['imported_count'], response.data['total_rows']), (1, 3))
+        self.assertEqual([error.split(':')[0] for error in response.data['errors']], ['Строка 2', 'Строка 3'])
+        self.assertEqual(Computer.objects.count(), 2)
+
+    def test_row_added_concurrently_is_skipped(self):
+        def rows():
+            for n in (1, 2):
+                yield {
+                    'computer_name': f'PC-00{n}', 'ip_address': f'10.0.0.1{n}', 'location_address': 'ул. Киевская',
+                    'floor': '1', 'office': '101', 'domain': 'tnimc.local', 'operating_system': 'Windows 10'
+                }
+                if n == 1:
+                    # Тот же компьютер сохранен другим запросом после загрузки множества дубликатов
+                    Computer.objects.create(
+                        computer_name='PC-001', ip_address='10.0.0.11', location_address='ул. Киевская', floor=1,
+                        office='101', domain='tnimc.local', operating_system='Windows 10'
+                    )
+
+        result = import_computers(rows(), atomic=False)
+        self.assertEqual((result['imported_count'], result['total_rows']), (1, 2))
+        self.assertEqual(len(result['errors']), 1)
+        self.assertIn('Строка 1: Компьютер с именем PC-001', result['errors'][0])
+        self.assertEqual(
+            list(Computer.objects.order_by('computer_name').values_list('computer_name', flat=True)),
+            ['PC-000', 'PC-001', 'PC-002']
+        )
+        self.assertEqual(DataVersion.current(DataVersion.COMPUTERS).total_count, 3)
+
+    def test_nothing_imported(self):
+        response = self.import_csv(['PC-000,10.0.0.10,ул. Киевская,1,101,tnimc.local,Windows 10'])
+        self.assertEqual((response.data['imported_count'], response.data['total_rows']), (0, 1))
+        self.assertIsNone(response.data['import_run'])
+        self.assertFalse(Changes.objects.filter(action='csv_import').exists())
+
+    def test_missing_file(self):
+        response = self.client.post('/api/computers/computers/import_csv/', {}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+
+class CsvEncodingTests(APITestCase):
+    HEADER = ['computer_name', 'ip_address', 'location_address', 'floor', 'office', 'domain', 'operating_system']
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+
+    def upload(self, content):
+        upload = SimpleUploadedFile('computers.csv', content, content_type='text/csv')
+        return self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+    def make_content(self, delimiter=','):
+        rows = [self.HEADER, ['PC-001', '10.0.0.1', 'ул. Киевская, 111а', '1', '101', 'tnimc.local', 'Windows 10']]
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=delimiter).writerows(rows)
+        return buffer.getvalue()
+
+    def assertImported(self, response):
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['imported_count'], 1, response.data['errors'])
+        self.assertEqual(Computer.objects.get().location_address, 'ул. Киевская, 111а')
+
+    def test_utf8_with_bom(self):
+        self.assertImported(self.upload(self.make_content().encode('utf-8-sig')))
+
+    def test_excel_cp1251_with_semicolons(self):
+        self.assertImported(self.upload(self.make_content(delimiter=';').encode('cp1251')))
+
+    def test_plain_utf8(self):
+        self.assertImported(self.upload(self.make_content().encode('utf-8')))
+
+    def test_export_streams_quoted_rows(self):
+        Computer.objects.create(
+            computer_name='PC-001', ip_address='10.0.0.1', location_address='ул. Киевская, 111а', floor=1,
+            office='101', domain='tnimc.local', operating_system='Windows 10', has_kaspersky=True,
+            pc_owner='Иванов Иван', comment='Монитор "Samsung", 24"'
+        )
+        response = self.client.get('/api/computers/computers/export_csv/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="computers_export.csv"')
+
+        content = b''.join(response.streaming_content)
+        # UTF-8, поля с запятой и кавычками — в кавычках, кавычки удваиваются
+        self.assertIn('"ул. Киевская, 111а"'.encode('utf-8'), content)
+        self.assertIn('"Монитор ""Samsung"", 24"""\r\n'.encode('utf-8'), content)
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8'), newline='')))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        self.assertEqual(rows[1:], [[
+            'PC-001', '10.0.0.1', 'ул. Киевская, 111а', '1', '101', 'tnimc.local', 'Иванов Иван', '',
+            'Да', 'Windows 10', 'Монитор "Samsung", 24"'
+        ]])
+        # Запись о выгрузке появляется после отдачи последней строки
+        self.assertEqual(Changes.objects.get(action='csv_export').change_description['exported_count'], 1)
+
+    async def test_export_streams_chunks_under_asgi(self):
+        await Computer.objects.abulk_create(
+            Computer(computer_name=f'PC-{number:03}', ip_address=f'10.0.0.{number}', floor=1) for number in range(1, 6)
+        )
+        token = await ExpiringToken.objects.aget(user__username='admin')
+        response = await AsyncClient().get(
+            '/api/computers/computers/export_csv/', headers={'Authorization': f'Token {token.key}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        # Синхронный итератор ASGI-обработчик прочитал бы целиком до отправки
+        self.assertTrue(response.is_async)
+        parts = [part async for part in response.streaming_content]
+        # Заголовок и пачка строк отдаются отдельными частями
+        self.assertEqual(len(parts), 2)
+        self.assertEqual(len(list(csv.reader(io.StringIO(b''.join(parts).decode('utf-8'))))), 6)
+
+
+class ComputerChangeLogTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.computer = Computer.objects.create(
+            computer_name='PC-001', ip_address='10.0.0.1', location_address='ул. Киевская',
+            floor=1, office='101', domain='tnimc.local', operating_system='Windows 10'
+        )
+        self.url = f'/api/computers/computers/{self.computer.id}/'
+
+    def test_update_writes_diff(self):
+        response = self.client.patch(self.url, {'office': '202', 'floor': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        change = Changes.objects.get()
+        self.assertEqual((change.action, change.computer, change.user), ('update', self.computer, self.user))
+        # Неизмененный этаж в журнал не попадает
+        self.assertEqual(change.change_description['changes'], {'office': {'from': '101', 'to': '202'}})
+
+    def test_update_without_changes_is_not_logged(self):
+        response = self.client.patch(self.url, {'office': '101'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Changes.objects.exists())
+
+    def test_create_and_delete_are_logged(self):
+        response = self.client.post('/api/computers/computers/', {
+            'computer_name': 'PC-002', 'ip_address': '10.0.0.2', 'location_address': 'ул. Киевская',
+            'floor': 2, 'office': '202', 'domain': 'tnimc.local', 'operating_system': 'Windows 10'
+        }, format='json')
+        change = Changes.objects.get(computer_id=response.data['id'])
+        self.assertEqual(change.action, 'create')
+        self.assertEqual(change.change_description['changes']['computer_name'], 'PC-002')
+
+        self.client.delete(self.url)
+        change = Changes.objects.get(action='delete')
+        self.assertIsNone(change.computer)
+        self.assertEqual(change.computer_name, 'PC-001')
+        self.assertEqual(change.change_description['changes']['computer_data']['ip_address'], '10.0.0.1')
+
+
+@skipUnless(search_index_supported(), 'Индекс FTS5 с токенизатором trigram есть только в SQLite 3.34+')
+class ComputerSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.computers = [
+            Computer.objects.create(
+                computer_name=name, ip_address=ip, location_address='ул. Киевская, 111а', floor=1,
+                office=office, domain='tnimc.local', operating_system='Windows 10', pc_owner=owner
+            )
+            for name, ip, office, owner in (
+                ('BUH-01', '10.0.0.1', '101', 'Иванов Иван'),
+                ('BUH-02', '10.0.0.2', '102', 'Петров Петр'),
+                ('KADR-01', '10.0.1.15', '305', 'Сидорова Анна'),
+            )
+        ]
+
+    def search(self, query):
+        response = self.client.get('/api/computers/computers/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['computer_name'] for item in response.data]
+
+    def test_substring_and_prefix(self):
+        self.assertEqual(self.search('иван'), ['BUH-01'])
+        self.assertEqual(self.search('10.0.1.'), ['KADR-01'])
+        self.assertEqual(self.search('buh 305'), [])
+        # Кабинет целиком выше, чем подстрока адреса или имени
+        self.assertEqual(self.search('киевская 305')[0], 'KADR-01')
+        self.assertEqual(sorted(self.search('buh-0')), ['BUH-01', 'BUH-02'])
+
+    @mock.patch('computers.search.SEARCH_CANDIDATES', 2)
+    def test_exact_match_beyond_candidate_limit(self):
+        for n in range(4):
+            Computer.objects.create(
+                computer_name=f'OLD-SRV-{n}', ip_address=f'10.0.2.{n}', location_address='ул. Киевская, 111а',
+                floor=1, office='201', domain='tnimc.local', operating_system='Windows 10'
+            )
+        Computer.objects.create(
+            computer_name='SRV-01', ip_address='10.0.3.1', location_address='ул. Киевская, 111а',
+            floor=1, office='201', domain='tnimc.local', operating_system='Windows 10'
+        )
+        Computer.objects.create(
+            computer_name='SRV', ip_address='10.0.3.2', location_address='ул. Киевская, 111а',
+            floor=1, office='201', domain='tnimc.local', operating_system='Windows 10'
+        )
+        # Обе записи созданы последними и не попадают в первые кандидаты по подстроке
+        self.assertEqual(self.search('srv')[:2], ['SRV', 'SRV-01'])
+        self.assertEqual(self.search('10.0.3.2')[0], 'SRV')
+
+    def test_typo(self):
+        self.assertEqual(self.search('Ивонов'), ['BUH-01'])
+        self.assertEqual(self.search('сидорва'), ['KADR-01'])
+        self.assertEqual(self.search('Смирнов'), [])
+
+    def test_index_follows_changes(self):
+        computer = self.computers[0]
+        self.client.patch(f'/api/computers/computers/{computer.id}/', {'pc_owner': 'Смирнов Олег'}, format='json')
+        self.assertEqual(self.search('смирнов'), ['BUH-01'])
+        self.assertEqual(self.search('иванов'), [])
+
+        self.client.post(
+            '/api/computers/computers/bulk_update/',
+            {'ids': [computer.id], 'values': {'office': '777'}}, format='json'
+        )
+        self.assertEqual(self.search('777'), ['BUH-01'])
+
+        self.client.post('/api/computers/computers/bulk_delete/', {'ids': [computer.id]}, format='json')
+        self.client.delete(f'/api/computers/computers/{self.computers[1].id}/')
+        self.assertEqual(self.search('buh'), [])
+
+        upload = SimpleUploadedFile('computers.csv', make_csv(3).encode('utf-8'), content_type='text/csv')
+        self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+        self.assertEqual(self.search('pc-000002'), ['PC-000002'])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM computers_computer_search')
+        self.assertEqual(search_computers('иванов'), [])
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual([computer for computer, _ in search_computers('иванов')], [self.computers[0]])
+
+    def test_validation(self):
+        url = '/api/computers/computers/search/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'q': 'buh', 'limit': 1000}).status_code, 400)
+        self.assertEqual(len(self.client.get(url, {'q': 'buh', 'limit': 1}).data), 1)
+
+
+class SubnetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        for n, ip_address in enumerate((
+            '192.168.4.1', '192.168.4.2', '192.168.4.10', '192.168.5.255', '192.168.7.254', '192.168.8.1'
+        )):
+            Computer.objects.create(
+                computer_name=f'PC-{n:03d}', ip_address=ip_address, location_address='ул. Киевская',
+                floor=1, office='101', domain='tnimc.local', operating_system='Windows 10'
+            )
+
+    def addresses(self, params):
+        response = self.client.get('/api/computers/computers/', params)
+        self.assertEqual(response.status_code, 200)
+        return [computer['ip_address'] for computer in response.data]
+
+    def test_cidr_and_range_filters(self):
+        self.assertEqual(
+            self.addresses({'cidr': '192.168.4.0/22', 'ordering': 'ip_address'}),
+            ['192.168.4.1', '192.168.4.10', '192.168.4.2', '192.168.5.255', '192.168.7.254']
+        )
+        # Биты хоста в записи подсети отбрасываются
+        self.assertEqual(self.addresses({'cidr': '192.168.8.77/24'}), ['192.168.8.1'])
+        self.assertEqual(
+            sorted(self.addresses({'ip_range': '192.168.4.2 - 192.168.5.255'})),
+            ['192.168.4.10', '192.168.4.2', '192.168.5.255']
+        )
+        for params in ({'cidr': '192.168.4.0/33'}, {'cidr': 'сеть'}, {'ip_range': '192.168.4.9-192.168.4.1'},
+                       {'ip_range': '192.168.4.1'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/computers/computers/', params).status_code, 400)
+
+    def test_free_addresses(self):
+        response = self.client.get('/api/computers/computers/free_addresses/', {'cidr': '192.168.4.0/22'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['total'], response.data['used'], response.data['free']), (1022, 5, 1017))
+        self.assertEqual(response.data['free_ranges'], [
+            {'start': '192.168.4.3', 'end': '192.168.4.9', 'count': 7},
+            {'start': '192.168.4.11', 'end': '192.168.5.254', 'count': 500},
+            {'start': '192.168.6.0', 'end': '192.168.7.253', 'count': 510},
+        ])
+
+        response = self.client.get('/api/computers/computers/free_addresses/', {'cidr': '10.0.0.0/30'})
+        self.assertEqual(response.data['free_ranges'], [{'start': '10.0.0.1', 'end': '10.0.0.2', 'count': 2}])
+        self.assertEqual(self.client.get('/api/computers/computers/free_addresses/').status_code, 400)
+
+    def test_ip_number_is_maintained(self):
+        computer = Computer.objects.get(ip_address='192.168.8.1')
+        self.assertEqual(computer.ip_number, 3232237569)
+        self.client.patch(f'/api/computers/computers/{computer.id}/', {'ip_address': '10.0.0.5'}, format='json')
+        computer.refresh_from_db()
+        self.assertEqual(computer.ip_number, 167772165)
+        self.assertNotIn('ip_number', self.client.get(f'/api/computers/computers/{computer.id}/').data)
+
+        upload = SimpleUploadedFile('computers.csv', make_csv(2).encode('utf-8'), content_type='text/csv')
+        self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+        self.assertEqual(self.addresses({'cidr': '10.0.0.0/31'}), ['10.0.0.0', '10.0.0.1'])
+
+    def test_fill_ip_numbers(self):
+        Computer.objects.update(ip_number=None)
+        self.assertEqual(fill_ip_numbers(), 6)
+        self.assertFalse(Computer.objects.filter(ip_number__isnull=True).exists())
+        self.assertEqual(fill_ip_numbers(), 0)
+
+
+class InventoryStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.computers = [
+            Computer.objects.create(
+                computer_name=f'PC-{n:03d}', ip_address=f'10.0.0.{n}', location_address='ул. Киевская',
+                floor=n % 2 + 1, office='101', domain='tnimc.local', has_kaspersky=n < 3,
+                operating_system='Windows 10' if n else 'Linux'
+            )
+            for n in range(4)
+        ]
+
+    def assertStatsMatchRebuild(self):
+        incremental = inventory_stats()
+        rebuild_inventory_stats()
+        self.assertEqual(incremental, inventory_stats())
+        return incremental
+
+    def test_stats(self):
+        response = self.client.get('/api/computers/computers/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['total'], response.data['kaspersky_coverage']), (4, 0.75))
+        self.assertEqual(response.data['by_field']['operating_system'], [
+            {'value': 'Windows 10', 'count': 3}, {'value': 'Linux', 'count': 1}
+        ])
+        self.assertEqual(response.data['by_field']['floor'], [{'value': 1, 'count': 2}, {'value': 2, 'count': 2}])
+        self.assertEqual(
+            self.client.get('/api/computers/computers/stats/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+
+    def test_stats_follow_changes(self):
+        first, second, third, _ = self.computers
+        self.client.patch(f'/api/computers/computers/{first.id}/', {'operating_system': 'Windows 11'}, format='json')
+        # Компьютер, загруженный не целиком: прежние значения читаются перед сохранением
+        computer = Computer.objects.only('id', 'floor').get(pk=second.id)
+        computer.floor = 5
+        computer.save()
+        self.client.post(
+            '/api/computers/computers/bulk_update/', {'ids': [first.id, third.id], 'values': {'domain': 'corp.local'}},
+            format='json'
+        )
+        self.client.delete(f'/api/computers/computers/{third.id}/')
+        self.client.post('/api/computers/computers/bulk_delete/', {'ids': [second.id]}, format='json')
+        upload = SimpleUploadedFile('computers.csv', make_csv(2).encode('utf-8'), content_type='text/csv')
+        self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+        stats = self.assertStatsMatchRebuild()
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual(stats['by_field']['domain'], [
+            {'value': 'tnimc.local', 'count': 3}, {'value': 'corp.local', 'count': 1}
+        ])
+
+    def test_stale_instances_do_not_skew_stats(self):
+        first = Computer.objects.get(pk=self.computers[1].id)
+        second = Computer.objects.get(pk=self.computers[1].id)
+        first.operating_system = 'Windows 11'
+        first.save()
+        # Второй экземпляр загружен до изменения и возвращает прежнюю систему
+        second.floor = 5
+        second.save()
+        # Экземпляр, обновленный из базы частично
+        third = Computer.objects.get(pk=self.computers[2].id)
+        other = Computer.objects.get(pk=third.pk)
+        other.floor = 6
+        other.save()
+        third.refresh_from_db(fields=['domain'])
+        third.domain = 'corp.local'
+        third.save()
+        stale = Computer.objects.get(pk=self.computers[3].id)
+        other = Computer.objects.get(pk=stale.pk)
+        other.floor = 7
+        other.save()
+        stale.delete()
+
+        stats = self.assertStatsMatchRebuild()
+        self.assertEqual(stats['by_field']['operating_system'], [
+            {'value': 'Windows 10', 'count': 2}, {'value': 'Linux', 'count': 1}
+        ])
+
+    def test_rebuild_command(self):
+        InventoryStat.objects.all().delete()
+        self.assertEqual(inventory_stats()['total'], 0)
+        call_command('rebuild_inventory_stats', stdout=io.StringIO())
+        self.assertEqual(inventory_stats()['total'], 4)
+
+    def test_rebuild_corrects_drift_after_queryset_update(self):
+        self.assertEqual(rebuild_inventory_stats(), 0)
+        # queryset.update() не отправляет сигналы: счетчики расходятся с таблицей
+        Computer.objects.filter(operating_system='Windows 10').update(operating_system='Windows 11')
+        self.assertEqual(inventory_stats()['by_field']['operating_system'][0], {'value': 'Windows 10', 'count': 3})
+
+        output = io.StringIO()
+        call_command('rebuild_inventory_stats', stdout=output)
+        self.assertIn('Исправлено счетчиков: 2', output.getvalue())
+        self.assertEqual(inventory_stats()['by_field']['operating_system'], [
+            {'value': 'Windows 11', 'count': 3}, {'value': 'Linux', 'count': 1}
+        ])
+        self.assertEqual(rebuild_inventory_stats(), 0)
+
+
+class BulkComputerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(self.user)
+        self.computers = [
+            Computer.objects.create(
+                computer_name=f'PC-{n:03d}', ip_address=f'10.0.0.{n}', location_address='ул. Киевская',
+                floor=1, office='101' if n else '305', domain='tnimc.local', operating_system='Windows 10'
+            )
+            for n in range(4)
+        ]
+        self.ids = [computer.id for computer in self.computers]
+        Notification.objects.all().delete()
+
+    def test_bulk_update_writes_one_change(self):
+        version = DataVersion.current(DataVersion.COMPUTERS).sequence
+        response = self.client.post(
+            '/api/computers/computers/bulk_update/', {'ids': self.ids, 'values': {'office': '305'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        # У первого компьютера кабинет уже 305
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Computer.objects.filter(office='305').count(), 4)
+        self.assertEqual(DataVersion.current(DataVersion.COMPUTERS).sequence, version + 1)
+
+        change = Changes.objects.get(pk=response.data['change'])
+        self.assertEqual((change.action, change.changed_fields, change.user), ('bulk_update', ',office,', self.user))
+        self.assertEqual(
+            [computer['changes'] for computer in change.change_description['computers']],
+            [{'office': {'from': '101', 'to': '305'}}] * 3
+        )
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_bulk_update_is_validated_before_changes(self):
+        for data in (
+            {'ids': self.ids + [999999], 'values': {'office': '1'}},
+            {'ids': self.ids, 'values': {'ip_address': '10.0.0.1'}},
+            {'ids': self.ids, 'values': {'floor': 'два'}},
+            {'ids': self.ids, 'values': {}},
+            {'ids': [], 'values': {'office': '1'}},
+        ):
+            with self.subTest(data=data):
+                response = self.client.post('/api/computers/computers/bulk_update/', data, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Changes.objects.exists())
+
+    def test_bulk_delete_keeps_journal(self):
+        change = Changes.objects.create(computer=self.computers[0], user=self.user, change_description={'action': 'update'})
+        Notification.objects.all().delete()
+
+        response = self.client.post('/api/computers/computers/bulk_delete/', {'ids': self.ids[:3]}, format='json')
+        self.assertEqual(response.data['deleted'], 3)
+        self.assertEqual(list(Computer.objects.values_list('id', flat=True)), self.ids[3:])
+        self.assertEqual(DataVersion.current(DataVersion.COMPUTERS).total_count, 1)
+
+        change.refresh_from_db()
+        self.assertIsNone(change.computer)
+        self.assertEqual(change.computer_name, 'PC-000')
+        summary = Changes.objects.get(pk=response.data['change'])
+        self.assertEqual(summary.action, 'bulk_delete')
+        self.assertEqual(len(summary.change_description['computers']), 3)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_bulk_delete_keeps_derived_data_consistent(self):
+        Changes.objects.create(computer=self.computers[0], user=self.user, change_description={'action': 'update'})
+        changes_version = DataVersion.current(DataVersion.CHANGES).sequence
+
+        self.client.post('/api/computers/computers/bulk_delete/', {'ids': self.ids[:3]}, format='json')
+
+        self.assertEqual([computer.id for computer, _ in search_computers('PC-00')], self.ids[3:])
+        stats = inventory_stats()
+        rebuild_inventory_stats()
+        self.assertEqual(stats, inventory_stats())
+        self.assertEqual(stats['total'], 1)
+        # Записи журнала не удалялись, но изменились: отметок об удалении нет, версия журнала новая
+        self.assertFalse(ChangesTombstone.objects.exists())
+        self.assertGreater(DataVersion.current(DataVersion.CHANGES).sequence, changes_version + 1)
+
+    def test_bulk_requires_administrator(self):
+        self.client.force_authenticate(User.objects.create(username='auditor'))
+        response = self.client.post('/api/computers/computers/bulk_delete/', {'ids': self.ids}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Computer.objects.count(), 4)
+
+
+class JobTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+
+    def test_import_job_is_queued_and_reports_result(self):
+        lines = ['computer_name,ip_address,location_address,floor,office,domain,operating_system']
+        lines += [f'PC-{n:03d},10.0.0.{n},ул. Киевская,1,101,tnimc.local,Windows 10' for n in range(3)]
+        upload = SimpleUploadedFile('computers.csv', '\n'.join(lines).encode('utf-8'), content_type='text/csv')
+
+        response = self.client.post('/api/computers/jobs/import_csv/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(Computer.objects.count(), 0)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        response = self.client.get(f"/api/computers/jobs/{response.data['id']}/")
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['rows_processed'], 3)
+        self.assertEqual(response.data['total_rows'], 3)
+        self.assertEqual(response.data['result']['imported_count'], 3)
+        self.assertTrue(ImportRun.objects.filter(pk=response.data['result']['import_run']).exists())
+        self.assertEqual(Computer.objects.count(), 3)
+
+    def test_export_job_result_is_downloadable(self):
+        for n, floor in enumerate([1, 2]):
+            Computer.objects.create(
+                computer_name=f'PC-00{n}', ip_address=f'10.0.0.{n}', location_address='ул. Киевская',
+                floor=floor, office='101', domain='tnimc.local', operating_system='Windows 10'
+            )
+        response = self.client.post('/api/computers/jobs/export_csv/', {'floor': 2}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['id']
+        self.assertEqual(self.client.get(f'/api/computers/jobs/{job_id}/download/').status_code, 404)
+
+        run_pending_jobs()
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.rows_processed, job.total_rows), ('done', 1, 1))
+        response = self.client.get(f'/api/computers/jobs/{job_id}/download/')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('PC-001', content)
+        self.assertNotIn('PC-000', content)
+
+    @override_settings(JOB_LEASE_TIMEOUT=60)
+    def test_abandoned_running_job_fails(self):
+        now = timezone.now()
+        abandoned = Job.objects.create(
+            kind=Job.EXPORT, status='running', started_at=now - timedelta(hours=1),
+            heartbeat_at=now - timedelta(seconds=61)
+        )
+        alive = Job.objects.create(
+            kind=Job.EXPORT, status='running', started_at=now - timedelta(hours=1),
+            heartbeat_at=now - timedelta(seconds=30)
+        )
+
+        self.assertEqual(run_pending_jobs(), 0)
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, 'failed')
+        self.assertTrue(abandoned.error)
+        self.assertIsNotNone(abandoned.finished_at)
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, 'running')
+
+    def test_progress_extends_lease(self):
+        job = Job.objects.create(kind=Job.EXPORT, status='running', heartbeat_at=timezone.now() - timedelta(hours=1))
+        report_progress(job, 10)
+        job.refresh_from_db()
+        self.assertEqual(job.rows_processed, 10)
+        self.assertGreater(job.heartbeat_at, timezone.now() - timedelta(minutes=1))
+
+    def test_interrupted_import_keeps_journal_with_saved_batches(self):
+        def rows():
+            for n in range(3):
+                yield {
+                    'computer_name': f'PC-{n:03d}', 'ip_address': f'10.0.0.{n}', 'location_address': 'ул. Киевская',
+                    'floor': '1', 'office': '101', 'domain': 'tnimc.local', 'operating_system': 'Windows 10'
+                }
+            raise OSError('Обработчик остановлен')
+
+        with self.assertRaises(OSError):
+            import_computers(rows(), batch_size=2, atomic=False)
+
+        # Первая пачка сохранена, запись в журнале создана при прерывании
+        self.assertEqual(Computer.objects.count(), 2)
+        description = Changes.objects.get(action='csv_import').change_description
+        self.assertEqual((description['imported_count'], description['total_rows']), (2, 3))
+        self.assertEqual(description['errors'], ['Импорт прерван: Обработчик остановлен'])
+        run = ImportRun.objects.get(pk=description['import_run'])
+        self.assertEqual(run.imported_count, 2)
+
+    def test_import_journal_is_written_once_with_final_counts(self):
+        rows = [
+            {
+                'computer_name': f'PC-{n:03d}', 'ip_address': f'10.0.0.{n}', 'location_address': 'ул. Киевская',
+                'floor': '1', 'office': '101', 'domain': 'tnimc.local', 'operating_system': 'Windows 10'
+            }
+            for n in range(5)
+        ]
+        Notification.objects.all().delete()
+        progress = []
+
+        def on_progress(total_rows):
+            # Пока импорт идет, записи в журнале нет, а ImportRun уже показывает сохраненные строки
+            progress.append((
+                Changes.objects.filter(action='csv_import').exists(),
+                ImportRun.objects.values_list('imported_count', flat=True).first()
+            ))
+
+        result = import_computers(rows, batch_size=2, atomic=False, on_progress=on_progress)
+
+        self.assertEqual(progress[:2], [(False, 2), (False, 4)])
+        change = Changes.objects.get(action='csv_import')
+        self.assertEqual(change.change_description['imported_count'], 5)
+        self.assertEqual(change.computer_name, 'CSV импорт (5 шт.)')
+        self.assertEqual(len(result['import_run'].get_details()['imported_computers']), 5)
+        # Одно уведомление на импорт, уже с итоговыми числами
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertIn('5 шт.', Notification.objects.get().message)
+
+    def test_invalid_export_filter_is_rejected_before_queueing(self):
+        response = self.client.post('/api/computers/jobs/export_csv/', {'floor': 'два'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(EVENTS_VERSION_POLL_INTERVAL=0.01)
+class EventBrokerTests(TransactionTestCase):
+    def test_version_watcher_reports_changes_made_without_signals(self):
+        # Так выглядят для процесса изменения, сделанные другим воркером
+        async def scenario():
+            broker = EventBroker()
+            subscriber = broker.subscribe()
+            await asyncio.sleep(0.05)
+            await sync_to_async(DataVersion.bump)(DataVersion.COMPUTERS, 1, timezone.now())
+            try:
+                return await asyncio.wait_for(subscriber[1].get(), 1)
+            finally:
+                broker.unsubscribe(subscriber)
+
+        self.assertIn('event: version_changed', asyncio.run(scenario()))
+
+
+class StreamTicketTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='admin')
+        Profile.objects.filter(user=self.user).update(role='admin')
+        self.token = ExpiringToken.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def stream_token(self, **params):
+        return get_stream_token(RequestFactory().get('/api/computers/events/', params))
+
+    def test_ticket_is_single_use(self):
+        response = self.client.post('/api/computers/events/ticket/')
+        self.assertEqual(response.status_code, 201)
+        ticket = response.data['ticket']
+        self.assertNotEqual(ticket, self.token.key)
+
+        self.assertEqual(self.stream_token(ticket=ticket).key, self.token.key)
+        self.assertIsNone(self.stream_token(ticket=ticket))
+        self.assertFalse(StreamTicket.objects.exists())
+
+    def test_expired_ticket_and_token_in_url_are_rejected(self):
+        ticket = self.client.post('/api/computers/events/ticket/').data['ticket']
+        StreamTicket.objects.update(expires_at=timezone.now())
+        self.assertIsNone(self.stream_token(ticket=ticket))
+        self.assertIsNone(self.stream_token(token=self.token.key))
+
+        # Билет не переживает выход пользователя (удаление токена)
+        ticket = self.client.post('/api/computers/events/ticket/').data['ticket']
+        self.token.delete()
+        self.assertIsNone(self.stream_token(ticket=ticket))
+
+    def test_ticket_requires_administrator(self):
+        Profile.objects.filter(user=self.user).update(role='employee')
+        self.assertEqual(self.client.post('/api/computers/events/ticket/').status_code, 403)
+
+    @mock.patch('computers.signals.ComputerSerializer')
+    def test_events_are_not_serialized_without_subscribers(self, serializer):
+        computer = Computer.objects.create(
+            computer_name='PC-001', ip_address='10.0.0.1', location_address='ул. Киевская',
+            floor=1, office='101', domain='tnimc.local', operating_system='Windows 10'
+        )
+        serializer.assert_not_called()
+        with mock.patch.object(EventBroker, 'subscriber_count', new_callable=mock.PropertyMock, return_value=1):
+            computer.save()
+        serializer.assert_called_once_with(computer)
+
+
+class PermissionQueryTests(APITestCase):
+    def setUp(self):
+        self.computers = [
+            Computer.objects.create(
+                computer_name=f'PC-{n:03d}', ip_address=f'10.0.0.{n}', location_address='ул. Киевская',
+                floor=1, office='101', domain='tnimc.local', operating_system='Windows 10'
+            )
+            for n in range(20)
+        ]
+
+    def client_for(self, role, username):
+        user = User.objects.create(username=username)
+        Profile.objects.filter(user=user).update(role=role)
+        client = self.client_class()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {ExpiringToken.objects.get(user=user).key}')
+        # Первый запрос кладет токен с профилем в кэш
+        client.get('/api/computers/computers/')
+        return client
+
+    def test_role_is_resolved_without_extra_queries(self):
+        for role in ('auditor', 'admin'):
+            client = self.client_for(role, role)
+            with self.subTest(role=role):
+                # Версия для ETag и сам список / объект
+                with self.assertNumQueries(2):
+                    self.assertEqual(client.get('/api/computers/computers/').status_code, 200)
+                with self.assertNumQueries(2):
+                    self.assertEqual(client.get(f'/api/computers/computers/{self.computers[0].id}/').status_code, 200)
+
+    def test_profile_is_loaded_once_per_request(self):
+        # Без кэша токена профиль загружается одним запросом на все проверки разрешений
+        user = User.objects.create(username='staff', is_staff=True)
+        Profile.objects.filter(user=user).delete()
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get('/api/computers/computers/').status_code, 200)
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(f'/api/computers/computers/{self.computers[0].id}/').status_code, 200)
+
+
+@override_settings(API_METRICS_ENABLED=True)
+class ApiMetricsTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.user)
+        Computer.objects.create(
+            computer_name='PC-001', ip_address='10.0.0.1', location_address='ул. Киевская',
+            floor=1, office='101', domain='tnimc.local', operating_system='Windows 10'
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/computers/computers/')
+        timing = response['Server-Timing']
+        for name in ('db;', 'serialize;', 'render;', 'total;'):
+            self.assertIn(name, timing)
+        # Версия данных и сам список
+        self.assertIn('desc="2 queries"', timing)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/computers/computers/')
+        self.client.get('/api/computers/changes/')
+        self.client.get('/api/accounts/users/me/')
+
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('api_request_queries{endpoint="ComputerViewSet.list",quantile="0.5"} 2', text)
+        self.assertIn('api_request_total_seconds_count{endpoint="ChangesViewSet.list"} 1', text)
+        self.assertIn('api_request_total_seconds_count{endpoint="UserViewSet.me"} 1', text)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(User.objects.create(username='auditor'))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+    @override_settings(API_METRICS_ENABLED=False)
+    def test_disabled_by_default(self):
+        response = self.client.get('/api/computers/computers/')
+        self.assertNotIn('Server-Timing', response)
+
+
+class SeedDataTests(TestCase):
+    def seed(self, **options):
+        call_command(
+            'seed_data', computers=20, changes=50, users=6, interactive=False, stdout=io.StringIO(), **options
+        )
+
+    def test_seed_data(self):
+        self.seed(i_know=True, password='secret-password')
+        self.assertEqual(Computer.objects.count(), 20)
+        self.assertEqual(Changes.objects.filter(action='update', changed_fields__contains=',office,').count(), 50)
+        self.assertEqual(DataVersion.current(DataVersion.CHANGES).total_count, 50)
+
+        users = User.objects.filter(username__startswith='bench-')
+        self.assertEqual(users.count(), 6)
+        # Профили и токены создаются без сигналов, но для каждого пользователя;
+        # администраторы — только с --admins
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 6)
+        self.assertFalse(Profile.objects.filter(user__in=users, role='admin').exists())
+        self.assertEqual(ExpiringToken.objects.filter(user__in=users).count(), 6)
+        self.assertTrue(users.first().check_password('secret-password'))
+
+    def test_reseeding_does_not_queue_notifications_or_tombstones(self):
+        self.seed(i_know=True, admins=True)
+        Notification.objects.all().delete()
+        self.seed(i_know=True)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(ChangesTombstone.objects.exists())
+        self.assertEqual(DataVersion.current(DataVersion.CHANGES).total_count, 50)
+
+    def test_requires_explicit_confirmation(self):
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.assertFalse(Computer.objects.exists())
+
+
+class EndpointQueryCountTests(APITestCase):
+    """
+    Число SQL-запросов эндпоинтов не зависит от объема данных: каждая проверка
+    повторяется на наборах из SIZES компьютеров (у каждого size записей журнала,
+    size загрузок CSV и фоновых задач). Токен каждый раз читается из базы.
+    """
+    SIZES = (1, 10)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        Profile.objects.filter(user=self.user).update(role='admin')
+        token = ExpiringToken.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def seed(self, size):
+        seed_computers(size)
+        seed_journal(size * size, [self.user])
+        ImportRun.objects.all().delete()
+        for _ in range(size):
+            run = ImportRun(user=self.user, total_rows=1, imported_count=1)
+            run.set_details([], [])
+            run.save()
+        Job.objects.all().delete()
+        Job.objects.bulk_create([
+            Job(kind=Job.EXPORT, status='done', user=self.user, result_file=f'jobs/results/{n}.csv')
+            for n in range(size)
+        ])
+        if not default_storage.exists('jobs/results/0.csv'):
+            default_storage.save('jobs/results/0.csv', ContentFile(b'computer_name\n'))
+        return Computer.objects.order_by('id').first()
+
+    def assertQueryCount(self, expected, send):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                target = self.seed(size)
+                caches[TOKEN_CACHE].clear()
+                with self.assertNumQueries(expected):
+                    response = send(target, size)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 400, getattr(response, 'data', None))
+
+    def test_computers_list(self):
+        self.assertQueryCount(3, lambda computer, size: self.client.get('/api/computers/computers/'))
+        self.assertQueryCount(3, lambda computer, size: self.client.get(
+            '/api/computers/computers/', {'page_size': 5, 'floor': 1, 'ordering': '-floor'}
+        ))
+
+    def test_computers_search(self):
+        self.assertQueryCount(6, lambda computer, size: self.client.get('/api/computers/computers/search/', {'q': 'pc-00'}))
+
+    def test_computers_free_addresses(self):
+        self.assertQueryCount(4, lambda computer, size: self.client.get(
+            '/api/computers/computers/free_addresses/', {'cidr': '10.0.0.0/31'}
+        ))
+
+    def test_computers_stats(self):
+        self.assertQueryCount(3, lambda computer, size: self.client.get('/api/computers/computers/stats/'))
+
+    def test_computers_retrieve(self):
+        self.assertQueryCount(3, lambda computer, size: self.client.get(f'/api/computers/computers/{computer.id}/'))
+
+    def test_computers_create_update_delete(self):
+        def create(computer, size):
+            return self.client.post('/api/computers/computers/', {
+                'computer_name': f'NEW-{size}', 'ip_address': '192.168.0.1', 'location_address': 'ул. Киевская',
+                'floor': 1, 'office': '101', 'domain': 'tnimc.local', 'operating_system': 'Windows 10'
+            }, format='json')
+
+        self.assertQueryCount(15, create)
+        self.assertQueryCount(15, lambda computer, size: self.client.patch(
+            f'/api/computers/computers/{computer.id}/', {'office': '202'}, format='json'
+        ))
+        self.assertQueryCount(15, lambda computer, size: self.client.delete(f'/api/computers/computers/{computer.id}/'))
+
+    def test_computers_bulk_update_and_delete(self):
+        self.assertQueryCount(15, lambda computer, size: self.client.post(
+            '/api/computers/computers/bulk_update/',
+            {'ids': list(Computer.objects.values_list('id', flat=True)), 'values': {'office': '305', 'floor': 3}},
+            format='json'
+        ))
+        self.assertQueryCount(17, lambda computer, size: self.client.post(
+            '/api/computers/computers/bulk_delete/',
+            {'ids': list(Computer.objects.values_list('id', flat=True))}, format='json'
+        ))
+
+    def test_computer_changes(self):
+        self.assertQueryCount(3, lambda computer, size: self.client.get(
+            f'/api/computers/computers/{computer.id}/changes/'
+        ))
+
+    def test_log_change(self):
+        self.assertQueryCount(7, lambda computer, size: self.client.post(
+            f'/api/computers/computers/{computer.id}/log_change/',
+            {'change_description': '{"action": "update"}'}, format='json'
+        ))
+
+    def test_csv_import_and_export(self):
+        def import_csv(computer, size):
+            upload = SimpleUploadedFile('computers.csv', make_csv(size, start=size).encode('utf-8'))
+            return self.client.post('/api/computers/computers/import_csv/', {'file': upload}, format='multipart')
+
+        self.assertQueryCount(20, import_csv)
+        self.assertQueryCount(7, lambda computer, size: self.client.get('/api/computers/computers/export_csv/'))
+
+    def test_changes_list(self):
+        for params in ({}, {'expand': 'computer,user'}, {'page_size': 5}, {'action': 'update', 'field': 'office'}):
+            with self.subTest(params=params):
+                self.assertQueryCount(3, lambda computer, size: self.client.get('/api/computers/changes/', params))
+
+    def test_changes_delta_and_retrieve(self):
+        self.assertQueryCount(5, lambda computer, size: self.client.get('/api/computers/changes/', {'since': '0:0'}))
+        self.assertQueryCount(4, lambda computer, size: self.client.get(
+            f"/api/computers/changes/{Changes.objects.values_list('id', flat=True).first()}/"
+        ))
+
+    def test_changes_version(self):
+        self.assertQueryCount(2, lambda computer, size: self.client.get('/api/computers/changes/version/'))
+        self.assertQueryCount(2, lambda computer, size: self.client.head('/api/computers/changes/head_version/'))
+
+    def test_import_runs(self):
+        self.assertQueryCount(2, lambda computer, size: self.client.get('/api/computers/imports/'))
+        self.assertQueryCount(3, lambda computer, size: self.client.get(
+            f"/api/computers/imports/{ImportRun.objects.values_list('id', flat=True).first()}/"
+        ))
+
+    def test_jobs(self):
+        self.assertQueryCount(2, lambda computer, size: self.client.get('/api/computers/jobs/'))
+        self.assertQueryCount(3, lambda computer, size: self.client.get(
+            f"/api/computers/jobs/{Job.objects.values_list('id', flat=True).first()}/"
+        ))
+        self.assertQueryCount(3, lambda computer, size: self.client.get(
+            f"/api/computers/jobs/{Job.objects.get(result_file='jobs/results/0.csv').id}/download/"
+        ))
+        self.assertQueryCount(2, lambda computer, size: self.client.post(
+            '/api/computers/jobs/import_csv/',
+            {'file': SimpleUploadedFile('computers.csv', make_csv(size).encode('utf-8'))}, format='multipart'
+        ))
+        self.assertQueryCount(2, lambda computer, size: self.client.post(
+            '/api/computers/jobs/export_csv/', {'floor': 1}, format='json'
+        ))
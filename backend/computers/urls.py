@@ -2,14 +2,19 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ComputerViewSet, log_computer_change, 
-    ChangesViewSet, import_computers_csv
+    ChangesViewSet, ImportRunViewSet, JobViewSet, import_computers_csv, changes_stream,
+    stream_ticket
 )
 
 router = DefaultRouter()
 router.register(r'computers', ComputerViewSet, basename='computer')
 router.register(r'changes', ChangesViewSet, basename='changes')
+router.register(r'imports', ImportRunViewSet, basename='imports')
+router.register(r'jobs', JobViewSet, basename='jobs')
 
 urlpatterns = [
     path('computers/<int:computer_id>/log_change/', log_computer_change, name='log-computer-change'),
     path('computers/import_csv/', import_computers_csv, name='import-computers-csv'),
+    path('events/', changes_stream, name='changes-stream'),
+    path('events/ticket/', stream_ticket, name='changes-stream-ticket'),
 ] + router.urls
\ No newline at end of file
@@ -1,23 +1,86 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from .models import Computer, Changes
-from .serializers import ComputerSerializer, ChangesSerializer
-from django.db import models
-from django.http import HttpResponse
+from .models import Computer, Changes, ChangesTombstone, DataVersion, ImportRun, Job, StreamTicket
+from .serializers import (
+    ComputerSerializer, ChangesSerializer, ChangesValuesSerializer, CHANGES_EXPANDABLE,
+    ImportRunSerializer, ImportRunDetailsSerializer, JobSerializer,
+    ComputerBulkUpdateSerializer, ComputerBulkDeleteSerializer
+)
+from .bulk import bulk_update_computers, bulk_delete_computers
+from .importers import import_computers, open_csv
+from .exporters import iter_computers_csv, log_export, streaming_content
+from .filters import ComputerFilter, ChangesFilter, parse_cidr_param, parse_int_param
+from .pagination import OptionalCursorPagination
+from .conditional import ConditionalResponseMixin
+from .search import SEARCH_LIMIT, SEARCH_MAX_LIMIT, search_computers
+from .subnets import free_addresses
+from .stats import inventory_stats
+from .events import broker
+from django.db import models, transaction
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from accounts.authentication import ExpiringTokenAuthentication
+from accounts.models import Profile
+from info_pcs.metrics import MetricsMixin
+from django.utils.http import http_date
 from rest_framework.permissions import IsAuthenticated, BasePermission
+from rest_framework.filters import OrderingFilter
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework import status
+import asyncio
 import json
 import csv
+import secrets
+
+
+EVENT_STREAM_HEARTBEAT = 15
+
+# Сколько секунд действует билет на подключение к потоку событий
+STREAM_TICKET_TTL = 30
+
+DELTA_LIMIT = 1000
+
+
+def parse_delta_cursor(value):
+    """Разбирает курсор "<id записи>[:<id отметки об удалении>]"."""
+    try:
+        parts = [int(part) for part in value.split(':')]
+    except ValueError:
+        parts = []
+    if len(parts) == 1:
+        return parts[0], None
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    raise ValidationError({'since': f"Некорректный курсор '{value}'"})
+
+
+def get_user_role(user):
+    try:
+        return user.profile.role
+    except Profile.DoesNotExist:
+        return None
+
+
+def get_request_role(request):
+    """
+    Роль пользователя запроса. Определяется один раз и запоминается в запросе,
+    поэтому составные разрешения (IsAuditor|IsAdministrator|...) и их проверки
+    для объекта не обращаются к профилю повторно.
+    """
+    try:
+        return request._user_role
+    except AttributeError:
+        pass
+    role = get_user_role(request.user) if request.user.is_authenticated else None
+    request._user_role = role
+    return role
 
 
 class IsAuditor(BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated and 
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'auditor'
-        )
+        return get_request_role(request) == 'auditor'
     
     def has_object_permission(self, request, view, obj):
         return request.method in permissions.SAFE_METHODS
@@ -25,11 +88,7 @@ class IsAuditor(BasePermission):
 
 class IsAdministrator(BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated and 
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'admin'
-        )
+        return get_request_role(request) == 'admin'
     
     def has_object_permission(self, request, view, obj):
         return True
@@ -42,65 +101,17 @@ def import_computers_csv(request):
         return Response({'error': 'Файл не предоставлен'}, status=400)
     
     try:
-        file = request.FILES['file']
-        decoded_file = file.read().decode('utf-8').splitlines()
-        reader = csv.DictReader(decoded_file)
-        
-        imported_count = 0
-        errors = []
-        total_rows = 0
-        imported_computers = []
-        
-        for row_num, row in enumerate(reader, 1):
-            total_rows += 1
-            try:
-                if Computer.objects.filter(computer_name=row['computer_name'], ip_address=row['ip_address']).exists():
-                    raise ValueError(f"Компьютер с именем {row['computer_name']} и IP {row['ip_address']} уже существует")
-                
-                computer = Computer.objects.create(
-                    computer_name=row['computer_name'],
-                    ip_address=row['ip_address'],
-                    location_address=row['location_address'],
-                    floor=int(row['floor']),
-                    office=row['office'],
-                    domain=row.get('domain', ''),
-                    pc_owner=row.get('pc_owner', ''),
-                    pc_owner_position_at_work=row.get('pc_owner_position_at_work', ''),
-                    has_kaspersky=row.get('has_kaspersky', 'false').lower() == 'true',
-                    operating_system=row.get('operating_system', ''),
-                    comment=row.get('comment', '')
-                )
-                imported_count += 1
-                imported_computers.append({
-                    'computer_name': computer.computer_name,
-                    'ip_address': computer.ip_address,
-                    'location': f"{computer.location_address}, каб. {computer.office}",
-                    'os': computer.operating_system,
-                    'kaspersky': 'Да' if computer.has_kaspersky else 'Нет',
-                    'pc_owner': computer.pc_owner,
-                    'position': computer.pc_owner_position_at_work
-                })
-            except Exception as e:
-                errors.append(f"Строка {row_num}: {str(e)}")
-        
-        if imported_count > 0:
-            Changes.objects.create(
-                user=request.user,
-                computer_name=f"CSV импорт ({imported_count} шт.)",
-                computer_ip="N/A",
-                change_description={
-                    'action': 'csv_import',
-                    'imported_count': imported_count,
-                    'total_rows': total_rows,
-                    'errors': errors,
-                    'imported_computers': imported_computers
-                }
-            )
+        # Файл читается потоком: в памяти не бывает всего содержимого целиком
+        text, delimiter = open_csv(request.FILES['file'])
+        result = import_computers(csv.DictReader(text, delimiter=delimiter), user=request.user)
+        imported_count = result['imported_count']
+        total_rows = result['total_rows']
 
         response_data = {
             'imported_count': imported_count,
             'total_rows': total_rows,
-            'errors': errors,
+            'errors': result['errors'],
+            'import_run': result['import_run'].id if result['import_run'] else None,
             'message': f"Импортировано {imported_count} из {total_rows} строк"
         }
         
@@ -115,6 +126,82 @@ def import_computers_csv(request):
         }, status=500)
     
 
+@api_view(['POST'])
+@permission_classes([IsAdministrator|permissions.IsAdminUser])
+def stream_ticket(request):
+    """Одноразовый билет для подключения к потоку событий (?ticket=)."""
+    now = timezone.now()
+    StreamTicket.objects.filter(expires_at__lte=now).delete()
+    ticket = StreamTicket.objects.create(
+        key=secrets.token_urlsafe(32),
+        token_id=request.auth.pk,
+        expires_at=now + timezone.timedelta(seconds=STREAM_TICKET_TTL)
+    )
+    return Response({'ticket': ticket.key, 'expires_in': STREAM_TICKET_TTL}, status=status.HTTP_201_CREATED)
+
+
+def get_stream_token(request):
+    """
+    Токен подписчика потока событий: по одноразовому билету из ?ticket=
+    (EventSource не умеет передавать заголовки) или из заголовка Authorization.
+    """
+    ticket = request.GET.get('ticket')
+    if ticket:
+        key = (
+            StreamTicket.objects.filter(key=ticket, expires_at__gt=timezone.now())
+            .values_list('token_id', flat=True).first()
+        )
+        # Из одновременных подключений по одному билету проходит только первое
+        if key is None or not StreamTicket.objects.filter(key=ticket).delete()[0]:
+            return None
+    else:
+        auth = request.headers.get('Authorization', '').split()
+        if len(auth) != 2 or auth[0] != 'Token':
+            return None
+        key = auth[1]
+    try:
+        user, token = ExpiringTokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return None
+    if user.is_staff or get_user_role(user) == 'admin':
+        return token
+    return None
+
+
+async def changes_stream(request):
+    """
+    Поток событий (Server-Sent Events) об изменениях журнала и компьютеров.
+
+    База данных используется только для проверки токена при подключении;
+    события приходят из сигналов через внутрипроцессный broker.
+    Поток закрывается по истечении токена, клиент переподключается с новым билетом.
+    """
+    token = await sync_to_async(get_stream_token)(request)
+    if token is None:
+        return JsonResponse({'error': 'Недостаточно прав'}, status=status.HTTP_403_FORBIDDEN)
+
+    async def stream():
+        subscriber = broker.subscribe()
+        _, queue = subscriber
+        try:
+            yield f"retry: {EVENT_STREAM_HEARTBEAT * 1000}\n\n"
+            while True:
+                remaining = (token.expires_at - timezone.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    yield await asyncio.wait_for(queue.get(), min(EVENT_STREAM_HEARTBEAT, remaining))
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def log_computer_change(request, computer_id):
@@ -135,12 +222,20 @@ def log_computer_change(request, computer_id):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
 
-class ComputerViewSet(viewsets.ModelViewSet):
+class ComputerViewSet(MetricsMixin, ConditionalResponseMixin, viewsets.ModelViewSet):
     queryset = Computer.objects.all()
     serializer_class = ComputerSerializer
+    pagination_class = OptionalCursorPagination
+    filter_backends = [ComputerFilter, OrderingFilter]
+    ordering_fields = [
+        'computer_name', 'ip_address', 'location_address', 'floor',
+        'office', 'operating_system', 'created_at', 'updated_at', 'id'
+    ]
+    ordering = ('computer_name', 'id')
+    version_names = (DataVersion.COMPUTERS,)
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search', 'free_addresses', 'stats']:
             permission_classes = [permissions.IsAuthenticated, IsAuditor|IsAdministrator|permissions.IsAdminUser]
         else:
             permission_classes = [IsAdministrator|permissions.IsAdminUser]
@@ -149,101 +244,229 @@ class ComputerViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def changes(self, request, pk=None):
         computer = self.get_object()
-        changes = computer.changes.all()
+        # username берется из пользователя: без select_related по запросу на запись
+        changes = computer.changes.select_related('user')
         serializer = ChangesSerializer(changes, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Поиск по имени, пользователю, кабинету, адресу и IP: ?q=...&limit=20.
+        Находит подстроки и значения с опечатками, лучшие совпадения первыми.
+        """
+        return self.conditional(self.search_results, request)
+
+    def search_results(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Укажите строку поиска'})
+        limit = parse_int_param(request.query_params, 'limit') or SEARCH_LIMIT
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            raise ValidationError({'limit': f'Ожидается число от 1 до {SEARCH_MAX_LIMIT}'})
+
+        found = search_computers(query, limit)
+        data = self.get_serializer([computer for computer, _ in found], many=True).data
+        for item, (_, score) in zip(data, found):
+            item['score'] = score
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def free_addresses(self, request):
+        """Занятые и свободные адреса подсети: ?cidr=192.168.4.0/22."""
+        return self.conditional(self.free_addresses_report, request)
+
+    def free_addresses_report(self, request):
+        network = parse_cidr_param(request.query_params, 'cidr')
+        if network is None:
+            raise ValidationError({'cidr': 'Укажите подсеть'})
+        return Response(free_addresses(network, self.get_queryset()))
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Количество компьютеров по ОС, этажам, доменам, адресам и покрытие Касперским."""
+        return self.conditional(lambda request: Response(inventory_stats()), request)
+
+    def log_change(self, computer, action, changes):
+        Changes.objects.create(
+            computer=computer,
+            user=self.request.user,
+            change_description={'action': action, 'changes': changes}
+        )
+
+    # Запись в журнал делается здесь же, в одной транзакции с изменением:
+    # клиенту не нужен отдельный запрос к log_change
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            computer = serializer.save()
+            self.log_change(computer, 'create', {
+                field: value for field, value in serializer.data.items() if field in serializer.validated_data
+            })
+
+    def perform_update(self, serializer):
+        # Старые значения берутся из уже загруженного объекта, без повторного запроса
+        before = serializer.to_representation(serializer.instance)
+        with transaction.atomic():
+            computer = serializer.save()
+            after = serializer.data
+            changes = {
+                field: {'from': before[field], 'to': after[field]}
+                for field in serializer.validated_data
+                if before[field] != after[field]
+            }
+            if changes:
+                self.log_change(computer, 'update', changes)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.log_change(instance, 'delete', {'computer_data': self.get_serializer(instance).data})
+            instance.delete()
+
+    def validate_bulk(self, serializer_class, request):
+        serializer = serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        missing = ids - set(Computer.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if missing:
+            raise ValidationError({'ids': f"Компьютеры не найдены: {', '.join(map(str, sorted(missing)))}"})
+        return serializer.validated_data
+
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """
+        Массовое изменение: {"ids": [...], "values": {"office": "305", ...}}.
+        Все изменения выполняются в одной транзакции с одной записью в журнале.
+        """
+        data = self.validate_bulk(ComputerBulkUpdateSerializer, request)
+        updated, change = bulk_update_computers(data['ids'], data['values'], user=request.user)
+        return Response({'updated': updated, 'change': change.id if change else None})
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """Массовое удаление: {"ids": [...]}, одна транзакция и одна запись в журнале."""
+        data = self.validate_bulk(ComputerBulkDeleteSerializer, request)
+        deleted, change = bulk_delete_computers(data['ids'], user=request.user)
+        return Response({'deleted': deleted, 'change': change.id if change else None})
+
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
         queryset = self.filter_queryset(self.get_queryset())
         
-        response = HttpResponse(content_type='text/csv')
+        def on_complete(exported_count):
+            if request.user.is_authenticated:
+                log_export(request.user, exported_count)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, iter_computers_csv(queryset, on_complete=on_complete)),
+            content_type='text/csv'
+        )
         response['Content-Disposition'] = 'attachment; filename="computers_export.csv"'
-        
-        field_names = [
-            'computer_name', 
-            'ip_address', 
-            'location_address', 
-            'floor', 
-            'office', 
-            'domain',
-            'pc_owner',
-            'pc_owner_position_at_work',
-            'has_kaspersky', 
-            'operating_system', 
-            'comment'
-        ]
-        
-        writer = csv.DictWriter(response, fieldnames=field_names)
-        writer.writeheader()
-        
-        for computer in queryset:
-            writer.writerow({
-                'computer_name': computer.computer_name,
-                'ip_address': computer.ip_address,
-                'location_address': computer.location_address,
-                'floor': computer.floor,
-                'office': computer.office,
-                'domain': computer.domain,
-                'pc_owner': computer.pc_owner,
-                'pc_owner_position_at_work': computer.pc_owner_position_at_work,
-                'has_kaspersky': 'Да' if computer.has_kaspersky else 'Нет',
-                'operating_system': computer.operating_system,
-                'comment': computer.comment
-            })
-        
-        if request.user.is_authenticated:
-            Changes.objects.create(
-                user=request.user,
-                computer_name="CSV экспорт",
-                computer_ip="N/A",
-                change_description={
-                    'action': 'csv_export',
-                    'exported_count': queryset.count()
-                }
-            )
-        
         return response
     
 
-class ChangesViewSet(viewsets.ReadOnlyModelViewSet):
+class ChangesViewSet(MetricsMixin, ConditionalResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Changes.objects.select_related('user', 'computer').all()
     serializer_class = ChangesSerializer
     permission_classes = [IsAdministrator|permissions.IsAdminUser, permissions.IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [ChangesFilter, OrderingFilter]
+    ordering_fields = ['change_date', 'computer_name', 'id']
+    ordering = ('-change_date', '-id')
+    # В записи журнала вложены данные компьютера и пользователя (имя, а с expand=user — и ФИО)
+    version_names = (DataVersion.CHANGES, DataVersion.COMPUTERS, DataVersion.USERS)
+
+    def get_expand(self):
+        """Связанные объекты, запрошенные через ?expand=computer,user."""
+        requested = self.request.query_params.get('expand', '')
+        expand = {name.strip() for name in requested.split(',') if name.strip()}
+        unknown = expand - set(CHANGES_EXPANDABLE)
+        if unknown:
+            raise ValidationError({'expand': f"Неизвестные значения: {', '.join(sorted(unknown))}"})
+        return expand
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('expand', self.get_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if 'since' in request.query_params:
+            return self.conditional(self.delta, request, *args, **kwargs)
+        return self.conditional(self.list_values, request, *args, **kwargs)
+
+    def list_values(self, request, *args, **kwargs):
+        """Список журнала через .values(), без создания моделей и ModelSerializer."""
+        serializer = ChangesValuesSerializer(expand=self.get_expand())
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(queryset))
+
+    def delta(self, request, *args, **kwargs):
+        """
+        Инкрементальная выгрузка журнала (changes/?since=<курсор>).
+
+        Курсор — "<id записи>:<id отметки об удалении>" из предыдущего ответа
+        или просто id последней известной клиенту записи. Возвращает записи,
+        добавленные после курсора, и id удаленных записей; при has_more
+        клиент повторяет запрос с новым курсором.
+
+        Курсор по id верен, пока записи становятся видны в порядке id: в SQLite
+        записи выполняются по одной, в PostgreSQL id выдается под блокировкой
+        версии журнала (Changes.save). Записи журнала, созданные в обход save()
+        (bulk_create), этой блокировки не берут.
+        """
+        change_cursor, tombstone_cursor = parse_delta_cursor(request.query_params['since'])
+        version = DataVersion.current(DataVersion.CHANGES)
+
+        serializer = ChangesValuesSerializer(expand=self.get_expand())
+        changes = list(
+            serializer.values(self.filter_queryset(self.get_queryset()))
+            .filter(id__gt=change_cursor)
+            .order_by('id')[:DELTA_LIMIT + 1]
+        )
+        tombstones = ChangesTombstone.objects.order_by('id')
+        if tombstone_cursor is None:
+            # Клиент знает только id записи: отдаем удаления известных ему записей
+            # постранично, начиная с первой отметки
+            tombstones = tombstones.filter(change_id__lte=change_cursor)
+            tombstone_cursor = 0
+        else:
+            tombstones = tombstones.filter(id__gt=tombstone_cursor)
+        tombstones = list(tombstones.values_list('id', 'change_id')[:DELTA_LIMIT + 1])
+
+        has_more = len(changes) > DELTA_LIMIT or len(tombstones) > DELTA_LIMIT
+        changes = changes[:DELTA_LIMIT]
+        tombstones = tombstones[:DELTA_LIMIT]
+        if changes:
+            change_cursor = changes[-1]['id']
+        if tombstones:
+            # Курсор — последняя отданная отметка: следующие придут на следующей странице
+            tombstone_cursor = tombstones[-1][0]
+
+        return Response({
+            'cursor': f"{change_cursor}:{tombstone_cursor}",
+            'version': str(version.sequence),
+            'has_more': has_more,
+            'changes': serializer.many(changes),
+            'deleted': [change_id for _, change_id in tombstones],
+        })
 
     @action(detail=False, methods=['get'])
     def version(self, request):
         """
         Легковесный эндпоинт для проверки версии изменений.
-        Возвращает timestamp последнего изменения и общее количество записей.
+        Возвращает номер версии журнала, общее количество записей
+        и время последнего изменения (один запрос по первичному ключу).
         """
-        from django.db.models import Max
-        
-        last_change = Changes.objects.aggregate(
-            last_modified=Max('change_date')
-        )
-        
-        total_count = Changes.objects.count()
-        
-        if last_change['last_modified']:
-            version = int(last_change['last_modified'].timestamp())
-            last_modified = last_change['last_modified'].isoformat()
-        else:
-            version = 0
-            last_modified = None
-        
-        from django.core.cache import cache
-        etag = cache.get('changes_etag')
-        if not etag:
-            import hashlib
-            etag = hashlib.md5(f"{version}:{total_count}".encode()).hexdigest()
-            cache.set('changes_etag', etag, 60)
+        version = DataVersion.current(DataVersion.CHANGES)
         
         return Response({
-            'version': str(version),
-            'total_count': total_count,
-            'last_modified': last_modified,
-            'etag': etag
+            'version': str(version.sequence),
+            'total_count': version.total_count,
+            'last_modified': version.last_modified.isoformat() if version.last_modified else None,
+            'etag': version.etag
         })
 
     @action(detail=False, methods=['head'])
@@ -251,33 +474,99 @@ class ChangesViewSet(viewsets.ReadOnlyModelViewSet):
         """
         HEAD запрос для проверки версии без тела ответа.
         """
-        from django.db.models import Max
-        
-        last_change = Changes.objects.aggregate(
-            last_modified=Max('change_date')
-        )
-        
-        total_count = Changes.objects.count()
-        
-        if last_change['last_modified']:
-            version = int(last_change['last_modified'].timestamp())
-            last_modified = last_change['last_modified'].strftime('%a, %d %b %Y %H:%M:%S GMT')
-        else:
-            version = 0
-            last_modified = None
-        
-        from django.core.cache import cache
-        etag = cache.get('changes_etag')
-        if not etag:
-            import hashlib
-            etag = hashlib.md5(f"{version}:{total_count}".encode()).hexdigest()
-            cache.set('changes_etag', etag, 60)
+        version = DataVersion.current(DataVersion.CHANGES)
         
         response = Response(status=200)
-        response['ETag'] = f'"{etag}"'
-        if last_modified:
-            response['Last-Modified'] = last_modified
-        response['X-Total-Count'] = total_count
-        response['X-Version'] = version
+        response['ETag'] = f'"{version.etag}"'
+        if version.last_modified:
+            response['Last-Modified'] = http_date(version.last_modified.timestamp())
+        response['X-Total-Count'] = version.total_count
+        response['X-Version'] = version.sequence
         
-        return response
\ No newline at end of file
+        return response
+
+
+class ImportRunViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Запуски импорта CSV. В списке только итоги; подробности (импортированные
+    компьютеры и ошибки) распаковываются при запросе конкретного запуска.
+    """
+    queryset = ImportRun.objects.select_related('user').all()
+    permission_classes = [IsAdministrator|permissions.IsAdminUser, permissions.IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'id']
+    ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.defer('details')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return ImportRunDetailsSerializer
+        return ImportRunSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Фоновые задачи импорта и экспорта CSV.
+
+    import_csv и export_csv только ставят задачу в очередь и сразу отвечают
+    202 с ее id; выполняет задачи команда run_jobs. Клиент опрашивает
+    jobs/<id>/ (rows_processed из total_rows), результат экспорта
+    скачивается через jobs/<id>/download/.
+    """
+    serializer_class = JobSerializer
+    pagination_class = OptionalCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'id']
+    ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def get_permissions(self):
+        if self.action == 'export_csv':
+            permission_classes = [IsAdministrator|permissions.IsAdminUser]
+        else:
+            permission_classes = [IsAuthenticated]
+        return [permission() for permission in permission_classes]
+
+    @action(detail=False, methods=['post'])
+    def import_csv(self, request):
+        file = request.FILES.get('file')
+        if not file:
+            return Response({'error': 'Файл не предоставлен'}, status=400)
+        job = Job(kind=Job.IMPORT, user=request.user)
+        job.input_file.save(file.name, file, save=False)
+        job.save()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['post'])
+    def export_csv(self, request):
+        params = {key: str(value) for key, value in request.data.items() if value not in (None, '')}
+        # Некорректные фильтры отклоняются сразу, а не в обработчике задач
+        ComputerFilter().filter_params(Computer.objects.none(), params)
+        job = Job.objects.create(kind=Job.EXPORT, user=request.user, params=params)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if not job.result_file:
+            return Response({'error': 'Результат еще не готов'}, status=status.HTTP_404_NOT_FOUND)
+        response = FileResponse(
+            job.result_file.open('rb'),
+            as_attachment=True,
+            filename='computers_export.csv',
+            content_type='text/csv'
+        )
+        # Заголовки (размер, имя файла) уже выставлены по файлу
+        response.streaming_content = streaming_content(request, response.streaming_content)
+        return response
@@ -0,0 +1,28 @@
+"""
+Настройки gunicorn для production.
+
+Воркеры uvicorn (ASGI) нужны потоку событий; синхронные представления
+Django выполняются в пуле потоков каждого воркера. Число воркеров задается
+WEB_CONCURRENCY. С SQLite записи все равно выполняются по одной (WAL
+разрешает параллельное чтение), поэтому больше 4 воркеров обычно не нужно;
+с PostgreSQL можно ориентироваться на 2 * CPU + 1.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Запросы импорта/экспорта выполняются фоновыми задачами, долгих запросов нет;
+# поток событий сам отправляет ping каждые EVENT_STREAM_HEARTBEAT секунд
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Периодический перезапуск воркеров от утечек памяти; клиенты потока
+# событий переподключаются автоматически
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Показатели запроса: имя в Server-Timing и в метриках Prometheus
+TIMINGS = ('db', 'serialize', 'render', 'total')
+
+
+class RequestMetrics:
+    """Показатели одного запроса. Время хранится в секундах."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoint = None
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.total = 0.0
+        self._handler_started = None
+        self._handler_db = 0.0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обертка connection.execute_wrapper: считает запросы и время в базе
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def handler_started(self):
+        self._handler_started = time.perf_counter()
+        self._handler_db = self.db
+
+    def handler_finished(self):
+        # Время обработчика без SQL: в основном сериализация ответа
+        if self._handler_started is not None:
+            elapsed = time.perf_counter() - self._handler_started
+            self.serialize = max(elapsed - (self.db - self._handler_db), 0.0)
+            self._handler_started = None
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response):
+        if self._render_started is not None:
+            self.render = time.perf_counter() - self._render_started
+        return response
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.2f}',
+            f'render;dur={self.render * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ])
+
+
+class MetricsRegistry:
+    """
+    Накопленные показатели по эндпоинтам в памяти процесса.
+
+    Для каждого эндпоинта хранятся последние API_METRICS_WINDOW запросов,
+    по ним считаются квантили; счетчики и суммы считаются за все время.
+    У каждого воркера gunicorn свой набор показателей.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, metrics):
+        sample = (metrics.queries, *(getattr(metrics, name) for name in TIMINGS))
+        with self._lock:
+            endpoint = self._endpoints.get(metrics.endpoint)
+            if endpoint is None:
+                endpoint = self._endpoints[metrics.endpoint] = {
+                    'count': 0,
+                    'sums': [0] * len(sample),
+                    'samples': deque(maxlen=self.window),
+                }
+            endpoint['count'] += 1
+            endpoint['sums'] = [total + value for total, value in zip(endpoint['sums'], sample)]
+            endpoint['samples'].append(sample)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': endpoint['count'],
+                    'sums': list(endpoint['sums']),
+                    'samples': list(endpoint['samples']),
+                }
+                for name, endpoint in self._endpoints.items()
+            }
+
+    def render_prometheus(self):
+        """Показатели в текстовом формате Prometheus (summary с квантилями)."""
+        snapshot = self.snapshot()
+        series = [('api_request_queries', 'Количество SQL-запросов на запрос API')] + [
+            (f'api_request_{name}_seconds', f'Время запроса API: {name}') for name in TIMINGS
+        ]
+        lines = []
+        for index, (metric, help_text) in enumerate(series):
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} summary')
+            for name, endpoint in sorted(snapshot.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                values = sorted(sample[index] for sample in endpoint['samples'])
+                for quantile in QUANTILES:
+                    lines.append(
+                        f'{metric}{{endpoint="{label}",quantile="{quantile}"}} {round(percentile(values, quantile), 6)}'
+                    )
+                lines.append(f'{metric}_sum{{endpoint="{label}"}} {round(endpoint["sums"][index], 6)}')
+                lines.append(f'{metric}_count{{endpoint="{label}"}} {endpoint["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def percentile(values, quantile):
+    """Квантиль отсортированного списка (ближайший ранг)."""
+    if not values:
+        return 0
+    index = min(int(quantile * len(values)), len(values) - 1)
+    return values[index]
+
+
+registry = MetricsRegistry(window=getattr(settings, 'API_METRICS_WINDOW', 1000))
+
+
+class MetricsMiddleware:
+    """
+    Замеряет запросы к представлениям DRF: число SQL-запросов, время в базе,
+    сериализации, рендеринга и общее. Результат отдается в заголовке
+    Server-Timing и накапливается в registry.
+
+    Включается настройкой API_METRICS_ENABLED; иначе Django исключает
+    middleware из цепочки и запросы не замедляются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.api_metrics = metrics
+        with connection.execute_wrapper(metrics):
+            response = self.get_response(request)
+
+        if metrics.endpoint is None or response.streaming:
+            return response
+        metrics.total = time.perf_counter() - metrics.started
+        response['Server-Timing'] = metrics.server_timing()
+        registry.record(metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Замеряются только представления DRF; точное имя действия задает MetricsMixin
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is not None:
+            request.api_metrics.endpoint = view_class.__name__
+
+    def process_template_response(self, request, response):
+        metrics = request.api_metrics
+        if metrics.endpoint is not None:
+            metrics.render_started()
+            response.add_post_render_callback(metrics.render_finished)
+        return response
+
+
+class MetricsMixin:
+    """Отмечает для MetricsMiddleware границы обработчика и имя действия представления."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        metrics = getattr(request._request, 'api_metrics', None)
+        if metrics is not None:
+            action = getattr(self, 'action', None) or request.method.lower()
+            metrics.endpoint = f"{type(self).__name__}.{action}"
+            metrics.handler_started()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        metrics = getattr(request._request, 'api_metrics', None)
+        if metrics is not None:
+            metrics.handler_finished()
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -62,7 +62,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
+        'accounts.authentication.ExpiringTokenAuthentication'
     ]
 }
 
@@ -76,6 +76,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'info_pcs.metrics.MetricsMiddleware',
 ]
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -107,12 +108,54 @@ WSGI_APPLICATION = 'info_pcs.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# По умолчанию SQLite в режиме WAL: чтение не блокируется записью,
+# записи ждут друг друга до timeout секунд вместо ошибки "database is locked".
+# BEGIN IMMEDIATE сразу берет блокировку записи, поэтому транзакция не падает
+# при попытке повысить блокировку чтения до записи.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA cache_size=-20000;'
+    'PRAGMA temp_store=MEMORY;'
+    'PRAGMA mmap_size=134217728'
+)
+
+# Постоянные соединения имеют смысл только под WSGI: под ASGI (uvicorn) Django
+# выполняет каждый запрос в своем потоке, и соединения с CONN_MAX_AGE > 0
+# накапливаются. Для PostgreSQL под ASGI используйте пул (DB_POOL=true).
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '0'))
+
+if os.getenv('DB_ENGINE', 'sqlite') == 'postgresql':
+    # Требуется пакет psycopg[binary,pool]
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'info_pcs'),
+            'USER': os.getenv('POSTGRES_USER', 'info_pcs'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': os.getenv('DB_POOL', 'false').lower() == 'true',
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': SQLITE_PRAGMAS,
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -166,6 +209,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TOKEN_EXPIRE_TIME = 3600
 
+# Кэш токенов. С TOKEN_CACHE_URL (redis://...) он общий для всех воркеров:
+# удаление токена при выходе сразу видно каждому из них. Без него у каждого
+# процесса свой кэш в памяти, и удаленный в другом воркере токен действует,
+# пока не истечет запись, поэтому она живет всего несколько секунд.
+# В любом случае запись живет не дольше срока действия токена
+TOKEN_CACHE_URL = os.getenv('TOKEN_CACHE_URL')
+TOKEN_CACHE_TIMEOUT = 60 if TOKEN_CACHE_URL else 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TOKEN_CACHE_URL,
+        'KEY_PREFIX': 'tokens',
+        'TIMEOUT': TOKEN_CACHE_TIMEOUT,
+    } if TOKEN_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': TOKEN_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('IMAP_SERVER')
 EMAIL_PORT = 587
@@ -176,3 +244,29 @@ DEFAULT_FROM_EMAIL = os.getenv('LOGIN_MAIL')
 
 # Email для уведомлений
 NOTIFICATION_EMAIL = os.getenv('LOGIN_MAIL')
+
+# Очередь уведомлений: интервал сбора дайджеста (сек), размер дайджеста и повторные попытки
+NOTIFICATION_DIGEST_WINDOW = 60
+NOTIFICATION_DIGEST_SIZE = 200
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_DELAY = 60
+NOTIFICATION_RETRY_MAX_DELAY = 3600
+
+# Фоновые задачи импорта/экспорта: как часто обработчик проверяет очередь (сек)
+JOB_POLL_INTERVAL = 1
+# Через сколько секунд без отклика обработчика выполняемая задача считается брошенной
+JOB_LEASE_TIMEOUT = 600
+
+# Статистика инвентаря: как часто она сверяется с таблицей компьютеров (сек)
+INVENTORY_STATS_REBUILD_INTERVAL = 3600
+
+# Поток событий: как часто каждый процесс проверяет версии данных, чтобы
+# передать подписчикам изменения, сделанные другими процессами (сек)
+EVENTS_VERSION_POLL_INTERVAL = 2
+
+
+# Замеры запросов API (Server-Timing и /api/metrics/): включаются явно,
+# по умолчанию middleware не участвует в обработке запросов.
+# Квантили считаются по последним API_METRICS_WINDOW запросам эндпоинта
+API_METRICS_ENABLED = os.getenv('API_METRICS_ENABLED', 'false').lower() == 'true'
+API_METRICS_WINDOW = 1000
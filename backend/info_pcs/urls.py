@@ -18,12 +18,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.urls import re_path
 from django.views.generic import TemplateView
-from .views import serve_icon
+from .views import serve_icon, api_metrics
 
 urlpatterns = [
     path('logo512.ico', serve_icon, {'icon_name': 'logo512.ico'}),
     path('admin/', admin.site.urls),
     path('api/accounts/', include("accounts.urls")),
     path('api/computers/', include("computers.urls")),
+    path('api/metrics/', api_metrics, name='api-metrics'),
     re_path(r'^.*$', TemplateView.as_view(template_name='index.html')),
 ]
@@ -1,9 +1,20 @@
 from django.http import FileResponse, HttpResponse
 from django.conf import settings
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from computers.views import IsAdministrator
+from .metrics import registry
 import os
 
 def serve_icon(request, icon_name):
     icon_path = os.path.join(settings.STATIC_ROOT, icon_name)
     if os.path.exists(icon_path):
         return FileResponse(open(icon_path, 'rb'), content_type='image/x-icon')
-    return HttpResponse(status=404)
\ No newline at end of file
+    return HttpResponse(status=404)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdministrator|permissions.IsAdminUser])
+def api_metrics(request):
+    """Накопленные замеры запросов API в текстовом формате Prometheus."""
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
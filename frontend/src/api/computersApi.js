@@ -1,7 +1,7 @@
 import axios from 'axios';
 import { getAuthToken } from './auth';
 
-const API_URL = 'http://192.168.1.66:8001/api/computers/';
+export const API_URL = 'http://192.168.1.66:8001/api/computers/';
 
 const api = axios.create({
   baseURL: API_URL,
@@ -28,61 +28,49 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
-const logChange = async (computerId, action, changes = null) => {
-  try {
-    const changeDescription = {
-      action,
-      ...(changes && { changes })
-    };
-    
-    await api.post(`computers/${computerId}/log_change/`, {
-      change_description: JSON.stringify(changeDescription)
-    });
-  } catch (error) {
-    console.error('Ошибка при записи изменения:', error);
-  }
-};
-
-export const importComputersFromCSV = async (file) => {
+export const importComputersFromCSV = async (file, onProgress) => {
   const formData = new FormData();
   
-  // Читаем файл и убираем BOM если есть
-  const fileContent = await new Promise((resolve, reject) => {
-    const reader = new FileReader();
-    reader.onload = (e) => {
-      let content = e.target.result;
-      // Удаляем BOM если он есть
-      if (content.charCodeAt(0) === 0xFEFF) {
-        content = content.substring(1);
-      }
-      resolve(content);
-    };
-    reader.onerror = reject;
-    reader.readAsText(file);
-  });
-  
-  // Создаем новый Blob без BOM
-  const cleanBlob = new Blob([fileContent], { type: 'text/csv' });
-  const cleanFile = new File([cleanBlob], file.name, { type: 'text/csv' });
-  
-  formData.append('file', cleanFile);
+  // Файл отправляется как есть: кодировку (UTF-8 с BOM или без, cp1251 из Excel)
+  // и разделитель определяет сервер, а чтение как текста UTF-8 испортило бы cp1251
+  formData.append('file', file);
 
   try {
-    const response = await api.post('computers/import_csv/', formData, {
+    // Импорт выполняется фоновой задачей: сервер сразу отвечает id задачи
+    const response = await api.post('jobs/import_csv/', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    const job = await waitForJob(response.data.id, onProgress);
+    return job.result;
   } catch (error) {
     throw error;
   }
 };
 
-export const exportComputersToCSV = async (filters) => {
+const JOB_POLL_INTERVAL = 1000;
+
+// Опрашивает фоновую задачу до завершения; onProgress получает задачу с rows_processed/total_rows
+export const waitForJob = async (jobId, onProgress) => {
+  for (;;) {
+    const { data: job } = await api.get(`jobs/${jobId}/`);
+    if (onProgress) onProgress(job);
+    if (job.status === 'done') return job;
+    if (job.status === 'failed') {
+      const error = new Error(job.error || 'Ошибка фоновой задачи');
+      error.response = { data: { message: job.error } };
+      throw error;
+    }
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+  }
+};
+
+export const exportComputersToCSV = async (filters, onProgress) => {
   try {
-    const response = await api.get('/computers/export_csv/', {
-      params: filters,
+    const { data } = await api.post('jobs/export_csv/', filters);
+    const job = await waitForJob(data.id, onProgress);
+    const response = await api.get(`jobs/${job.id}/download/`, {
       responseType: 'blob'
     });
     
@@ -102,6 +90,30 @@ export const getComputers = async () => {
   }
 };
 
+// Курсор страницы из ссылки next/previous ответа сервера
+const cursorFromUrl = (url) => (url ? new URL(url).searchParams.get('cursor') : null);
+
+// Страница списка: фильтры, порядок и курсорная пагинация выполняются на сервере
+export const getComputersPage = async ({ filters = {}, cursor = null, pageSize, ordering } = {}) => {
+  const params = Object.fromEntries(
+    Object.entries(filters).filter(([, value]) => value !== '' && value !== undefined && value !== null)
+  );
+  params.page_size = pageSize;
+  if (cursor) params.cursor = cursor;
+  if (ordering) params.ordering = ordering;
+  try {
+    const response = await api.get('computers/', { params });
+    return {
+      results: response.data.results,
+      nextCursor: cursorFromUrl(response.data.next),
+      previousCursor: cursorFromUrl(response.data.previous)
+    };
+  } catch (error) {
+    console.error('Ошибка при получении страницы списка компьютеров:', error);
+    throw error;
+  }
+};
+
 export const getComputer = async (id) => {
   try {
     const response = await api.get(`computers/${id}/`);
@@ -112,10 +124,43 @@ export const getComputer = async (id) => {
   }
 };
 
+// Поиск по имени, пользователю, кабинету, адресу и IP с учетом опечаток
+export const searchComputers = async (query, limit = 20) => {
+  try {
+    const response = await api.get('computers/search/', { params: { q: query, limit } });
+    return response.data;
+  } catch (error) {
+    console.error('Ошибка при поиске компьютеров:', error);
+    throw error;
+  }
+};
+
+// Занятые и свободные адреса подсети, например '192.168.4.0/22'
+export const getFreeAddresses = async (cidr) => {
+  try {
+    const response = await api.get('computers/free_addresses/', { params: { cidr } });
+    return response.data;
+  } catch (error) {
+    console.error(`Ошибка при получении свободных адресов подсети ${cidr}:`, error);
+    throw error;
+  }
+};
+
+// Количество компьютеров по ОС, этажам, доменам, адресам и покрытие Касперским
+export const getComputerStats = async () => {
+  try {
+    const response = await api.get('computers/stats/');
+    return response.data;
+  } catch (error) {
+    console.error('Ошибка при получении статистики компьютеров:', error);
+    throw error;
+  }
+};
+
+// Записи журнала (create/update/delete) сервер формирует сам в той же транзакции
 export const createComputer = async (computerData) => {
   try {
     const response = await api.post('computers/', computerData);
-    await logChange(response.data.id, 'create', computerData);
     return response.data;
   } catch (error) {
     console.error('Ошибка при создании компьютера:', error);
@@ -125,23 +170,7 @@ export const createComputer = async (computerData) => {
 
 export const updateComputer = async (id, computerData) => {
   try {
-    const currentComputer = await getComputer(id);
     const response = await api.put(`computers/${id}/`, computerData);
-
-    const changes = {};
-    Object.keys(computerData).forEach(key => {
-      if (JSON.stringify(currentComputer[key]) !== JSON.stringify(computerData[key])) {
-        changes[key] = {
-          from: currentComputer[key],
-          to: computerData[key]
-        };
-      }
-    });
-    
-    if (Object.keys(changes).length > 0) {
-      await logChange(id, 'update', changes);
-    }
-    
     return response.data;
   } catch (error) {
     console.error(`Ошибка при обновлении компьютера с ID ${id}:`, error);
@@ -151,23 +180,7 @@ export const updateComputer = async (id, computerData) => {
 
 export const patchComputer = async (id, computerData) => {
   try {
-    const currentComputer = await getComputer(id);
     const response = await api.patch(`computers/${id}/`, computerData);
-    
-    const changes = {};
-    Object.keys(computerData).forEach(key => {
-      if (JSON.stringify(currentComputer[key]) !== JSON.stringify(computerData[key])) {
-        changes[key] = {
-          from: currentComputer[key],
-          to: computerData[key]
-        };
-      }
-    });
-    
-    if (Object.keys(changes).length > 0) {
-      await logChange(id, 'update', changes);
-    }
-    
     return response.data;
   } catch (error) {
     console.error(`Ошибка при частичном обновлении компьютера с ID ${id}:`, error);
@@ -177,12 +190,6 @@ export const patchComputer = async (id, computerData) => {
 
 export const deleteComputer = async (id) => {
   try {
-    const computer = await getComputer(id);
-    
-    await logChange(id, 'delete', {
-      computer_data: computer
-    });
-
     await api.delete(`computers/${id}/`);
   } catch (error) {
     console.error(`Ошибка при удалении компьютера с ID ${id}:`, error);
@@ -190,6 +197,17 @@ export const deleteComputer = async (id) => {
   }
 };
 
+// Массовое удаление: одна транзакция и одна запись в журнале на сервере
+export const bulkDeleteComputers = async (ids) => {
+  try {
+    const response = await api.post('computers/bulk_delete/', { ids });
+    return response.data;
+  } catch (error) {
+    console.error('Ошибка при массовом удалении компьютеров:', error);
+    throw error;
+  }
+};
+
 export const getComputerChanges = async (computerId) => {
   try {
     const response = await api.get(`computers/${computerId}/changes/`);
@@ -202,7 +220,8 @@ export const getComputerChanges = async (computerId) => {
 
 export const getComputersChanges = async () => {
   try {
-    const response = await api.get(`changes/`);
+    // Журнал отдается компактно; данные пользователя нужны таблице целиком
+    const response = await api.get(`changes/`, { params: { expand: 'user' } });
     return response.data;
   } catch (error) {
     console.error(`Ошибка при получении истории изменений для компьютеров:`, error);
@@ -210,6 +229,35 @@ export const getComputersChanges = async () => {
   }
 };
 
+// Инкрементальное обновление журнала: новые записи и id удаленных после курсора
+export const getChangesDelta = async (since) => {
+  try {
+    const response = await api.get('changes/', { params: { since, expand: 'user' } });
+    return response.data;
+  } catch (error) {
+    console.error('Ошибка при получении новых изменений:', error);
+    throw error;
+  }
+};
+
+// Подробности импорта CSV (список компьютеров и ошибки) загружаются по запросу
+export const getImportRun = async (id) => {
+  try {
+    const response = await api.get(`imports/${id}/`);
+    return response.data;
+  } catch (error) {
+    console.error(`Ошибка при получении деталей импорта ${id}:`, error);
+    throw error;
+  }
+};
+
+// Одноразовый билет для подключения к потоку событий: EventSource не передает
+// заголовки, а токен в адресе попал бы в журналы прокси
+export const getStreamTicket = async () => {
+  const response = await api.post('events/ticket/');
+  return response.data.ticket;
+};
+
 export const getChangesVersion = async () => {
   try {
     const response = await api.get('changes/version/');
@@ -249,10 +297,15 @@ export const getChangesVersion = async () => {
 
 export default {
   getComputers,
+  getComputersPage,
   getComputer,
+  searchComputers,
+  getFreeAddresses,
+  getComputerStats,
   createComputer,
   updateComputer,
   patchComputer,
   deleteComputer,
+  bulkDeleteComputers,
   getComputerChanges,
 };
@@ -1,6 +1,17 @@
-import { useRef, useEffect } from 'react';
+import { useRef, useEffect, useState } from 'react';
 import { useQuery, useQueryClient } from '@tanstack/react-query';
-import { getComputersChanges, getChangesVersion } from '../api/computersApi';
+import { getComputersChanges, getChangesVersion, getChangesDelta, getStreamTicket, API_URL } from '../api/computersApi';
+import { getAuthToken } from '../api/auth';
+
+const STREAM_EVENTS = [
+  'change_created', 'change_updated', 'change_deleted', 'computer_updated', 'computer_deleted',
+  // Изменения из других процессов сервера (воркеры gunicorn, фоновые задачи)
+  'version_changed',
+];
+
+// Пауза перед переподключением к потоку событий (мс): билет одноразовый,
+// поэтому после обрыва поток открывается заново с новым билетом
+const STREAM_RECONNECT_DELAY = 5000;
 
 // Ключи для кэширования
 export const changesKeys = {
@@ -11,16 +22,29 @@ export const changesKeys = {
 };
 
 
+const mergeChangesDelta = (changes = [], delta) => {
+  const deleted = new Set(delta.deleted);
+  const added = [...delta.changes].reverse();
+  const addedIds = new Set(added.map(change => change.id));
+  return [
+    ...added,
+    ...changes.filter(change => !deleted.has(change.id) && !addedIds.has(change.id))
+  ];
+};
+
 export const useChangesQuery = (filters = {}) => {
   const queryClient = useQueryClient();
   const lastVersionRef = useRef(null);
+  const cursorRef = useRef(null);
   
-  const { data: versionData, isFetching: isVersionFetching } = useChangesVersionQuery();
+  const isStreamConnected = useChangesStream();
+  const { data: versionData, isFetching: isVersionFetching } = useChangesVersionQuery(!isStreamConnected);
   
   const query = useQuery({
     queryKey: changesKeys.list(filters),
     queryFn: async () => {
       const data = await getComputersChanges();
+      cursorRef.current = data.reduce((maxId, change) => Math.max(maxId, change.id), 0);
       return data;
     },
     staleTime: Infinity,
@@ -34,6 +58,21 @@ export const useChangesQuery = (filters = {}) => {
     enabled: true,
   });
 
+  // Догружаем только новые и удаленные записи вместо полного списка
+  const applyDelta = async () => {
+    if (cursorRef.current === null) {
+      await query.refetch();
+      return;
+    }
+    let delta;
+    do {
+      delta = await getChangesDelta(cursorRef.current);
+      const currentDelta = delta;
+      queryClient.setQueryData(changesKeys.list(filters), (old) => mergeChangesDelta(old, currentDelta));
+      cursorRef.current = delta.cursor;
+    } while (delta.has_more);
+  };
+
   useEffect(() => {
     if (!versionData || isVersionFetching) return;
     
@@ -48,7 +87,7 @@ export const useChangesQuery = (filters = {}) => {
         lastVersionRef.current !== currentVersion &&
         !query.isFetching) {
       lastVersionRef.current = currentVersion;
-      query.refetch();
+      applyDelta().catch(() => query.refetch());
     }
   }, [versionData, isVersionFetching, query.data, query.isFetching, query]);
 
@@ -89,11 +128,66 @@ export const useCheckVersion = () => {
   return checkVersion;
 };
 
-export const useChangesVersionQuery = () => {
+// Поток событий сервера: при изменениях журнала перепроверяем версию,
+// пока поток подключен, периодический опрос версии не нужен
+export const useChangesStream = () => {
+  const queryClient = useQueryClient();
+  const [isConnected, setIsConnected] = useState(false);
+
+  useEffect(() => {
+    if (!getAuthToken() || typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let reconnectTimer = null;
+    let closed = false;
+
+    // Событие лишь обновляет версию, список догружается через delta-запрос
+    const invalidate = () => {
+      queryClient.invalidateQueries({ queryKey: changesKeys.version() });
+    };
+
+    const reconnect = () => {
+      setIsConnected(false);
+      if (!closed) reconnectTimer = setTimeout(connect, STREAM_RECONNECT_DELAY);
+    };
+
+    const connect = async () => {
+      let ticket;
+      try {
+        ticket = await getStreamTicket();
+      } catch (error) {
+        reconnect();
+        return;
+      }
+      if (closed) return;
+
+      source = new EventSource(`${API_URL}events/?ticket=${encodeURIComponent(ticket)}`);
+      source.onopen = () => setIsConnected(true);
+      source.onerror = () => {
+        source.close();
+        reconnect();
+      };
+      STREAM_EVENTS.forEach(eventType => source.addEventListener(eventType, invalidate));
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+      setIsConnected(false);
+    };
+  }, [queryClient]);
+
+  return isConnected;
+};
+
+export const useChangesVersionQuery = (polling = true) => {
   return useQuery({
     queryKey: changesKeys.version(),
     queryFn: getChangesVersion,
-    refetchInterval: 15000,
+    refetchInterval: polling ? 15000 : false,
     staleTime: 10000,
     gcTime: 30000,
     refetchOnWindowFocus: true,
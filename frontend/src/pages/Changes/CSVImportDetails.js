@@ -1,6 +1,8 @@
 import React from 'react';
+import { useQuery } from '@tanstack/react-query';
 import {
   Box,
+  CircularProgress,
   List,
   ListItem,
   ListItemText,
@@ -17,8 +19,35 @@ import {
   Person,
   Work
 } from '@mui/icons-material';
+import { getImportRun } from '../../api/computersApi';
 
-const CSVImportDetails = ({ importData }) => {
+const CSVImportDetails = ({ importData: summary }) => {
+  // В журнале только сводка импорта, полный список загружается отдельно
+  const importRunId = summary?.import_run;
+  const { data: details, isLoading, error } = useQuery({
+    queryKey: ['imports', importRunId],
+    queryFn: () => getImportRun(importRunId),
+    enabled: !!importRunId,
+    staleTime: Infinity,
+  });
+
+  if (importRunId && isLoading) {
+    return (
+      <Box display="flex" justifyContent="center" sx={{ mt: 2 }}>
+        <CircularProgress size={24} />
+      </Box>
+    );
+  }
+
+  if (error) {
+    return (
+      <Typography color="error" sx={{ mt: 2 }}>
+        Не удалось загрузить детали импорта
+      </Typography>
+    );
+  }
+
+  const importData = importRunId ? details : summary;
   if (!importData?.imported_computers) return null;
 
   return (
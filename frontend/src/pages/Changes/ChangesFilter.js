@@ -50,6 +50,8 @@ export default function ChangesFilter({
             <MenuItem value="create">Создание</MenuItem>
             <MenuItem value="update">Обновление</MenuItem>
             <MenuItem value="delete">Удаление</MenuItem>
+            <MenuItem value="bulk_update">Массовое изменение</MenuItem>
+            <MenuItem value="bulk_delete">Массовое удаление</MenuItem>
             <MenuItem value="csv_import">Импорт CSV</MenuItem>
             <MenuItem value="csv_export">Экспорт CSV</MenuItem>
           </Select>
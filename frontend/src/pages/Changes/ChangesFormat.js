@@ -18,6 +18,8 @@ import {
   renderCreate,
   renderUpdate,
   renderDelete,
+  renderBulkUpdate,
+  renderBulkDelete,
   parseDescription, 
   renderValue,
  } from '../../utils/renderChangesUtils';
@@ -59,6 +61,10 @@ const ChangeDescription = ({ description }) => {
           return renderUpdate(parsed, renderValue, theme);
         case 'delete':
           return renderDelete();
+        case 'bulk_update':
+          return renderBulkUpdate(parsed, renderValue);
+        case 'bulk_delete':
+          return renderBulkDelete(parsed);
         case 'csv_import':
           return renderCSVImport(parsed, () => setOpenDetails(true));
         default:
@@ -98,7 +104,7 @@ const ChangeDescription = ({ description }) => {
           Детали импорта из CSV
           <Chip 
             label={`${parsed.imported_count || 0}/${parsed.total_rows || 0} успешно`} 
-            color={parsed.errors?.length ? 'warning' : 'success'}
+            color={(parsed.error_count ?? parsed.errors?.length) ? 'warning' : 'success'}
             size="small"
             sx={{ ml: 2 }}
           />
@@ -32,7 +32,7 @@ export const ChangesAlerts = ({
           {importInfo.importedComputers.slice(0, 5).map((c, i) => (
             <li key={i}>{c.computer_name} ({c.ip_address})</li>
           ))}
-          {importInfo.importedComputers.length > 5 && <li>...и ещё {importInfo.importedComputers.length - 5}</li>}
+          {importInfo.importedCount > 5 && <li>...и ещё {importInfo.importedCount - 5}</li>}
         </Box>
       </Alert>
     </Collapse>
@@ -7,7 +7,7 @@ export const useChangesPage = () => {
     computer_name: '', username: '', action: '',
     date_from: '', date_to: ''
   });
-  const [importInfo, setImportInfo] = useState({ open: false, importedComputers: [] });
+  const [importInfo, setImportInfo] = useState({ open: false, importedComputers: [], importedCount: 0 });
   const [showRefreshSuccess, setShowRefreshSuccess] = useState(false);
   const [autoUpdateEnabled, setAutoUpdateEnabled] = useState(true);
 
@@ -20,8 +20,8 @@ export const useChangesPage = () => {
 
   const filteredChanges = useMemo(() => {
     return changes.filter(change => {
-      const parsed = parseDescription(change.change_description);
-      const changeAction = parsed.action;
+      // Действие приходит отдельным полем; разбор описания — для старых записей
+      const changeAction = change.action || parseDescription(change.change_description).action;
       const matchesComputerName = !filters.computer_name ||
         change.computer_name?.toString().toLowerCase().includes(filters.computer_name.toLowerCase());
       const matchesUsername = !filters.username ||
@@ -38,14 +38,16 @@ export const useChangesPage = () => {
 
   useEffect(() => {
     const csvImports = changes.filter(change => {
-      const parsed = parseDescription(change.change_description);
-      return parsed?.action === 'csv_import';
+      const action = change.action || parseDescription(change.change_description)?.action;
+      return action === 'csv_import';
     });
     if (csvImports.length > 0) {
       const lastImport = csvImports[0];
       setImportInfo({
         open: true,
-        importedComputers: lastImport.change_description?.imported_computers || []
+        importedComputers: lastImport.change_description?.imported_preview
+          || lastImport.change_description?.imported_computers || [],
+        importedCount: lastImport.change_description?.imported_count || 0
       });
     }
   }, [changes]);
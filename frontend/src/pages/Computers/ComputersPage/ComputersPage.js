@@ -13,8 +13,6 @@ import { AuthContext } from '../../../context/AuthContext'
 
 export default function ComputersPage() {
   const { profile, isLoading: authLoading } = useContext(AuthContext);
-  const [page, setPage] = useState(0);
-  const [rowsPerPage, setRowsPerPage] = useState(8);
   const [openForm, setOpenForm] = useState(false);
   const [editingComputer, setEditingComputer] = useState(null);
   const [importModalOpen, setImportModalOpen] = useState(false);
@@ -22,7 +20,7 @@ export default function ComputersPage() {
   const { snackbar, showSnackbar, handleCloseSnackbar } = useSnackbar();
   const {
     computers,
-    isLoading: dataLoading,
+    nextCursor,
     importStatus,
     fetchComputers,
     addComputer,
@@ -35,12 +33,21 @@ export default function ComputersPage() {
 
   const {
     filters,
-    filteredComputers,
+    queryFilters,
     filtersOpen,
     handleFilterChange,
     handleClearFilters,
     toggleFilters
-  } = useFilters(computers, dataLoading || authLoading);
+  } = useFilters();
+
+  // Открытая страница: курсор каждой пройденной страницы хранится, чтобы вернуться назад
+  const [query, setQuery] = useState(() => ({
+    filters: queryFilters,
+    pageSize: 8,
+    page: 0,
+    cursors: [null]
+  }));
+  const { page, pageSize: rowsPerPage } = query;
 
   const {
     selectedComputers,
@@ -50,19 +57,34 @@ export default function ComputersPage() {
     clearSelection
   } = useSelection();
 
+  // Новые фильтры — снова с первой страницы
+  useEffect(() => {
+    setQuery(prev => (prev.filters === queryFilters
+      ? prev
+      : { ...prev, filters: queryFilters, page: 0, cursors: [null] }));
+  }, [queryFilters]);
+
   useEffect(() => {
     if (!authLoading) {
-      fetchComputers();
+      fetchComputers({
+        filters: query.filters,
+        cursor: query.cursors[query.page],
+        pageSize: query.pageSize
+      });
     }
-  }, [authLoading, fetchComputers]);
+  }, [authLoading, fetchComputers, query]);
 
   const handleChangePage = (event, newPage) => {
-    setPage(newPage);
+    setQuery(prev => ({
+      ...prev,
+      page: newPage,
+      cursors: newPage > prev.page ? [...prev.cursors.slice(0, newPage), nextCursor] : prev.cursors
+    }));
   };
 
   const handleChangeRowsPerPage = (event) => {
-    setRowsPerPage(parseInt(event.target.value, 10));
-    setPage(0);
+    const pageSize = parseInt(event.target.value, 10);
+    setQuery(prev => ({ ...prev, pageSize, page: 0, cursors: [null] }));
   };
 
   const handleEdit = (computer) => {
@@ -180,7 +202,7 @@ export default function ComputersPage() {
 
       <ComputersTable
         computers={computers}
-        filteredComputers={filteredComputers}
+        hasNext={Boolean(nextCursor)}
         selectedComputers={selectedComputers}
         isAuditor={isAuditor}
         page={page}
@@ -14,9 +14,11 @@ import {
 } from '@mui/material';
 import { Edit, Delete } from '@mui/icons-material';
 
+// computers — уже отфильтрованная сервером страница; общее число не запрашивается,
+// пока есть следующая страница (hasNext)
 export const ComputersTable = ({
   computers,
-  filteredComputers,
+  hasNext,
   selectedComputers,
   isAuditor,
   page,
@@ -29,10 +31,7 @@ export const ComputersTable = ({
   onDelete,
   isSelected
 }) => {
-  const paginatedComputers = filteredComputers.slice(
-    page * rowsPerPage,
-    page * rowsPerPage + rowsPerPage
-  );
+  const paginatedComputers = computers;
 
   return (
     <TableContainer component={Paper} sx={{ position: 'relative' }}>
@@ -108,13 +107,13 @@ export const ComputersTable = ({
       <TablePagination
         rowsPerPageOptions={[8, 16, 24]}
         component="div"
-        count={filteredComputers.length}
+        count={hasNext ? -1 : page * rowsPerPage + computers.length}
         rowsPerPage={rowsPerPage}
         page={page}
         onPageChange={onPageChange}
         onRowsPerPageChange={onRowsPerPageChange}
         labelRowsPerPage="Компьютеров на странице:"
-        labelDisplayedRows={({ from, to, count }) => `${from}-${to} из ${count}`}
+        labelDisplayedRows={({ from, to, count }) => `${from}-${to} из ${count === -1 ? `более чем ${to}` : count}`}
       />
     </TableContainer>
   );
@@ -1,16 +1,21 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import { 
-  getComputers, 
+  getComputersPage, 
   createComputer, 
   updateComputer, 
   deleteComputer,
+  bulkDeleteComputers as deleteComputersInBulk,
   importComputersFromCSV,
   exportComputersToCSV 
 } from '../../../../api/computersApi'
 
 export const useComputersData = (showSnackbar) => {
+  // Текущая страница списка и курсор следующей
   const [computers, setComputers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
+  const lastQuery = useRef(null);
+  const requestId = useRef(0);
   const [importStatus, setImportStatus] = useState({
     isImporting: false,
     importedCount: 0,
@@ -19,30 +24,43 @@ export const useComputersData = (showSnackbar) => {
     successMessage: ''
   });
 
-  const fetchComputers = useCallback(async () => {
+  // query: { filters, cursor, pageSize }; ответы на устаревшие запросы отбрасываются
+  const fetchComputers = useCallback(async (query) => {
+    lastQuery.current = query;
+    const id = ++requestId.current;
     setIsLoading(true);
     try {
-      const data = await getComputers();
-      setComputers(data);
+      const page = await getComputersPage(query);
+      if (id !== requestId.current) return;
+      setComputers(page.results);
+      setNextCursor(page.nextCursor);
     } catch (error) {
+      if (id !== requestId.current) return;
       showSnackbar('Ошибка при загрузке компьютеров', 'error');
       console.error('Ошибка при загрузке компьютеров:', error);
     } finally {
-      setIsLoading(false);
+      if (id === requestId.current) setIsLoading(false);
     }
   }, [showSnackbar]);
 
+  // Повторная загрузка открытой страницы после изменений
+  const refreshComputers = useCallback(() => {
+    if (lastQuery.current) {
+      return fetchComputers(lastQuery.current);
+    }
+  }, [fetchComputers]);
+
   const addComputer = useCallback(async (values) => {
     try {
       const newComputer = await createComputer(values);
-      setComputers(prev => [...prev, newComputer]);
+      await refreshComputers();
       showSnackbar('Компьютер успешно добавлен');
       return newComputer;
     } catch (error) {
       showSnackbar(error.response?.data?.message || 'Произошла ошибка при сохранении', 'error');
       throw error;
     }
-  }, [showSnackbar]);
+  }, [showSnackbar, refreshComputers]);
 
   const editComputer = useCallback(async (id, values) => {
     try {
@@ -59,24 +77,25 @@ export const useComputersData = (showSnackbar) => {
   const removeComputer = useCallback(async (id) => {
     try {
       await deleteComputer(id);
-      setComputers(prev => prev.filter(c => c.id !== id));
+      await refreshComputers();
       showSnackbar('Компьютер успешно удален');
     } catch (error) {
       showSnackbar('Ошибка при удалении компьютера', 'error');
       throw error;
     }
-  }, [showSnackbar]);
+  }, [showSnackbar, refreshComputers]);
 
   const bulkDeleteComputers = useCallback(async (ids) => {
     try {
-      await Promise.all(ids.map(id => deleteComputer(id)));
-      setComputers(prev => prev.filter(c => !ids.includes(c.id)));
-      showSnackbar(`Удалено ${ids.length} компьютеров`);
+      // Один запрос: одна транзакция и одна запись в журнале вместо записи на каждый компьютер
+      const { deleted } = await deleteComputersInBulk(ids);
+      await refreshComputers();
+      showSnackbar(`Удалено ${deleted} компьютеров`);
     } catch (error) {
       showSnackbar('Ошибка при удалении компьютеров', 'error');
       throw error;
     }
-  }, [showSnackbar]);
+  }, [showSnackbar, refreshComputers]);
 
   const handleCSVImport = useCallback(async (file) => {
     setImportStatus({
@@ -88,7 +107,13 @@ export const useComputersData = (showSnackbar) => {
     });
 
     try {
-      const result = await importComputersFromCSV(file);
+      const result = await importComputersFromCSV(file, (job) => {
+        setImportStatus(status => ({
+          ...status,
+          importedCount: job.rows_processed,
+          totalRows: job.total_rows || 0
+        }));
+      });
       setImportStatus({
         isImporting: false,
         importedCount: result.imported_count,
@@ -96,7 +121,7 @@ export const useComputersData = (showSnackbar) => {
         errors: result.errors || [],
         successMessage: result.message
       });
-      await fetchComputers();
+      await refreshComputers();
       return result;
     } catch (error) {
       setImportStatus({
@@ -108,7 +133,7 @@ export const useComputersData = (showSnackbar) => {
       });
       throw error;
     }
-  }, [fetchComputers]);
+  }, [refreshComputers]);
 
   const handleExportCSV = useCallback(async (filters) => {
     try {
@@ -123,9 +148,11 @@ export const useComputersData = (showSnackbar) => {
   return {
     computers,
     setComputers,
+    nextCursor,
     isLoading,
     importStatus,
     fetchComputers,
+    refreshComputers,
     addComputer,
     editComputer,
     removeComputer,
@@ -1,33 +1,18 @@
-import { useState, useMemo } from 'react';
+import { useState, useEffect } from 'react';
 
-export const useFilters = (computers, isLoading) => {
+// Пауза после ввода, после которой фильтры уходят на сервер
+const FILTER_DEBOUNCE = 400;
+
+export const useFilters = () => {
   const [filters, setFilters] = useState({});
+  // Фильтры для запроса к серверу: обновляются не на каждое нажатие клавиши
+  const [queryFilters, setQueryFilters] = useState(filters);
   const [filtersOpen, setFiltersOpen] = useState(false);
 
-   const filteredComputers = useMemo(() => {
-    if (isLoading || computers.length === 0) {
-      return [];
-    }
-    
-    let result = [...computers];
-    
-    Object.keys(filters).forEach(key => {
-      if (filters[key]) {
-        result = result.filter(computer => {
-          const value = computer[key];
-          const filterValue = filters[key].toString().toLowerCase();
-          
-          if (key === 'has_kaspersky') {
-            return value.toString() === filterValue;
-          }
-          
-          return value.toString().toLowerCase().includes(filterValue);
-        });
-      }
-    });
-    
-    return result;
-  }, [computers, filters, isLoading]);
+  useEffect(() => {
+    const timer = setTimeout(() => setQueryFilters(filters), FILTER_DEBOUNCE);
+    return () => clearTimeout(timer);
+  }, [filters]);
 
   const handleFilterChange = (field, value) => {
     setFilters(prev => ({
@@ -46,10 +31,10 @@ export const useFilters = (computers, isLoading) => {
 
   return {
     filters,
-    filteredComputers,
+    queryFilters,
     filtersOpen,
     handleFilterChange,
     handleClearFilters,
     toggleFilters
   };
-};
\ No newline at end of file
+};
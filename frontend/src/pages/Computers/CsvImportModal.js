@@ -27,7 +27,10 @@ export default function CsvImportModal({ open, onClose, status }) {
             <DialogContentText>
               Идет обработка файла: {importedCount} из {totalRows} строк
             </DialogContentText>
-            <LinearProgress />
+            <LinearProgress
+              variant={totalRows ? 'determinate' : 'indeterminate'}
+              value={totalRows ? (importedCount / totalRows) * 100 : 0}
+            />
           </>
         ) : (
           <>
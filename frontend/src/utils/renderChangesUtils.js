@@ -59,6 +59,17 @@ export const renderCreate = (parsed) => (
   </Box>
 );
 
+const FIELD_LABELS = {
+  computer_name: 'Имя',
+  ip_address: 'IP-адрес',
+  location_address: 'Адрес',
+  floor: 'Этаж',
+  office: 'Кабинет',
+  domain: 'Домен',
+  has_kaspersky: 'Касперский',
+  operating_system: 'ОС'
+};
+
 export const renderUpdate = (parsed, renderValue, theme) => {
   if (!parsed.changes) return null;
   
@@ -76,16 +87,7 @@ export const renderUpdate = (parsed, renderValue, theme) => {
                 primary={
                   <Box display="flex" alignItems="center" gap={2}>
                     <Typography variant="body2" sx={{ minWidth: 120 }}>
-                      {{
-                        computer_name: 'Имя',
-                        ip_address: 'IP-адрес',
-                        location_address: 'Адрес',
-                        floor: 'Этаж',
-                        office: 'Кабинет',
-                        domain: 'Домен',
-                        has_kaspersky: 'Касперский',
-                        operating_system: 'ОС'
-                      }[field] || field}
+                      {FIELD_LABELS[field] || field}
                     </Typography>
                     <Box display="flex" alignItems="center" gap={1}>
                       {renderValue(change.from)}
@@ -106,6 +108,40 @@ export const renderUpdate = (parsed, renderValue, theme) => {
   );
 };
 
+const bulkComputerNames = (parsed) => (parsed.computers || [])
+  .map((computer) => computer.computer_name)
+  .join(', ');
+
+export const renderBulkUpdate = (parsed, renderValue) => (
+  <Tooltip title={bulkComputerNames(parsed)}>
+    <Box>
+      <Box display="flex" alignItems="center" gap={1} mb={1}>
+        <EditIcon color="info" fontSize="small" />
+        <Typography variant="subtitle2">
+          Массовое изменение: {parsed.count} шт.
+        </Typography>
+      </Box>
+      {Object.entries(parsed.changes || {}).map(([field, change]) => (
+        <Box key={field} display="flex" alignItems="center" gap={2}>
+          <Typography variant="body2" sx={{ minWidth: 120 }}>{FIELD_LABELS[field] || field}</Typography>
+          {renderValue(change.to)}
+        </Box>
+      ))}
+    </Box>
+  </Tooltip>
+);
+
+export const renderBulkDelete = (parsed) => (
+  <Tooltip title={bulkComputerNames(parsed)}>
+    <Box display="flex" alignItems="center" gap={1}>
+      <DeleteIcon color="error" fontSize="small" />
+      <Typography variant="body2">
+        Массовое удаление: {parsed.count} шт.
+      </Typography>
+    </Box>
+  </Tooltip>
+);
+
 export const renderDelete = () => (
   <Box display="flex" alignItems="center" gap={1}>
     <DeleteIcon color="error" fontSize="small" />